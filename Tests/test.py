@@ -3,7 +3,8 @@ face_attendance_sessions.py
 
 - Uses face_recognition + OpenCV (light version: small frame scale for speed)
 - Logs arrival and departure times per person (multiple sessions allowed)
-- Writes full session table to 'attendance_sessions.csv'
+- Appends ARRIVAL/DEPARTURE events to 'sessions.log'; closed sessions are
+  compacted into 'sessions.csv' (face_attendance/session_log.py)
 
 Requirements:
 pip install opencv-python face_recognition numpy
@@ -12,16 +13,21 @@ pip install opencv-python face_recognition numpy
 import cv2
 import face_recognition
 import os
+import sys
 import numpy as np
-from datetime import datetime, timedelta
-import csv
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'face_attendance'))
+from session_log import SessionLog
 
 # ---------- Settings ----------
 IMAGE_PATH = '../images'  # your folder with reference images
 FRAME_SCALE = 0.9            # scale factor for recognition (speed vs accuracy) aniqlikni sohirish uchun
 TOLERANCE = 0.5                 # face_recognition tolerance
 DEPARTURE_TIMEOUT = 10          # seconds of not-seen -> considered 'left'
-OUTPUT_CSV = 'attendance_sessions.csv'
+OUTPUT_CSV = 'attendance_sessions.csv'  # old format, migrated once into SESSIONS_TABLE
+SESSIONS_LOG = 'sessions.log'
+SESSIONS_TABLE = 'sessions.csv'
 # -------------------------------
 
 # --- Load reference images & names ---
@@ -62,60 +68,12 @@ names = filtered_names
 
 print("Encodings ready for:", names)
 
-# --- Session data structures ---
-# sessions: list of dicts {name, arrival:datetime, departure:datetime or None}
-sessions = []
-
-# active: maps name -> {arrival: datetime, last_seen: datetime, session_index: int}
-active = {}
-
-# --- CSV save/load helpers ---
-def save_sessions_to_csv(path=OUTPUT_CSV):
-    """Write all sessions to CSV (overwrites). Columns: name,arrival,departure"""
-    with open(path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['name', 'arrival', 'departure'])
-        for s in sessions:
-            arr_str = s['arrival'].strftime('%Y-%m-%d %H:%M:%S')
-            dep_str = s['departure'].strftime('%Y-%m-%d %H:%M:%S') if s['departure'] else ''
-            writer.writerow([s['name'], arr_str, dep_str])
-
-def load_sessions_from_csv(path=OUTPUT_CSV):
-    """Load previous sessions (if exist) to allow persistence across restarts."""
-    if not os.path.exists(path):
-        return []
-    loaded = []
-    with open(path, 'r', newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            arr = datetime.strptime(row['arrival'], '%Y-%m-%d %H:%M:%S')
-            dep = datetime.strptime(row['departure'], '%Y-%m-%d %H:%M:%S') if row['departure'] else None
-            loaded.append({'name': row['name'], 'arrival': arr, 'departure': dep})
-    return loaded
-
-# load previous sessions (optional)
-sessions = load_sessions_from_csv()
-
-# --- Mark arrival (create new session) ---
-def mark_arrival(name, now):
-    # create session record, add to sessions and active
-    sess = {'name': name, 'arrival': now, 'departure': None}
-    sessions.append(sess)
-    active[name] = {'arrival': now, 'last_seen': now, 'session_index': len(sessions)-1}
-    print(f"[ARRIVAL] {name} at {now.strftime('%H:%M:%S')}")
-    save_sessions_to_csv()
-
-# --- Mark departure (close session) ---
-def mark_departure(name, now):
-    info = active.get(name)
-    if not info:
-        return
-    idx = info['session_index']
-    sessions[idx]['departure'] = now
-    # remove from active
-    del active[name]
-    print(f"[DEPARTURE] {name} at {now.strftime('%H:%M:%S')}")
-    save_sessions_to_csv()
+# --- Session log ---
+# Each arrival/departure appends one line; previous sessions are not re-read,
+# only the open ones are replayed from the log at startup
+sessions = SessionLog(log_path=SESSIONS_LOG, table_path=SESSIONS_TABLE,
+                      legacy_path=OUTPUT_CSV, timeout=DEPARTURE_TIMEOUT)
+active = sessions.active
 
 # --- Main camera loop ---
 cap = cv2.VideoCapture(0)
@@ -135,8 +93,6 @@ try:
         face_locations = face_recognition.face_locations(rgb_small)
         face_encodings = face_recognition.face_encodings(rgb_small, face_locations)
 
-        now = datetime.now()
-
         seen_this_frame = set()
 
         for face_encoding, face_loc in zip(face_encodings, face_locations):
@@ -163,29 +119,20 @@ try:
             # process arrival/active logic only for known people (skip UNKNOWN)
             if name != "UNKNOWN":
                 seen_this_frame.add(name)
-                if name in active:
-                    # update last seen
-                    active[name]['last_seen'] = now
-                else:
-                    # new arrival
-                    mark_arrival(name, now)
-
-        # Check for departures: anyone active but not seen recently
-        to_remove = []
-        for name, info in list(active.items()):
-            last_seen = info['last_seen']
-            if (now - last_seen).total_seconds() > DEPARTURE_TIMEOUT:
-                # consider departed
-                mark_departure(name, now)
+                # new arrival or update last seen
+                sessions.seen(name, name)
+
+        # Check for departures: only people whose deadline passed are touched
+        sessions.expire()
 
         # Optionally: show a small status panel of active people
         y = 20
-        cv2.putText(frame, f"Active: {len(active)}  Sessions: {len(sessions)}", (10, y),
+        cv2.putText(frame, f"Active: {len(active)}  Events: {sessions.events_written}", (10, y),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,255,0), 2)
         y += 25
         for i, (name, info) in enumerate(active.items()):
             if i >= 5: break
-            txt = f"{name} (seen {int((now - info['last_seen']).total_seconds())}s ago)"
+            txt = f"{name} (seen {int(sessions.clock() - info['last_seen'])}s ago)"
             cv2.putText(frame, txt, (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200,200,200), 1)
             y += 20
 
@@ -199,7 +146,6 @@ finally:
     cap.release()
     cv2.destroyAllWindows()
     # Ensure active people are closed as departed on shutdown (optional)
-    shutdown_time = datetime.now()
-    for name in list(active.keys()):
-        mark_departure(name, shutdown_time)
-    print("Exiting, sessions saved to", OUTPUT_CSV)
+    sessions.close_all(datetime.now())
+    sessions.close()
+    print("Exiting, sessions saved to", SESSIONS_TABLE)
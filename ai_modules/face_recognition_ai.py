@@ -1,16 +1,12 @@
 import cv2
 import face_recognition
-import sqlite3
 from datetime import datetime
+from database import db_setup
 
 def mark_attendance(name):
-    conn = sqlite3.connect("data/attendance.db")
-    c = conn.cursor()
     now = datetime.now()
-    c.execute("INSERT INTO attendance (name, date, time) VALUES (?, ?, ?)",
-              (name, now.date(), now.strftime("%H:%M:%S")))
-    conn.commit()
-    conn.close()
+    # Bu modulda ID yo'q - ism ID sifatida ishlatiladi (kuniga bitta yozuv)
+    return db_setup.mark_attendance(name, name, now.strftime("%Y-%m-%d"), now.strftime("%H:%M:%S"))
 
 def start_recognition():
     video = cv2.VideoCapture(0)
@@ -1,18 +1,29 @@
-import sqlite3
-from datetime import date
+from datetime import date, timedelta
+from database.daily_counters import DailyCounters
+
+# Kunlik hisoblagichlar xotirada - har bir savolda bazaga so'rov yuborilmaydi
+# (birinchi savolda yaratiladi)
+counters = None
+
+def _counters():
+    global counters
+    if counters is None:
+        counters = DailyCounters()
+    return counters
+
+def _query_day(query):
+    if "kecha" in query:
+        return (date.today() - timedelta(days=1)).strftime("%Y-%m-%d"), "Kecha"
+    return date.today().strftime("%Y-%m-%d"), "Bugun"
 
 def handle_query(query):
-    conn = sqlite3.connect("data/attendance.db")
-    c = conn.cursor()
-    today = date.today()
+    day, label = _query_day(query)
 
     if "nechta" in query or "davomat" in query:
-        c.execute("SELECT COUNT(*) FROM attendance WHERE date=?", (today,))
-        count = c.fetchone()[0]
-        return f"Bugun {count} o‘quvchi keldi."
-    elif "bugun" in query and "ism" in query:
-        c.execute("SELECT name FROM attendance WHERE date=?", (today,))
-        names = [row[0] for row in c.fetchall()]
-        return f"Bugun kelgan o‘quvchilar: {', '.join(names)}"
+        count = _counters().count(day)
+        return f"{label} {count} o‘quvchi keldi."
+    elif ("bugun" in query or "kecha" in query) and "ism" in query:
+        names = _counters().names(day)
+        return f"{label} kelgan o‘quvchilar: {', '.join(names)}"
     else:
         return "Kechirasiz, savolingizni tushunmadim."
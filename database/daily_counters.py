@@ -0,0 +1,111 @@
+import collections
+import threading
+from database import db_setup
+
+
+class DailyCounters:
+    """
+    Kunlik davomat hisoblagichlari xotirada: soni, kelganlar ismlari (vaqt tartibida)
+
+    Har bir so'rovda faqat PRAGMA data_version tekshiriladi (boshqa jarayon yozganini
+    bildiradi); shu jarayondagi yozuvlar db_setup.listeners orqali keladi. O'zgarish
+    bo'lsa faqat yangi qatorlar (id > oxirgi id) o'qiladi - COUNT(*) va to'liq skan yo'q.
+    Keshda yo'q kun birinchi so'rovda (date, student_id) indeksi bo'yicha yuklanadi.
+
+    data_version ulanishga bog'liq, shuning uchun hisoblagichlar o'z alohida
+    ulanishini ishlatadi (lock ostida, istalgan thread'dan) - tekshiruv ham,
+    yangilash ham shu ulanishda.
+    """
+
+    def __init__(self, path=None, max_days=7):
+        self.path = path or db_setup.DB_PATH
+        self.max_days = max_days
+        self._lock = threading.Lock()
+
+        # date -> {'ids': set, 'names': [...], 'times': [...]} (LRU)
+        self._days = collections.OrderedDict()
+        self._data_version = None
+        self._dirty = True
+        self.db_queries = 0
+
+        self._conn = db_setup.connect(self.path, check_same_thread=False)
+        self._last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM attendance").fetchone()[0]
+        db_setup.listeners.append(self._on_write)
+
+    def _on_write(self, path):
+        if path == self.path:
+            self._dirty = True
+
+    def _sync(self):
+        conn = self._conn
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version and not self._dirty:
+            return
+        self._data_version = version
+        self._dirty = False
+
+        rows = conn.execute(
+            "SELECT id, student_id, name, date, time FROM attendance WHERE id > ? ORDER BY id",
+            (self._last_id,)).fetchall()
+        self.db_queries += 1
+        for row_id, student_id, name, date_str, time_str in rows:
+            self._last_id = max(self._last_id, row_id)
+            day = self._days.get(date_str)
+            if day is not None:
+                self._add(day, student_id, name, time_str)
+
+    @staticmethod
+    def _add(day, student_id, name, time_str):
+        # UNIQUE (date, student_id): kun yuklanishi va yangi qatorlar ustma-ust tushsa ham takrorlanmaydi
+        if student_id in day['ids']:
+            return
+        day['ids'].add(student_id)
+        day['names'].append(name)
+        day['times'].append(time_str)
+
+    def _day(self, date_str):
+        day = self._days.get(date_str)
+        if day is not None:
+            self._days.move_to_end(date_str)
+            return day
+
+        day = {'ids': set(), 'names': [], 'times': []}
+        rows = self._conn.execute(
+            "SELECT student_id, name, time FROM attendance WHERE date=? ORDER BY id", (date_str,))
+        for student_id, name, time_str in rows:
+            self._add(day, student_id, name, time_str)
+        self.db_queries += 1
+
+        self._days[date_str] = day
+        while len(self._days) > self.max_days:
+            self._days.popitem(last=False)
+        return day
+
+    def count(self, date_str):
+        with self._lock:
+            self._sync()
+            return len(self._day(date_str)['ids'])
+
+    def names(self, date_str):
+        with self._lock:
+            self._sync()
+            return list(self._day(date_str)['names'])
+
+    def is_present(self, student_id, date_str):
+        with self._lock:
+            self._sync()
+            return student_id in self._day(date_str)['ids']
+
+    def stats(self):
+        with self._lock:
+            return {
+                'days_cached': len(self._days),
+                'last_id': self._last_id,
+                'db_queries': self.db_queries
+            }
+
+    def close(self):
+        with self._lock:
+            if self._on_write in db_setup.listeners:
+                db_setup.listeners.remove(self._on_write)
+            self._conn.close()
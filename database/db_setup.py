@@ -1,15 +1,198 @@
+import os
 import sqlite3
+import threading
 
-def init_db():
-    conn = sqlite3.connect("data/attendance.db")
-    c = conn.cursor()
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS attendance (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT,
-        date TEXT,
-        time TEXT
-    )
-    """)
-    conn.commit()
-    conn.close()
+# Barcha modullar uchun yagona baza (ishga tushirilgan papkaga bog'liq emas)
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "data", "attendance.db")
+
+# Bitta talaba - kuniga bitta yozuv (UNIQUE indeks), (date, student_id) bo'yicha qidiruv
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attendance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL,
+    name TEXT,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_attendance_date_student
+    ON attendance (date, student_id);
+"""
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+# Yozuv qo'shilganda chaqiriladi: listener(path) - masalan, daily_counters keshini yangilash
+listeners = []
+
+
+def _notify(path):
+    for listener in listeners:
+        listener(path or DB_PATH)
+
+
+def _configure(conn):
+    # WAL: o'quvchilar yozuvchini kutmaydi; NORMAL - WAL uchun xavfsiz va tez
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+
+
+def _migrate(conn):
+    """
+    Eski jadval (id, name, date, time) -> yangi sxema.
+    Eski kod har kadrda yozgan - kunlik takrorlar tashlanadi (birinchisi qoladi).
+
+    Eski jadvalda student_id yo'q: u ismdan olinadi (student_id = name). Ism
+    galereyadagi ID bilan bir xil bo'lmasa, ko'chirilgan yozuvlar yangilari bilan
+    birlashmaydi - kerak bo'lsa keyin qo'lda moslashtiriladi.
+
+    RENAME/CREATE/INSERT/DROP bitta tranzaksiyada: to'xtab qolsa hammasi bekor.
+    Eski (tranzaksiyasiz) ko'chirishdan attendance_legacy qolgan bo'lsa - davom ettiriladi.
+    """
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(attendance)")]
+    needs_rename = bool(columns) and "student_id" not in columns
+    if not needs_rename and "attendance_legacy" not in tables:
+        return
+
+    # executescript() o'zi COMMIT qiladi - sxema buyruqlari alohida bajariladi
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if needs_rename:
+                conn.execute("ALTER TABLE attendance RENAME TO attendance_legacy")
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            cursor = conn.execute("""
+                INSERT OR IGNORE INTO attendance (student_id, name, date, time)
+                SELECT name, name, date, time FROM attendance_legacy ORDER BY id
+            """)
+            conn.execute("DROP TABLE attendance_legacy")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.isolation_level = isolation_level
+    print(f"🔄 attendance jadvali yangi sxemaga ko'chirildi ({cursor.rowcount} ta yozuv, "
+          f"student_id = ism)")
+
+
+def init_db(path=None):
+    """
+    Bazani yaratish (yoki eski sxemadan ko'chirish) - har bir fayl uchun bir marta
+    """
+    path = path or DB_PATH
+    with _init_lock:
+        if path in _initialized:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path)
+        try:
+            _configure(conn)
+            _migrate(conn)
+            conn.executescript(SCHEMA)
+            conn.commit()
+        finally:
+            conn.close()
+        _initialized.add(path)
+
+
+def connect(path=None, check_same_thread=True):
+    """
+    Yangi sozlangan ulanish (baza kerak bo'lsa yaratiladi).
+    check_same_thread=False - ulanish egasi o'z lock'i ostida bir nechta thread'dan ishlatadi
+    """
+    path = path or DB_PATH
+    init_db(path)
+    conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+    _configure(conn)
+    return conn
+
+
+def get_connection(path=None):
+    """
+    Joriy thread uchun ulanish (har bir thread o'z ulanishini qayta ishlatadi)
+    """
+    path = path or DB_PATH
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(path)
+    if conn is None:
+        conn = connections[path] = connect(path)
+    return conn
+
+
+def close_connection(path=None):
+    """
+    Joriy thread ulanishini yopish (thread tugashidan oldin)
+    """
+    connections = getattr(_local, "connections", {})
+    conn = connections.pop(path or DB_PATH, None)
+    if conn is not None:
+        conn.close()
+
+
+def mark_attendance(student_id, name, date, time, path=None):
+    """
+    Returns:
+        bool: yozildimi (bugun allaqachon bo'lsa - False)
+    """
+    conn = get_connection(path)
+    with conn:
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO attendance (student_id, name, date, time) VALUES (?, ?, ?, ?)",
+            (student_id, name, date, time))
+    if cursor.rowcount == 1:
+        _notify(path)
+    return cursor.rowcount == 1
+
+
+def mark_many(rows, path=None):
+    """
+    Bir nechta yozuv bitta tranzaksiyada (group commit)
+
+    Args:
+        rows: [(student_id, name, date, time), ...]
+
+    Returns:
+        int: yozilgan yozuvlar soni (takrorlar hisobga olinmaydi)
+    """
+    conn = get_connection(path)
+    before = conn.total_changes
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO attendance (student_id, name, date, time) VALUES (?, ?, ?, ?)",
+            rows)
+    changed = conn.total_changes - before
+    if changed:
+        _notify(path)
+    return changed
+
+
+def is_marked(student_id, date, path=None):
+    row = get_connection(path).execute(
+        "SELECT 1 FROM attendance WHERE date=? AND student_id=?", (date, student_id)).fetchone()
+    return row is not None
+
+
+def count_for_date(date, path=None):
+    return get_connection(path).execute(
+        "SELECT COUNT(*) FROM attendance WHERE date=?", (date,)).fetchone()[0]
+
+
+def rows_for_date(date, path=None):
+    """
+    Returns:
+        list: [(student_id, name, time), ...] vaqt tartibida
+    """
+    return get_connection(path).execute(
+        "SELECT student_id, name, time FROM attendance WHERE date=? ORDER BY id",
+        (date,)).fetchall()
@@ -0,0 +1,350 @@
+"""
+BANDLIK VA O'TIRISH VAQTI TAHLILI (OQIMLI)
+
+    SessionLog (ARRIVAL/DEPARTURE) ──┐
+                                     ├──► OccupancyAnalytics ──► /api/occupancy, /api/dwell
+    mark_attendance ('attendance') ──┘          │
+                                                └──► analytics.json (checkpoint)
+
+CSV'larni qayta skanerlash o'rniga har bir hodisa kelganda yig'indilar
+yangilanadi: hozir xonadagilar, kunlik eng yuqori bandlik, har talabaning
+jami o'tirish vaqti va soatlik gistogrammalar. So'rov narxi tarix hajmiga
+bog'liq emas (javob o'zgarmaguncha keshdan beriladi).
+
+Checkpoint oxirgi qo'llangan sessiya seq'ini saqlaydi: qayta ishga tushishda
+faqat jurnaldagi undan keyingi hodisalar o'ynaladi. SessionLog jurnalni
+siqishdan oldin COMPACT hodisasini yuboradi - shu paytda checkpoint yoziladi,
+shuning uchun hali qo'llanmagan hodisalar jurnaldan o'chib ketmaydi.
+Bugungi davomat gistogrammasi attendance.today() dan tiklanadi (arzon).
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+import config
+from session_log import ARRIVAL, DEPARTURE, SESSION_TIME_FORMAT, format_time, parse_time
+
+HOURS = 24
+
+
+class OccupancyAnalytics:
+    """
+    Sessiya va davomat hodisalaridan yig'indilar (istalgan thread'dan chaqiriladi)
+    """
+
+    def __init__(self, checkpoint_path=None):
+        self.checkpoint_path = checkpoint_path or config.ANALYTICS_CHECKPOINT_FILE
+        self._lock = threading.Lock()
+
+        # Qo'llangan oxirgi sessiya hodisasi
+        self.seq = 0
+        self.date = None
+
+        # student_id -> {'name', 'arrival': datetime}
+        self.present = {}
+        # student_id -> {'name', 'today', 'total', 'sessions'} (soniyalar)
+        self.dwell = {}
+
+        # Javoblar keshi: o'zgarishda version oshadi
+        self.version = 0
+        self._reset_day(datetime.now().strftime(config.ATTENDANCE_DATE_FORMAT))
+        self._boot = f"{int(time.time() * 1000):x}"
+        self._occupancy_cache = (None, None)
+        self._dwell_cache = (None, None)
+
+        self._since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+        self.checkpoints = 0
+
+        self._load_checkpoint()
+
+    def _reset_day(self, date_str):
+        self.date = date_str
+        self.peak = {'count': len(self.present), 'time': None}
+        self.arrivals_by_hour = [0] * HOURS
+        self.departures_by_hour = [0] * HOURS
+        self.occupancy_by_hour = [0] * HOURS
+        self.marks_by_hour = [0] * HOURS
+        self.marks_today = 0
+        self._hour = None
+        for entry in self.dwell.values():
+            entry['today'] = 0.0
+        self.version += 1
+
+    # ===== HODISALAR =====
+
+    def handle(self, event, data):
+        """
+        SessionLog va FaceRecognitionSystem tinglovchisi
+        """
+        if event == 'COMPACT':
+            self.checkpoint()
+            return
+        if event not in (ARRIVAL, DEPARTURE, 'attendance'):
+            return
+
+        with self._lock:
+            if event == 'attendance':
+                when = datetime.strptime(f"{data['date']} {data['time']}", SESSION_TIME_FORMAT)
+                self._rollover(when)
+                self.marks_by_hour[when.hour] += 1
+                self.marks_today += 1
+            else:
+                if data['seq'] <= self.seq:
+                    return
+                self._apply(data['seq'], event, data['student_id'], data['name'], data['time'])
+            self.version += 1
+            self._since_checkpoint += 1
+            due = self._since_checkpoint >= config.ANALYTICS_CHECKPOINT_EVENTS or \
+                time.monotonic() - self._last_checkpoint >= config.ANALYTICS_CHECKPOINT_SECONDS
+            if due:
+                self._checkpoint()
+
+    def _apply(self, seq, event, student_id, name, when):
+        self.seq = seq
+        self._rollover(when)
+        # Kechagi hodisa (masalan, to'xtashdan keyin yopilgan sessiya) bugungi yig'indilarga tushmaydi
+        today = when.strftime(config.ATTENDANCE_DATE_FORMAT) == self.date
+
+        if event == ARRIVAL:
+            if student_id in self.present:
+                return
+            self.present[student_id] = {'name': name, 'arrival': when}
+            if not today:
+                return
+            self.arrivals_by_hour[when.hour] += 1
+            count = len(self.present)
+            if count > self.peak['count']:
+                self.peak = {'count': count, 'time': format_time(when)}
+            self.occupancy_by_hour[when.hour] = max(self.occupancy_by_hour[when.hour], count)
+            return
+
+        session = self.present.pop(student_id, None)
+        if session is None:
+            return
+        seconds = max(0.0, (when - session['arrival']).total_seconds())
+        entry = self.dwell.setdefault(student_id, {'name': name, 'today': 0.0, 'total': 0.0, 'sessions': 0})
+        entry['name'] = name
+        if today:
+            self.departures_by_hour[when.hour] += 1
+            entry['today'] += seconds
+        entry['total'] += seconds
+        entry['sessions'] += 1
+
+    def _rollover(self, when):
+        """
+        Yangi kun - kunlik yig'indilar nolga; soat o'tsa - bandlik gistogrammasi to'ldiriladi
+        """
+        date_str = when.strftime(config.ATTENDANCE_DATE_FORMAT)
+        if date_str < self.date:
+            return  # faqat oldinga: kechagi hodisa bugungi kunni qayta boshlamaydi
+        if date_str != self.date:
+            self._reset_day(date_str)
+
+        # Hodisasiz o'tgan soatlarda ham xonada odamlar bo'lgan
+        hour = when.hour
+        if self._hour is not None and hour > self._hour:
+            count = len(self.present)
+            for h in range(self._hour + 1, hour + 1):
+                self.occupancy_by_hour[h] = max(self.occupancy_by_hour[h], count)
+            self.version += 1
+        self._hour = hour
+
+    def load_marks(self, rows):
+        """
+        Bugungi davomat gistogrammasini qayta qurish (ishga tushishda)
+
+        Args:
+            rows: attendance.today() - [(student_id, name, time), ...]
+        """
+        with self._lock:
+            self._rollover(datetime.now())
+            self.marks_by_hour = [0] * HOURS
+            for _, _, time_str in rows:
+                hour = int(time_str.split(':', 1)[0])
+                self.marks_by_hour[hour] += 1
+            self.marks_today = len(rows)
+            self.version += 1
+
+    def catch_up(self, session_log):
+        """
+        Checkpoint'dan keyingi sessiya hodisalarini qo'llash (to'liq replay emas)
+
+        Returns:
+            int: qo'llangan hodisalar soni
+        """
+        events = session_log.events_since(self.seq)
+        with self._lock:
+            for seq, event, student_id, name, when in events:
+                self._apply(seq, event, student_id, name, when)
+            self.version += 1
+        if events:
+            print(f"📈 Tahlil tiklandi: checkpoint'dan keyin {len(events)} ta hodisa")
+        return len(events)
+
+    # ===== SO'ROVLAR =====
+
+    @property
+    def etag(self):
+        return f"{self._boot}-{self.version}"
+
+    def occupancy(self):
+        """
+        Hozirgi bandlik, kunlik cho'qqi va soatlik gistogrammalar
+        """
+        with self._lock:
+            self._rollover(datetime.now())
+            version, body = self._occupancy_cache
+            if version == self.version:
+                return body
+
+            body = {
+                'date': self.date,
+                'current': len(self.present),
+                'peak': dict(self.peak),
+                'marks_today': self.marks_today,
+                'present': [
+                    {'student_id': student_id, 'name': entry['name'],
+                     'since': format_time(entry['arrival'])}
+                    for student_id, entry in self.present.items()
+                ],
+                'hourly': {
+                    'arrivals': list(self.arrivals_by_hour),
+                    'departures': list(self.departures_by_hour),
+                    'occupancy': list(self.occupancy_by_hour),
+                    'marks': list(self.marks_by_hour)
+                }
+            }
+            self._occupancy_cache = (self.version, body)
+            return body
+
+    def dwell_for(self, student_id, now=None):
+        """
+        Bitta talaba o'tirish vaqti (ochiq sessiya hozirgacha hisoblanadi) - O(1)
+
+        Returns:
+            dict yoki None
+        """
+        now = now or datetime.now()
+        with self._lock:
+            entry = self.dwell.get(student_id)
+            session = self.present.get(student_id)
+            if entry is None and session is None:
+                return None
+
+            open_seconds = max(0.0, (now - session['arrival']).total_seconds()) if session else 0.0
+            entry = entry or {'name': session['name'], 'today': 0.0, 'total': 0.0, 'sessions': 0}
+            return {
+                'student_id': student_id,
+                'name': entry['name'],
+                'today_seconds': round(entry['today'] + open_seconds, 1),
+                'total_seconds': round(entry['total'] + open_seconds, 1),
+                'sessions': entry['sessions'] + (1 if session else 0),
+                'present_since': format_time(session['arrival']) if session else None
+            }
+
+    def dwell_all(self):
+        """
+        Barcha talabalar: yopilgan sessiyalar yig'indisi + present_since
+        (ochiq sessiya davomini mijoz o'zi qo'shadi - javob keshlanadi)
+        """
+        with self._lock:
+            self._rollover(datetime.now())
+            version, body = self._dwell_cache
+            if version == self.version:
+                return body
+
+            student_ids = set(self.dwell) | set(self.present)
+            students = []
+            for student_id in student_ids:
+                entry = self.dwell.get(student_id)
+                session = self.present.get(student_id)
+                students.append({
+                    'student_id': student_id,
+                    'name': entry['name'] if entry else session['name'],
+                    'today_seconds': round(entry['today'], 1) if entry else 0.0,
+                    'total_seconds': round(entry['total'], 1) if entry else 0.0,
+                    'sessions': entry['sessions'] if entry else 0,
+                    'present_since': format_time(session['arrival']) if session else None
+                })
+            students.sort(key=lambda item: item['total_seconds'], reverse=True)
+
+            body = {'date': self.date, 'total': len(students), 'students': students}
+            self._dwell_cache = (self.version, body)
+            return body
+
+    # ===== CHECKPOINT =====
+
+    def checkpoint(self):
+        with self._lock:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        state = {
+            'seq': self.seq,
+            'date': self.date,
+            'present': {student_id: {'name': entry['name'], 'arrival': format_time(entry['arrival'])}
+                        for student_id, entry in self.present.items()},
+            'dwell': self.dwell,
+            'peak': self.peak,
+            'arrivals_by_hour': self.arrivals_by_hour,
+            'departures_by_hour': self.departures_by_hour,
+            'occupancy_by_hour': self.occupancy_by_hour,
+            'saved_at': datetime.now().strftime(SESSION_TIME_FORMAT)
+        }
+
+        # Atomik almashtirish: yarim yozilgan checkpoint o'qilmaydi
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+        self._since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+        self.checkpoints += 1
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            present = {student_id: {'name': entry['name'], 'arrival': parse_time(entry['arrival'])}
+                       for student_id, entry in state['present'].items()}
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Tahlil checkpoint'i o'qilmadi: {e}")
+            return
+
+        self.seq = state['seq']
+        self.present = present
+        self.dwell = state['dwell']
+        if state['date'] == self.date:
+            self.peak = state['peak']
+            self.arrivals_by_hour = state['arrivals_by_hour']
+            self.departures_by_hour = state['departures_by_hour']
+            self.occupancy_by_hour = state['occupancy_by_hour']
+        else:
+            # Checkpoint kechagi - bugungi yig'indilar noldan
+            for entry in self.dwell.values():
+                entry['today'] = 0.0
+            self.peak = {'count': len(self.present), 'time': None}
+        print(f"📈 Tahlil checkpoint'i yuklandi (seq {self.seq}, {len(self.present)} kishi xonada)")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'seq': self.seq,
+                'present': len(self.present),
+                'students': len(self.dwell),
+                'since_checkpoint': self._since_checkpoint,
+                'checkpoints': self.checkpoints
+            }
+
+    def close(self):
+        self.checkpoint()
@@ -1,22 +1,64 @@
 from flask import Flask, render_template, Response, jsonify, request
+from werkzeug.utils import secure_filename
 import cv2
+import json
+import os
 import threading
 import time
 from datetime import datetime
 import config
 from face_recognition_system import FaceRecognitionSystem
+from attendance_store import AttendanceWriter
+from video_pipeline import SUBSCRIBER_KINDS, CameraPipeline
+from camera_pool import CameraPool, open_capture
+from quality_controller import QualityController
+from event_bus import EventBus, sse_message
+from session_log import SessionLog
+from analytics import OccupancyAnalytics
 
 app = Flask(__name__)
 
 # Yuzni tanib olish tizimini ishga tushirish
 face_system = FaceRecognitionSystem()
 
+# Dashboard hodisalari (/api/events): davomat, galereya va kamera o'zgarishlari
+events = EventBus()
+face_system.listeners.append(events.publish)
+
+# Kelish/ketish jurnali va bandlik tahlili (checkpoint + jurnal qoldig'idan tiklanadi)
+analytics = OccupancyAnalytics()
+analytics.load_marks(face_system.attendance.today())
+face_system.listeners.append(analytics.handle)
+
+session_log = None
+if config.USE_SESSION_TRACKING:
+    session_log = SessionLog()
+    analytics.catch_up(session_log)
+    session_log.listeners.append(analytics.handle)
+
 # Video kamera
 camera = None
 camera_lock = threading.Lock()
 
+# Kamera uchun yagona video pipeline (barcha /video_feed mijozlari uchun)
+stream_pipeline = None
+pipeline_lock = threading.Lock()
+
+# Asosiy kamera uchun adaptiv sifat (pipeline qayta ishga tushsa ham saqlanadi)
+stream_quality = QualityController.for_camera(config.CAMERAS[config.DEFAULT_CAMERA]) \
+    if config.USE_QUALITY_CONTROLLER else None
+
+# Qo'shimcha kameralar uchun worker pool (USE_CAMERA_POOL)
+camera_pool = None
+
+# /api/students javobi: (etag, JSON matn) - ro'yxat o'zgarganda yangilanadi
+students_body = (None, None)
+
+# /api/occupancy va /api/dwell javoblari: (etag, JSON matn)
+occupancy_body = (None, None)
+dwell_body = (None, None)
+
 # O'zgaruvchilar
-frame_counter = 0
 last_recognized = {}  # So'nggi tanilgan yuzlar (spam oldini olish uchun)
 
 
@@ -26,70 +68,187 @@ def get_camera():
     """
     global camera
     if camera is None or not camera.isOpened():
-        camera = cv2.VideoCapture(0)
-        camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        camera.set(cv2.CAP_PROP_FPS, config.VIDEO_FPS)
+        camera = open_capture(config.CAMERAS[config.DEFAULT_CAMERA])
     return camera
 
 
-def generate_frames():
+def draw_results(frame, results):
     """
-    Video streamni generatsiya qilish (real-time)
+    Tanilgan yuzlarni kadrga chizish
+    """
+    for result in results:
+        name = result['name']
+        top, right, bottom, left = result['location']
+        distance = result['distance']
+
+        # Yuzning atrofiga to'rtburchak chizish
+        color = (0, 255, 0) if name != "Noma'lum" else (0, 0, 255)
+        cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
+
+        # Ism va aniqlik ko'rsatish
+        confidence = int((1 - distance) * 100)
+        label = f"{name} ({confidence}%)"
+        cv2.rectangle(frame, (left, bottom - 35), (right, bottom), color, cv2.FILLED)
+        cv2.putText(frame, label, (left + 6, bottom - 6),
+                    cv2.FONT_HERSHEY_DUPLEX, 0.6, (255, 255, 255), 1)
+
+
+def mark_recognized(results):
     """
-    global frame_counter, last_recognized
+    Tanilgan yuzlar uchun davomat qilish (spam oldini olish bilan)
+    """
+    for result in results:
+        name = result['name']
+        student_id = result['student_id']
+
+        # Davomat qilish (agar tanilgan bo'lsa va spam bo'lmasa)
+        if student_id and name != "Noma'lum":
+            # Sessiya har ko'rinishda yangilanadi (O(1)); ketish expire_sessions'da
+            if session_log is not None:
+                session_log.seen(student_id, name)
+
+            current_time = time.time()
+
+            # Spam oldini olish (har RECOGNITION_COOLDOWN_SECONDS da bir marta)
+            if student_id not in last_recognized or \
+                    (current_time - last_recognized[student_id]) > config.RECOGNITION_COOLDOWN_SECONDS:
+                face_system.mark_attendance(student_id, name)
+                last_recognized[student_id] = current_time
 
-    camera = get_camera()
 
+def expire_sessions():
+    """
+    Fon thread'i: ko'rinmay qolganlarni "ketdi" deb belgilash (stream bo'lmasa ham)
+    """
     while True:
-        with camera_lock:
-            success, frame = camera.read()
+        time.sleep(config.SESSION_EXPIRE_INTERVAL)
+        try:
+            session_log.expire()
+        except Exception as e:
+            print(f"⚠️  Sessiyalarni tekshirishda xato: {e}")
+
+
+def acquire_pipeline(kind='full'):
+    """
+    Kamera uchun yagona pipeline'ni olish (kerak bo'lsa ishga tushirish)
+    """
+    global stream_pipeline
+    with pipeline_lock:
+        if stream_pipeline is None or not stream_pipeline.running:
+            stream_pipeline = CameraPipeline(get_camera(), camera_lock, face_system,
+                                             on_results=mark_recognized, draw=draw_results,
+                                             quality=stream_quality)
+            stream_pipeline.start()
+            events.publish('camera', camera_status())
+        return stream_pipeline, stream_pipeline.subscribe(kind)
+
+
+def release_pipeline(pipeline, subscriber):
+    """
+    Mijozni o'chirish; oxirgi mijoz ketganda pipeline to'xtatiladi
+    """
+    global stream_pipeline
+    with pipeline_lock:
+        if pipeline.unsubscribe(subscriber) == 0:
+            pipeline.stop()
+            if stream_pipeline is pipeline:
+                stream_pipeline = None
+            events.publish('camera', camera_status())
+
+
+def generate_frames(profile='full'):
+    """
+    Video streamni generatsiya qilish (real-time)
 
-        if not success:
-            break
+    profile: 'full' (ramkalar chizilgan) yoki 'preview' (kichik, ramkasiz)
 
-        frame_counter += 1
+    Capture, tanib olish va JPEG encode alohida thread'larda ishlaydi
+    (video_pipeline.CameraPipeline) - stream FPS tanib olish tezligiga bog'liq emas.
+    Barcha mijozlar bitta pipeline'ga obuna bo'ladi: tanib olish va JPEG
+    encode bir marta, har bir qo'shimcha mijoz faqat tarmoq I/O.
+    """
+    pipeline, subscriber = acquire_pipeline(profile)
 
-        # Har N-kadrda yuzni tanib olish (tezlik uchun)
-        if frame_counter % config.PROCESS_EVERY_N_FRAMES == 0:
-            # Yuzlarni tanib olish
-            results = face_system.recognize_faces_in_frame(frame)
+    try:
+        for frame_bytes in pipeline.frames(subscriber):
+            # Stream uchun yield qilish
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+    finally:
+        # Mijoz uzilganda obuna bekor qilinadi
+        release_pipeline(pipeline, subscriber)
+
+
+def generate_detections():
+    """
+    Natijalar oqimi (Server-Sent Events): faqat o'zgargan natijalar yuboriladi,
+    jim paytlarda ulanish keepalive izohi bilan ushlab turiladi
+    """
+    pipeline, subscriber = acquire_pipeline('detections')
 
-            # Har bir yuzni chizish va davomat qilish
-            for result in results:
-                name = result['name']
-                student_id = result['student_id']
-                top, right, bottom, left = result['location']
-                distance = result['distance']
+    try:
+        while not subscriber.closed:
+            message = subscriber.get(timeout=config.SSE_KEEPALIVE_SECONDS)
+            if message is None:
+                yield ': keepalive\n\n'
+                continue
+            yield f"data: {json.dumps(message, ensure_ascii=False)}\n\n"
+    finally:
+        release_pipeline(pipeline, subscriber)
+
+
+def camera_status():
+    return {
+        'camera_active': camera is not None and camera.isOpened(),
+        'stream_active': stream_pipeline is not None and stream_pipeline.running,
+        'pool_active': camera_pool is not None and camera_pool.running
+    }
 
-                # Yuzning atrofiga to'rtburchak chizish
-                color = (0, 255, 0) if name != "Noma'lum" else (0, 0, 255)
-                cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
 
-                # Ism va aniqlik ko'rsatish
-                confidence = int((1 - distance) * 100)
-                label = f"{name} ({confidence}%)"
-                cv2.rectangle(frame, (left, bottom - 35), (right, bottom), color, cv2.FILLED)
-                cv2.putText(frame, label, (left + 6, bottom - 6),
-                            cv2.FONT_HERSHEY_DUPLEX, 0.6, (255, 255, 255), 1)
+def dashboard_snapshot():
+    """
+    Dashboard'ning to'liq holati (ulanishda va hodisalar yo'qolganda yuboriladi)
+    """
+    from datetime import date
 
-                # Davomat qilish (agar tanilgan bo'lsa va spam bo'lmasa)
-                if student_id and name != "Noma'lum":
-                    current_time = time.time()
+    roster = face_system.gallery.roster
+    snapshot = {
+        'date': date.today().strftime(config.ATTENDANCE_DATE_FORMAT),
+        'total_students': roster.total_students,
+        'total_encodings': roster.total_encodings,
+        'roster_etag': roster.etag,
+        'attendance': [
+            {'student_id': student_id, 'name': name, 'time': time_str}
+            for student_id, name, time_str in face_system.attendance.today()
+        ]
+    }
+    snapshot.update(camera_status())
+    return snapshot
 
-                    # Spam oldini olish (har 30 soniyada bir marta)
-                    if student_id not in last_recognized or \
-                            (current_time - last_recognized[student_id]) > 30:
-                        face_system.mark_attendance(student_id, name)
-                        last_recognized[student_id] = current_time
 
-        # Frame'ni encode qilish
-        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-        frame_bytes = buffer.tobytes()
+def generate_events():
+    """
+    Dashboard hodisalari (SSE): avval snapshot, keyin faqat o'zgarishlar.
+    Mijoz navbati to'lib hodisa tashlansa - snapshot qayta yuboriladi.
+    """
+    subscriber = events.subscribe()
 
-        # Stream uchun yield qilish
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+    try:
+        # Obunadan keyin olinadi: oradagi hodisalar snapshot'da ham, navbatda ham
+        # bo'lishi mumkin - brauzer ularni student_id bo'yicha birlashtiradi
+        yield sse_message('snapshot', dashboard_snapshot())
+        dropped = 0
+        while not subscriber.closed:
+            message = subscriber.get(timeout=config.SSE_KEEPALIVE_SECONDS)
+            if subscriber.dropped != dropped:
+                dropped = subscriber.dropped
+                yield sse_message('snapshot', dashboard_snapshot())
+            if message is None:
+                yield ': keepalive\n\n'
+                continue
+            yield message
+    finally:
+        events.unsubscribe(subscriber)
 
 
 # ===== ROUTE'LAR =====
@@ -105,29 +264,66 @@ def index():
 @app.route('/video_feed')
 def video_feed():
     """
-    Video stream
+    Video stream (?profile=preview - kichik, ramkasiz; ramkalarni brauzer chizadi)
     """
-    return Response(generate_frames(),
+    profile = request.args.get('profile', 'full')
+    if profile not in SUBSCRIBER_KINDS or profile == 'detections':
+        return jsonify({'success': False, 'message': f"Noma'lum profil: {profile}"}), 400
+
+    return Response(generate_frames(profile),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
 
 
+@app.route('/api/detections/stream')
+def detections_stream():
+    """
+    Har bir kadr natijalari: track id, joy (top, right, bottom, left), ism, ishonch
+    """
+    return Response(generate_detections(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/events')
+def events_stream():
+    """
+    Dashboard uchun push kanali: snapshot, attendance, gallery, camera hodisalari
+    """
+    return Response(generate_events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @app.route('/api/status')
 def get_status():
     """
     Tizim holati haqida ma'lumot
     """
+    roster = face_system.gallery.roster
     status = {
-        'encodings_loaded': len(face_system.known_face_encodings) > 0,
-        'total_students': len(set(face_system.known_face_ids)),
-        'total_encodings': len(face_system.known_face_encodings),
+        'encodings_loaded': roster.total_encodings > 0,
+        'total_students': roster.total_students,
+        'total_encodings': roster.total_encodings,
+        'roster_etag': roster.etag,
         'camera_active': camera is not None and camera.isOpened(),
         'config': {
             'model': config.FACE_RECOGNITION_MODEL,
             'tolerance': config.FACE_MATCH_TOLERANCE,
             'frame_scale': config.FRAME_SCALE
-        }
+        },
+        'pipeline': face_system.pipeline_stats.snapshot(),
+        'quality': stream_quality.stats() if stream_quality is not None else None,
+        'attendance_writer': face_system.attendance.stats()
+        if isinstance(face_system.attendance, AttendanceWriter) else None,
+        'stream': stream_pipeline.stats() if stream_pipeline is not None else None,
+        'camera_pool': camera_pool.stats() if camera_pool is not None else None,
+        'events': events.stats(),
+        'sessions': session_log.stats() if session_log is not None else None,
+        'analytics': analytics.stats()
     }
-    return jsonify(status)
+
+    # Holat o'zgarmagan bo'lsa (masalan, stream yo'q paytda) - 304
+    response = jsonify(status)
+    response.add_etag()
+    return response.make_conditional(request)
 
 
 @app.route('/api/create_encodings', methods=['POST'])
@@ -156,28 +352,123 @@ def create_encodings():
         }), 500
 
 
+@app.route('/api/students/<student_id>', methods=['POST'])
+def enroll_student(student_id):
+    """
+    Yangi talabani dataset/<student_id>/ papkasidan qo'shish
+    (faqat shu talaba rasmlari encode qilinadi)
+    """
+    payload = request.get_json(silent=True) or {}
+
+    try:
+        count = face_system.add_student(student_id, name=payload.get('name'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 409
+
+    if count == 0:
+        return jsonify({
+            'success': False,
+            'message': 'Rasmlarda yuz topilmadi'
+        }), 400
+
+    return jsonify({
+        'success': True,
+        'student_id': student_id,
+        'added': count,
+        'total': len(face_system.known_face_encodings)
+    })
+
+
+@app.route('/api/students/<student_id>/photos', methods=['POST'])
+def upload_student_photos(student_id):
+    """
+    Talabaga rasm yuklash: rasmlar dataset/<student_id>/ ga saqlanadi
+    va faqat shu rasmlar encode qilinadi. Bir xil nomli rasm qayta
+    yuklansa, eski rasm encoding'lari yangisi bilan almashtiriladi.
+    """
+    # Papka nomi va galereya ID bir xil bo'lishi shart (list_student_images ham shu nomni oladi)
+    if not student_id or secure_filename(student_id) != student_id:
+        return jsonify({'success': False, 'message': f"Noto'g'ri talaba ID: {student_id}"}), 400
+
+    files = request.files.getlist('photos')
+    if not files:
+        return jsonify({'success': False, 'message': 'Rasm yuborilmadi'}), 400
+
+    uploads = []
+    for file in files:
+        filename = secure_filename(file.filename or '')
+        extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        if extension not in config.ALLOWED_IMAGE_EXTENSIONS:
+            return jsonify({'success': False, 'message': f'Ruxsat etilmagan format: {filename}'}), 400
+
+        data = file.read()
+        if len(data) > config.MAX_IMAGE_SIZE_MB * 1024 * 1024:
+            return jsonify({'success': False, 'message': f'Rasm juda katta: {filename}'}), 400
+        uploads.append((filename, data))
+
+    student_path = os.path.join(config.DATASET_DIR, student_id)
+    os.makedirs(student_path, exist_ok=True)
+    known = student_id in face_system.gallery.student_index
+
+    # Ustiga yoziladigan rasmlarning eski encoding'lari (keshdan) - yozishdan oldin
+    image_paths = [os.path.join(student_path, filename) for filename, _ in uploads]
+    overwritten = [path for path in image_paths if os.path.exists(path)]
+    replace = face_system.photo_encodings(overwritten) if known and overwritten else None
+
+    for image_path, (_, data) in zip(image_paths, uploads):
+        with open(image_path, 'wb') as f:
+            f.write(data)
+
+    try:
+        if known:
+            count = face_system.add_photos(student_id, image_paths, replace=replace)
+        else:
+            count = face_system.add_student(student_id, image_paths=image_paths)
+    except ValueError as e:
+        # Parallel so'rov talabani shu orada qo'shgan yoki o'chirgan
+        return jsonify({'success': False, 'message': str(e)}), 409
+
+    return jsonify({
+        'success': count > 0,
+        'student_id': student_id,
+        'added': count,
+        'replaced': len(overwritten),
+        'total': len(face_system.known_face_encodings)
+    }), (200 if count > 0 else 400)
+
+
+@app.route('/api/students/<student_id>', methods=['DELETE'])
+def delete_student(student_id):
+    """
+    Talabani galereyadan o'chirish
+    """
+    try:
+        removed = face_system.remove_student(student_id)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 404
+
+    return jsonify({
+        'success': True,
+        'student_id': student_id,
+        'removed': removed,
+        'total': len(face_system.known_face_encodings)
+    })
+
+
 @app.route('/api/attendance_today')
 def get_attendance_today():
     """
     Bugungi davomat ro'yxati
     """
-    import csv
     from datetime import date
 
     today = date.today().strftime(config.ATTENDANCE_DATE_FORMAT)
-    attendance_list = []
 
     try:
-        if os.path.exists(config.ATTENDANCE_FILE):
-            with open(config.ATTENDANCE_FILE, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row['Date'] == today:
-                        attendance_list.append({
-                            'student_id': row['Student_ID'],
-                            'name': row['Name'],
-                            'time': row['Time']
-                        })
+        attendance_list = [
+            {'student_id': student_id, 'name': name, 'time': time_str}
+            for student_id, name, time_str in face_system.attendance.today()
+        ]
 
         return jsonify({
             'success': True,
@@ -195,34 +486,89 @@ def get_attendance_today():
 @app.route('/api/students')
 def get_students():
     """
-    Barcha talabalar ro'yxati
+    Barcha talabalar ro'yxati (galereya o'zgarmasa - 304 Not Modified)
     """
-    students = []
-    seen = set()
+    global students_body
+    roster = face_system.gallery.roster
 
-    for i, student_id in enumerate(face_system.known_face_ids):
-        if student_id not in seen:
-            students.append({
-                'id': student_id,
-                'name': face_system.known_face_names[i],
-                'encodings_count': face_system.known_face_ids.count(student_id)
-            })
-            seen.add(student_id)
+    # Javob tanasi ham ro'yxat o'zgargandagina qayta yaratiladi
+    etag, body = students_body
+    if etag != roster.etag:
+        body = json.dumps({
+            'success': True,
+            'total': roster.total_students,
+            'students': roster.students
+        }, ensure_ascii=False)
+        students_body = (roster.etag, body)
+
+    response = Response(body, mimetype='application/json')
+    response.set_etag(roster.etag)
+    return response.make_conditional(request)
 
-    return jsonify({
-        'success': True,
-        'total': len(students),
-        'students': students
-    })
+
+def cached_json(cache, etag, build):
+    """
+    (etag, JSON matn) keshi: matn faqat etag o'zgarganda qayta yaratiladi
+    """
+    cached_etag, body = cache
+    if cached_etag != etag:
+        body = json.dumps(dict(build(), success=True), ensure_ascii=False)
+    return (etag, body)
+
+
+@app.route('/api/occupancy')
+def get_occupancy():
+    """
+    Hozir xonadagilar, kunlik cho'qqi va soatlik gistogrammalar (o'zgarmasa - 304)
+    """
+    global occupancy_body
+    occupancy_body = cached_json(occupancy_body, analytics.etag, analytics.occupancy)
+
+    etag, body = occupancy_body
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+@app.route('/api/dwell')
+def get_dwell():
+    """
+    Talabalarning o'tirish vaqti (?student_id=... - bitta talaba, ochiq sessiya hozirgacha)
+    """
+    global dwell_body
+    student_id = request.args.get('student_id')
+    if student_id:
+        entry = analytics.dwell_for(student_id)
+        if entry is None:
+            return jsonify({'success': False, 'message': f"Ma'lumot yo'q: {student_id}"}), 404
+        return jsonify(dict(entry, success=True))
+
+    dwell_body = cached_json(dwell_body, analytics.etag, analytics.dwell_all)
+
+    etag, body = dwell_body
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
 
 
 # ===== DASTURNI ISHGA TUSHIRISH =====
 
 def cleanup():
     """
-    Dastur yopilganda kamerani to'xtatish
+    Dastur yopilganda kamerani to'xtatish va davomatni diskka yozish
     """
     global camera
+    if camera_pool is not None:
+        camera_pool.stop()
+
+    # Navbatdagi davomat yozuvlari diskka tushiriladi (write-behind)
+    face_system.attendance.close()
+
+    # Ochiq sessiyalar hozirgi vaqt bilan yopiladi - to'xtab turgan vaqt o'tirish vaqtiga qo'shilmaydi
+    if session_log is not None:
+        session_log.close_all()
+        session_log.close()
+    analytics.close()
     if camera is not None:
         camera.release()
         print("🎥 Kamera to'xtatildi")
@@ -230,29 +576,39 @@ def cleanup():
 
 if __name__ == '__main__':
     import atexit
-    import os
 
     atexit.register(cleanup)
 
+    if session_log is not None:
+        threading.Thread(target=expire_sessions, daemon=True).start()
+
+    if config.USE_CAMERA_POOL and config.CAMERA_POOL_CAMERAS:
+        camera_pool = CameraPool(face_system, config.CAMERA_POOL_CAMERAS).start()
+        events.publish('camera', camera_status())
+
     print("\n" + "=" * 60)
     print("🚀 YUZNI TANIB OLISH TIZIMI ISHGA TUSHIRILDI")
     print("=" * 60)
     print(f"🌐 URL: http://localhost:{config.FLASK_PORT}")
-    print(f"📊 Talabalar soni: {len(set(face_system.known_face_ids))}")
+    print(f"📊 Talabalar soni: {face_system.gallery.roster.total_students}")
     print(f"🎯 Encoding'lar: {len(face_system.known_face_encodings)}")
     print("=" * 60)
 
     # Agar encoding'lar bo'lmasa, ogohlantirish
-    if not face_system.known_face_encodings:
+    if len(face_system.known_face_encodings) == 0:
         print("\n⚠️  DIQQAT: Encoding'lar topilmadi!")
         print("📝 Dataset papkasiga talabalar rasmlarini joylashtiring")
         print(f"📁 Dataset: {config.DATASET_DIR}")
         print("🔧 Keyin web interfacedan 'Create Encodings' tugmasini bosing")
         print()
 
+    # Reloader o'chiq: u ilovani ikkinchi (kuzatuvchi) jarayonda ham import qiladi -
+    # ikkala jarayon sessions.log ga yozib, analytics.json ni ustma-ust saqlab,
+    # cleanup'ni ikki marta bajarardi (seq to'qnashuvi, eskirgan checkpoint)
     app.run(
         host='0.0.0.0',
         port=config.FLASK_PORT,
         debug=config.FLASK_DEBUG,
+        use_reloader=False,
         threaded=True
     )
\ No newline at end of file
@@ -0,0 +1,795 @@
+"""
+DAVOMAT SAQLASH (KUNLIK INDEKS BILAN)
+
+Bugun qayd qilingan talabalar ID'lari xotirada (set) saqlanadi: takroriy
+tekshirish O(1) va CSV hajmiga bog'liq emas. CSV faqat oxiriga yoziladi
+(vaqt tartibida), shuning uchun bugungi qatorlar fayl oxiridan teskari
+o'qiladi - kechagi sanaga yetganda o'qish to'xtaydi.
+
+Yarim tunda (sana o'zgarganda) indeks yangi kun uchun qayta quriladi.
+
+AttendanceWriter (write-behind): mark() javobni darhol xotiradagi holatdan
+beradi, diskka yozish esa fon thread'ida guruhlab (group commit) bajariladi -
+disk sekinlashsa ham video oqimi to'xtamaydi.
+
+ATTENDANCE_BACKEND = 'daily' (standart): har bir kun - alohida fayl
+(ATTENDANCE_DIR/YYYY-MM-DD.csv). Bugungi fayl bayt offset'ini eslab qoladigan
+tail-reader bilan o'qiladi (faqat yangi qatorlar), o'tgan kunlar fayllari
+"muhrlanadi" (faqat o'qish) va o'zgarmas segment sifatida keshlanadi.
+
+ATTENDANCE_BACKEND = 'sqlite' bo'lsa davomat database/db_setup.py orqali
+umumiy SQLite bazaga yoziladi (ai_modules bilan bir xil sxema).
+"""
+import atexit
+import collections
+import csv
+import os
+import queue
+import stat
+import sys
+import threading
+import time
+from datetime import datetime
+import config
+
+ATTENDANCE_HEADER = ['Student_ID', 'Name', 'Date', 'Time']
+
+
+def read_lines_reversed(path, block_size=1 << 16):
+    """
+    Fayl qatorlarini oxiridan boshiga qarab o'qish (butun faylni o'qimasdan)
+
+    Yields:
+        str: qator (oxirgi qatordan boshlab)
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b''
+
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b'\n')
+
+            # Birinchi bo'lak to'liq bo'lmasligi mumkin - keyingi blok bilan qo'shiladi
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.rstrip(b'\r').decode('utf-8')
+
+        if remainder.strip():
+            yield remainder.rstrip(b'\r').decode('utf-8')
+
+
+class AttendanceStore:
+    """
+    Davomat CSV fayli + bugungi kun indeksi
+
+    Bir nechta stream bir vaqtda yozishi mumkin - lock bilan.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or config.ATTENDANCE_FILE
+        self._lock = threading.Lock()
+        self.date = None
+        self.today_ids = set()
+
+    def read_day(self, date_str):
+        """
+        Berilgan kun qatorlari (fayl oxiridan, sana eskirguncha o'qiladi)
+
+        Returns:
+            list: [(student_id, name, time), ...] vaqt tartibida
+        """
+        rows = []
+        if not os.path.exists(self.path):
+            return rows
+
+        day = datetime.strptime(date_str, config.ATTENDANCE_DATE_FORMAT).date()
+        for line in read_lines_reversed(self.path):
+            row = next(csv.reader([line]))
+            if len(row) < 4 or row == ATTENDANCE_HEADER:
+                continue
+            if row[2] == date_str:
+                rows.append((row[0], row[1], row[3]))
+                continue
+            try:
+                if datetime.strptime(row[2], config.ATTENDANCE_DATE_FORMAT).date() < day:
+                    break
+            except ValueError:
+                continue
+
+        rows.reverse()
+        return rows
+
+    def _rollover(self, date_str):
+        # Birinchi chaqiruv yoki yarim tun: yangi kun indeksi
+        if date_str != self.date:
+            self.today_ids = {row[0] for row in self.read_day(date_str)}
+            self.date = date_str
+
+    def is_marked(self, student_id, now=None):
+        date_str = (now or datetime.now()).strftime(config.ATTENDANCE_DATE_FORMAT)
+        with self._lock:
+            self._rollover(date_str)
+            return student_id in self.today_ids
+
+    def today_count(self):
+        date_str = datetime.now().strftime(config.ATTENDANCE_DATE_FORMAT)
+        with self._lock:
+            self._rollover(date_str)
+            return len(self.today_ids)
+
+    def today(self):
+        """
+        Bugungi yozuvlar: [(student_id, name, time), ...]
+        """
+        return self.read_day(datetime.now().strftime(config.ATTENDANCE_DATE_FORMAT))
+
+    def mark(self, student_id, student_name, now=None):
+        """
+        Davomat yozish
+
+        Returns:
+            tuple: (yozildimi, sana, vaqt) - bugun allaqachon bo'lsa yozilmaydi
+        """
+        now = now or datetime.now()
+        date_str = now.strftime(config.ATTENDANCE_DATE_FORMAT)
+        time_str = now.strftime(config.ATTENDANCE_TIME_FORMAT)
+
+        with self._lock:
+            self._rollover(date_str)
+            if config.UNIQUE_ATTENDANCE_PER_DAY and student_id in self.today_ids:
+                return False, date_str, time_str
+
+            self._append([(student_id, student_name, date_str, time_str)])
+            self.today_ids.add(student_id)
+            return True, date_str, time_str
+
+    def write_batch(self, rows, durable=True):
+        """
+        Bir nechta yozuvni bitta ochish bilan yozish (group commit)
+
+        Args:
+            rows: [(student_id, name, date, time), ...] - takrorlar oldindan tekshirilgan
+            durable: True bo'lsa fsync (diskka tushguncha kutiladi)
+        """
+        with self._lock:
+            self._append(rows, durable)
+            for student_id, _, date_str, _ in rows:
+                if date_str == self.date:
+                    self.today_ids.add(student_id)
+
+    def _append(self, rows, durable=False):
+        file_exists = os.path.exists(self.path)
+        with open(self.path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+
+            # Header yozish (agar yangi fayl bo'lsa)
+            if not file_exists:
+                writer.writerow(ATTENDANCE_HEADER)
+
+            writer.writerows(rows)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def close(self):
+        pass
+
+
+# ===== KUNLIK FAYLLAR =====
+
+def parse_rows(lines):
+    """
+    CSV qatorlari -> [(student_id, name, time), ...] (header tashlanadi)
+    """
+    rows = []
+    for row in csv.reader(lines):
+        if len(row) < 4 or row == ATTENDANCE_HEADER:
+            continue
+        rows.append((row[0], row[1], row[3]))
+    return rows
+
+
+def parse_day(date_str):
+    """
+    Returns:
+        date yoki None (sana emas)
+    """
+    try:
+        return datetime.strptime(date_str, config.ATTENDANCE_DATE_FORMAT).date()
+    except ValueError:
+        return None
+
+
+def is_sealed(path):
+    return not os.stat(path).st_mode & stat.S_IWUSR
+
+
+def seal(path):
+    """
+    O'tgan kun faylini faqat o'qish uchun qilish (o'zgarmas segment)
+    """
+    os.chmod(path, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+
+
+def unseal(path):
+    os.chmod(path, stat.S_IREAD | stat.S_IWRITE | stat.S_IRGRP | stat.S_IROTH)
+
+
+def split_legacy_file(legacy_path, directory):
+    """
+    Bitta attendance.csv ni kunlik fayllarga ajratish (bir marta, ko'chirishda)
+
+    Returns:
+        int: ko'chirilgan qatorlar soni
+    """
+    by_day = collections.defaultdict(list)
+    with open(legacy_path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 4 or row == ATTENDANCE_HEADER:
+                continue
+            by_day[row[2]].append(row)
+
+    for date_str, rows in by_day.items():
+        with open(os.path.join(directory, f"{date_str}.csv"), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(ATTENDANCE_HEADER)
+            writer.writerows(rows)
+
+    return sum(len(rows) for rows in by_day.values())
+
+
+class DailyAttendanceStore:
+    """
+    Har bir kun - alohida CSV fayl. So'rov narxi faqat bugungi yozuvlar soniga bog'liq.
+    """
+
+    def __init__(self, directory=None, legacy_path=None):
+        self.directory = directory or config.ATTENDANCE_DIR
+        self._lock = threading.Lock()
+        self.date = None
+        self.today_rows = []
+        self.today_ids = set()
+        self._offset = 0
+        # Shu sanadan oldingi kunlar muhrlangan (yozishdagi _rollover)
+        self._sealed_before = None
+
+        # O'tgan kunlar: date -> rows (LRU)
+        self._segments = collections.OrderedDict()
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+            legacy_path = legacy_path or config.ATTENDANCE_FILE
+            if os.path.exists(legacy_path):
+                count = split_legacy_file(legacy_path, self.directory)
+                os.replace(legacy_path, legacy_path + '.migrated')
+                print(f"🔄 {legacy_path} kunlik fayllarga ko'chirildi ({count} ta yozuv)")
+
+    def day_path(self, date_str):
+        return os.path.join(self.directory, f"{date_str}.csv")
+
+    # ===== BUGUNGI KUN (TAIL-READER) =====
+
+    @staticmethod
+    def _today():
+        return datetime.now().strftime(config.ATTENDANCE_DATE_FORMAT)
+
+    def _activate(self, date_str):
+        """
+        Faol (tail-reader) kunni almashtirish - faqat xotirada, diskka tegilmaydi
+        """
+        if date_str != self.date:
+            self.date = date_str
+            self.today_rows = []
+            self.today_ids = set()
+            self._offset = 0
+        self._refresh()
+
+    def _rollover(self, date_str):
+        """
+        Bugungi kunga yozish: o'tgan kunlar muhrlanadi (kuniga bir marta).
+        Faqat yozishda chaqiriladi - o'qishlar fayllarga tegmaydi.
+        """
+        if date_str != self._sealed_before:
+            # O'tgan kunlar muhrlanadi (birinchi ishga tushishda ham)
+            day = parse_day(date_str)
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                file_day = parse_day(name[:-4]) if name.endswith('.csv') else None
+                if file_day is not None and file_day < day and not is_sealed(path):
+                    seal(path)
+            self._sealed_before = date_str
+        self._activate(date_str)
+
+    def _current(self, date_str):
+        """
+        Faol kun yoki bugun bo'lsa - tail-reader (True); boshqa kunlar uni almashtirmaydi
+        """
+        if date_str == self.date or date_str == self._today():
+            self._activate(date_str)
+            return True
+        return False
+
+    def _refresh(self):
+        """
+        Bugungi faylning faqat oxirgi o'qishdan keyingi to'liq qatorlarini o'qish
+        """
+        path = self.day_path(self.date)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        if size <= self._offset:
+            return
+
+        with open(path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+
+        # Oxirgi (hali yozilayotgan) to'liq bo'lmagan qator keyingi safar o'qiladi
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return
+
+        rows = parse_rows(data[:end].decode('utf-8').splitlines())
+        self.today_rows.extend(rows)
+        self.today_ids.update(row[0] for row in rows)
+        self._offset += end
+
+    def is_marked(self, student_id, now=None):
+        date_str = (now or datetime.now()).strftime(config.ATTENDANCE_DATE_FORMAT)
+        with self._lock:
+            if self._current(date_str):
+                return student_id in self.today_ids
+        return any(row[0] == student_id for row in self.read_day(date_str))
+
+    def today_count(self):
+        with self._lock:
+            self._current(self._today())
+            return len(self.today_ids)
+
+    def today(self):
+        return self.read_day(self._today())
+
+    # ===== O'TGAN KUNLAR (O'ZGARMAS SEGMENTLAR) =====
+
+    def _read_file(self, date_str):
+        path = self.day_path(date_str)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return parse_rows(f)
+
+    def read_day(self, date_str):
+        """
+        Nojo'ya ta'sirsiz o'qish: faol kun almashmaydi, fayllar muhrlanmaydi
+
+        Returns:
+            list: [(student_id, name, time), ...] vaqt tartibida
+        """
+        with self._lock:
+            if self._current(date_str):
+                return list(self.today_rows)
+
+            rows = self._segments.get(date_str)
+            if rows is not None:
+                self._segments.move_to_end(date_str)
+                return list(rows)
+
+        rows = self._read_file(date_str)
+
+        # Faqat o'tgan kunlar keshlanadi (kelajakdagi sana fayli hali o'zgarishi mumkin)
+        day = parse_day(date_str)
+        if day is not None and day < parse_day(self._today()):
+            with self._lock:
+                self._segments[date_str] = tuple(rows)
+                while len(self._segments) > config.ATTENDANCE_SEGMENT_CACHE:
+                    self._segments.popitem(last=False)
+        return rows
+
+    # ===== YOZISH =====
+
+    def mark(self, student_id, student_name, now=None):
+        """
+        Returns:
+            tuple: (yozildimi, sana, vaqt) - bugun allaqachon bo'lsa yozilmaydi
+        """
+        now = now or datetime.now()
+        date_str = now.strftime(config.ATTENDANCE_DATE_FORMAT)
+        time_str = now.strftime(config.ATTENDANCE_TIME_FORMAT)
+
+        with self._lock:
+            if date_str == self._today():
+                self._rollover(date_str)
+            if date_str == self.date:
+                marked_ids = self.today_ids
+            else:
+                marked_ids = {row[0] for row in self._read_file(date_str)}
+            if config.UNIQUE_ATTENDANCE_PER_DAY and student_id in marked_ids:
+                return False, date_str, time_str
+
+            self._append(date_str, [(student_id, student_name, date_str, time_str)])
+            if date_str == self.date:
+                self._refresh()
+            return True, date_str, time_str
+
+    def write_batch(self, rows, durable=True):
+        """
+        Guruhlab yozish: har bir kun fayliga bitta ochish (yarim tun atrofida 2 ta)
+        """
+        by_day = collections.defaultdict(list)
+        for row in rows:
+            by_day[row[2]].append(row)
+
+        with self._lock:
+            today = self._today()
+            if today in by_day:
+                self._rollover(today)
+            for date_str, day_rows in by_day.items():
+                self._append(date_str, day_rows, durable)
+            if self.date is not None:
+                self._refresh()
+
+    def _append(self, date_str, rows, durable=False):
+        path = self.day_path(date_str)
+        file_exists = os.path.exists(path)
+
+        # Kechikib kelgan (yarim tundan oldingi) yozuv muhrlangan faylga
+        sealed = file_exists and is_sealed(path)
+        if sealed:
+            unseal(path)
+        self._segments.pop(date_str, None)
+
+        try:
+            with open(path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if not file_exists:
+                    writer.writerow(ATTENDANCE_HEADER)
+                writer.writerows(rows)
+                if durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+        finally:
+            if sealed:
+                seal(path)
+
+    def close(self):
+        pass
+
+
+class SQLiteAttendanceStore:
+    """
+    SQLite (WAL) davomat: takror (date, student_id) UNIQUE indeksi bilan rad etiladi.
+    Har bir thread o'z ulanishini qayta ishlatadi (db_setup.get_connection).
+    """
+
+    def __init__(self, path=None):
+        # database/ paketi loyiha ildizida (ai_modules bilan umumiy)
+        if config.PROJECT_ROOT not in sys.path:
+            sys.path.append(config.PROJECT_ROOT)
+        from database import db_setup
+
+        if not config.UNIQUE_ATTENDANCE_PER_DAY:
+            print("⚠️  SQLite davomat: har doim kuniga bitta yozuv (UNIQUE_ATTENDANCE_PER_DAY e'tiborsiz)")
+
+        self.db = db_setup
+        self.path = path or config.ATTENDANCE_DB_FILE
+        self.db.init_db(self.path)
+
+    def is_marked(self, student_id, now=None):
+        date_str = (now or datetime.now()).strftime(config.ATTENDANCE_DATE_FORMAT)
+        return self.db.is_marked(student_id, date_str, self.path)
+
+    def today_count(self):
+        date_str = datetime.now().strftime(config.ATTENDANCE_DATE_FORMAT)
+        return self.db.count_for_date(date_str, self.path)
+
+    def read_day(self, date_str):
+        return self.db.rows_for_date(date_str, self.path)
+
+    def today(self):
+        return self.read_day(datetime.now().strftime(config.ATTENDANCE_DATE_FORMAT))
+
+    def mark(self, student_id, student_name, now=None):
+        """
+        Returns:
+            tuple: (yozildimi, sana, vaqt)
+        """
+        now = now or datetime.now()
+        date_str = now.strftime(config.ATTENDANCE_DATE_FORMAT)
+        time_str = now.strftime(config.ATTENDANCE_TIME_FORMAT)
+        marked = self.db.mark_attendance(student_id, student_name, date_str, time_str, self.path)
+        return marked, date_str, time_str
+
+    def write_batch(self, rows, durable=True):
+        """
+        Bitta tranzaksiyada yozish (group commit); takrorlar UNIQUE indeks bilan rad etiladi
+        """
+        self.db.mark_many(rows, self.path)
+
+    def close(self):
+        # Faqat joriy thread ulanishi (boshqa thread'lar o'zinikini yopadi)
+        self.db.close_connection(self.path)
+
+
+class AttendanceWriter:
+    """
+    Write-behind davomat: mark() xotiradagi bugungi holat bo'yicha darhol javob
+    beradi va yozuvni navbatga qo'yadi. Fon thread'i navbatni
+    ATTENDANCE_BATCH_SIZE yoki ATTENDANCE_FLUSH_SECONDS bo'yicha guruhlab yozadi.
+
+    Dastur yopilishida close() chaqiriladi - navbat diskka tushiriladi
+    (chaqirilmasa atexit orqali).
+    Yozish xato bersa, qayta urinish oralig'i ikki baravardan oshadi; yopilishda
+    ham yozilmagan yozuvlar pending faylga saqlanib, keyingi ishga tushishda yoziladi.
+    flush()/close() yozuvlar omborga tushmagan bo'lsa False qaytaradi.
+    """
+
+    def __init__(self, store, batch_size=None, flush_seconds=None, pending_path=None):
+        self.store = store
+        self.batch_size = batch_size or config.ATTENDANCE_BATCH_SIZE
+        self.flush_seconds = flush_seconds or config.ATTENDANCE_FLUSH_SECONDS
+        self.pending_path = pending_path or \
+            (getattr(store, 'path', None) or store.directory).rstrip(os.sep) + '.pending'
+
+        self._lock = threading.Lock()
+        self.date = None
+        self.today_rows = []
+        self.today_ids = set()
+
+        self._queue = queue.Queue()
+        self._closed = False
+
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.max_batch = 0
+        self.errors = 0
+        self.spilled = 0
+        self.flush_ms_total = 0.0
+        self.flush_ms_max = 0.0
+        self.write_ms_total = 0.0
+
+        # Xatodan keyin: keyingi urinish vaqti (monotonic) va kutish oralig'i
+        self._retry_at = None
+        self._backoff = self.flush_seconds
+        self._pending = self._recover_pending()
+
+        self._thread = threading.Thread(target=self._run, name='attendance-writer', daemon=True)
+        self._thread.start()
+
+        # Zaxira: close() chaqirmagan kirish nuqtalarida ham navbat chiqishda yoziladi
+        # (daemon thread - aks holda oxirgi yozuvlar yo'qoladi)
+        atexit.register(self.close)
+
+    # ===== XOTIRADAGI HOLAT =====
+
+    def _rollover(self, date_str):
+        if date_str != self.date:
+            # Yangi kun: diskdagi yozuvlar (navbatdagilar faqat joriy kunga tegishli)
+            self.today_rows = list(self.store.read_day(date_str))
+            self.today_ids = {row[0] for row in self.today_rows}
+            self.date = date_str
+
+    def is_marked(self, student_id, now=None):
+        date_str = (now or datetime.now()).strftime(config.ATTENDANCE_DATE_FORMAT)
+        with self._lock:
+            self._rollover(date_str)
+            return student_id in self.today_ids
+
+    def today_count(self):
+        date_str = datetime.now().strftime(config.ATTENDANCE_DATE_FORMAT)
+        with self._lock:
+            self._rollover(date_str)
+            return len(self.today_ids)
+
+    def today(self):
+        """
+        Bugungi yozuvlar (hali diskka yozilmaganlari ham)
+        """
+        date_str = datetime.now().strftime(config.ATTENDANCE_DATE_FORMAT)
+        with self._lock:
+            self._rollover(date_str)
+            return list(self.today_rows)
+
+    def mark(self, student_id, student_name, now=None):
+        """
+        Returns:
+            tuple: (qabul qilindimi, sana, vaqt) - disk I/O kutilmaydi
+        """
+        now = now or datetime.now()
+        date_str = now.strftime(config.ATTENDANCE_DATE_FORMAT)
+        time_str = now.strftime(config.ATTENDANCE_TIME_FORMAT)
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("AttendanceWriter yopilgan")
+            self._rollover(date_str)
+            if config.UNIQUE_ATTENDANCE_PER_DAY and student_id in self.today_ids:
+                return False, date_str, time_str
+
+            self.today_ids.add(student_id)
+            self.today_rows.append((student_id, student_name, time_str))
+            self.enqueued += 1
+            self._queue.put(((student_id, student_name, date_str, time_str), time.monotonic()))
+
+        return True, date_str, time_str
+
+    # ===== FON YOZUVCHI =====
+
+    def _recover_pending(self):
+        """
+        Oldingi ishga tushishda yozilmay qolgan (pending faylga saqlangan) yozuvlar
+
+        Returns:
+            list: hali yozilmaganlar - fon thread'i birinchi navbatda yozadi
+        """
+        if not os.path.exists(self.pending_path):
+            return []
+        with open(self.pending_path, 'r', encoding='utf-8', newline='') as f:
+            rows = [tuple(row) for row in csv.reader(f) if len(row) == 4]
+
+        try:
+            if rows:
+                self.store.write_batch(rows)
+        except Exception as e:
+            print(f"⚠️  Saqlangan {len(rows)} ta davomat yozuvi hali yozilmadi: {e}")
+            self.enqueued += len(rows)
+            now = time.monotonic()
+            return [(row, now) for row in rows]
+
+        os.remove(self.pending_path)
+        if rows:
+            print(f"♻️  Oldin yozilmay qolgan {len(rows)} ta davomat yozuvi tiklandi")
+        return []
+
+    def _spill(self, batch):
+        """
+        Yopilishda ham yozilmagan yozuvlarni pending faylga saqlash (tmp + os.replace)
+        """
+        tmp_path = self.pending_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                csv.writer(f).writerows(row for row, _ in batch)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.pending_path)
+        except OSError as e:
+            print(f"❌ {len(batch)} ta davomat yozuvi saqlanmadi: {e}")
+            return
+        self.spilled = len(batch)
+        print(f"💾 {len(batch)} ta yozilmagan davomat yozuvi {self.pending_path} ga saqlandi "
+              f"(keyingi ishga tushishda yoziladi)")
+
+    def _run(self):
+        batch = self._pending
+        self._pending = []
+        while True:
+            timeout = None
+            if batch:
+                # Xatodan keyin - backoff muddati, aks holda eng eski yozuv + flush_seconds
+                due = self._retry_at if self._retry_at is not None else batch[0][1] + self.flush_seconds
+                timeout = max(0.0, due - time.monotonic())
+
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is None or isinstance(item, threading.Event):
+                # Vaqt bo'yicha yoki majburiy (flush/close) yozish
+                batch = self._commit(batch)
+                if item is not None:
+                    closing = self._closed and self._queue.empty()
+                    if batch and closing:
+                        self._spill(batch)
+                    item.ok = not batch
+                    item.set()
+                    if closing:
+                        # Ulanish shu thread'niki (SQLite) - shu yerda yopiladi
+                        self.store.close()
+                        return
+                continue
+
+            batch.append(item)
+            # Backoff paytida har yangi yozuv qayta urinishga sabab bo'lmaydi
+            if len(batch) >= self.batch_size and self._retry_at is None:
+                batch = self._commit(batch)
+
+    def _commit(self, batch):
+        """
+        Returns:
+            list: yozilmay qolgan yozuvlar (xatolik bo'lsa - keyinroq qayta urinish)
+        """
+        if not batch:
+            return batch
+
+        start = time.monotonic()
+        try:
+            self.store.write_batch([row for row, _ in batch])
+        except Exception as e:
+            self.errors += 1
+            print(f"❌ Davomat yozishda xatolik ({len(batch)} ta navbatda, "
+                  f"{self._backoff:.0f} s dan keyin qayta uriniladi): {e}")
+            self._retry_at = time.monotonic() + self._backoff
+            self._backoff = min(self._backoff * 2, config.ATTENDANCE_RETRY_MAX_SECONDS)
+            return batch
+
+        self._retry_at = None
+        self._backoff = self.flush_seconds
+        if os.path.exists(self.pending_path):
+            os.remove(self.pending_path)
+
+        now = time.monotonic()
+        flush_ms = (now - batch[0][1]) * 1000
+        self.batches += 1
+        self.written += len(batch)
+        self.max_batch = max(self.max_batch, len(batch))
+        self.write_ms_total += (now - start) * 1000
+        self.flush_ms_total += flush_ms
+        self.flush_ms_max = max(self.flush_ms_max, flush_ms)
+        return []
+
+    def flush(self, timeout=None):
+        """
+        Navbatdagi barcha yozuvlar diskka tushishini kutish
+
+        Returns:
+            bool: vaqtida tugadimi va hammasi omborga yozildimi
+        """
+        done = threading.Event()
+        done.ok = False
+        self._queue.put(done)
+        return done.wait(timeout) and done.ok
+
+    def close(self, timeout=10.0):
+        """
+        Yangi yozuvlarni to'xtatib, navbatni diskka tushirish (cleanup/atexit)
+        """
+        with self._lock:
+            if self._closed:
+                return True
+            self._closed = True
+        flushed = self.flush(timeout)
+        self._thread.join(timeout)
+        lost = self.enqueued - self.written - self.spilled
+        if lost > 0:
+            print(f"⚠️  {lost} ta davomat yozuvi diskka yozilmadi!")
+        return flushed
+
+    def stats(self):
+        return {
+            'queue_depth': self._queue.qsize(),
+            'pending': self.enqueued - self.written,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'batches': self.batches,
+            'avg_batch': round(self.written / self.batches, 2) if self.batches else 0.0,
+            'max_batch': self.max_batch,
+            'avg_flush_ms': round(self.flush_ms_total / self.batches, 2) if self.batches else 0.0,
+            'max_flush_ms': round(self.flush_ms_max, 2),
+            'avg_write_ms': round(self.write_ms_total / self.batches, 2) if self.batches else 0.0,
+            'errors': self.errors,
+            'retry_in': round(max(0.0, self._retry_at - time.monotonic()), 1) if self._retry_at else 0.0
+        }
+
+
+ATTENDANCE_BACKENDS = {
+    'daily': DailyAttendanceStore,
+    'csv': AttendanceStore,
+    'sqlite': SQLiteAttendanceStore,
+}
+
+
+def create_attendance_store(backend=None, path=None):
+    """
+    config.ATTENDANCE_BACKEND bo'yicha davomat ombori
+    """
+    backend = backend or config.ATTENDANCE_BACKEND
+    if backend not in ATTENDANCE_BACKENDS:
+        raise ValueError(f"Noma'lum davomat backend: {backend} (mavjud: {', '.join(ATTENDANCE_BACKENDS)})")
+    return ATTENDANCE_BACKENDS[backend](path)
@@ -0,0 +1,413 @@
+"""
+TEZLIK O'LCHOVLARI (BENCHMARK)
+
+Ishlatish:
+    python benchmark.py recall                   # saqlangan galereya bo'yicha
+    python benchmark.py recall --synthetic 100000
+    python benchmark.py enroll --limit 200       # serial vs parallel encoding
+    python benchmark.py pool --source video.mp4 --cameras 4 --workers 1 2 4
+    python benchmark.py attendance --rows 0 100000 1000000
+    python benchmark.py writers --threads 1 4 16     # CSV vs SQLite, parallel yozuvchilar
+    python benchmark.py sessions --present 100 500 2000  # ketishni aniqlash (kadr narxi)
+"""
+import argparse
+import csv
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import config
+from attendance_store import (
+    ATTENDANCE_HEADER, AttendanceStore, AttendanceWriter, DailyAttendanceStore,
+    create_attendance_store
+)
+from camera_pool import CameraPool
+from session_log import SessionLog
+from face_recognition_system import (
+    FaceRecognitionSystem, encode_image, encode_images_parallel, list_student_images
+)
+from gallery import ENCODING_DIM, Gallery, recall_report
+
+
+def synthetic_gallery(num_students, per_student, seed=0):
+    """
+    Sinov uchun sun'iy galereya: har bir talaba atrofida bir nechta encoding
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(0, 0.3, (num_students, ENCODING_DIM)).astype(np.float32)
+    labels = np.repeat(np.arange(num_students, dtype=np.int32), per_student)
+    matrix = centers[labels] + rng.normal(0, 0.03, (len(labels), ENCODING_DIM)).astype(np.float32)
+    return np.ascontiguousarray(matrix, dtype=np.float32), labels
+
+
+def load_gallery(args):
+    """
+    --synthetic bo'lsa sun'iy, aks holda saqlangan galereyani qaytaradi
+    """
+    if args.synthetic:
+        matrix, labels = synthetic_gallery(args.synthetic // args.per_student, args.per_student)
+    else:
+        system = FaceRecognitionSystem()
+        matrix, labels = system.gallery_matrix, system.gallery_labels
+    return matrix, np.einsum('ij,ij->i', matrix, matrix), labels
+
+
+def bench_recall(args):
+    """
+    IVF recall'ni aniq qidiruvga nisbatan o'lchash
+    """
+    matrix, sq_norms, labels = load_gallery(args)
+    if len(matrix) == 0:
+        print("❌ Galereya bo'sh!")
+        return
+
+    # Probe'lar: galereyadagi tasodifiy encoding'lar + shovqin
+    rng = np.random.default_rng(1)
+    rows = rng.integers(0, len(matrix), args.probes)
+    probes = matrix[rows] + rng.normal(0, 0.03, (len(rows), matrix.shape[1])).astype(np.float32)
+
+    recall_report(matrix, sq_norms, labels, probes, args.nprobe, num_lists=args.lists)
+
+
+def bench_enroll(args):
+    """
+    Dataset rasmlarini encode qilish tezligi (rasm/s): serial va parallel.
+    Kesh ishlatilmaydi - har bir rasm haqiqatan encode qilinadi.
+    """
+    if not os.path.isdir(config.DATASET_DIR):
+        print(f"❌ Dataset papkasi topilmadi: {config.DATASET_DIR}")
+        return
+
+    image_paths = []
+    for student_id in sorted(os.listdir(config.DATASET_DIR)):
+        image_paths.extend(list_student_images(student_id))
+    image_paths = image_paths[:args.limit] if args.limit else image_paths
+    if not image_paths:
+        print("❌ Dataset bo'sh!")
+        return
+
+    print(f"🖼️  {len(image_paths)} ta rasm")
+
+    start = time.perf_counter()
+    serial = [encode_image(path) for path in image_paths]
+    serial_rate = len(image_paths) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    parallel = encode_images_parallel(image_paths, workers=args.workers, chunk_size=args.chunk_size)
+    parallel_rate = len(image_paths) / (time.perf_counter() - start)
+
+    same = sum((a is None) == (b is None) for a, b in zip(serial, parallel))
+    print(f"📊 Serial:   {serial_rate:.2f} rasm/s")
+    print(f"📊 Parallel: {parallel_rate:.2f} rasm/s (x{parallel_rate / serial_rate:.2f})")
+    print(f"📊 Natijalar mosligi: {same}/{len(image_paths)}")
+
+
+def bench_pool(args):
+    """
+    Camera pool o'tkazuvchanligi (jami kadr/s) worker soniga qarab.
+    Har bir "kamera" - bir xil video fayl, uzluksiz aylantiriladi.
+    """
+    if args.synthetic:
+        matrix, _, labels = load_gallery(args)
+        face_system = FaceRecognitionSystem(load=False)
+        ids = [f"S{i:06d}" for i in range(int(labels.max()) + 1)]
+        face_system.gallery = Gallery(matrix, labels, ids, ids)
+    else:
+        face_system = FaceRecognitionSystem()
+
+    cameras = {f"cam{i}": {'source': args.source, 'loop': True} for i in range(args.cameras)}
+    overrides = {'USE_MOTION_GATE': not args.no_motion_gate, 'PROCESS_EVERY_N_FRAMES': 1,
+                 'USE_QUALITY_CONTROLLER': False, 'CAMERA_POOL_STATS_SECONDS': 0.5}
+    print(f"🎥 {args.cameras} ta kamera, {len(face_system.gallery.matrix)} ta encoding")
+
+    baseline = None
+    for workers in args.workers:
+        pool = CameraPool(face_system, cameras=cameras, num_workers=workers,
+                          on_attendance=lambda *event: None, overrides=overrides).start()
+        # Worker'lar ishga tushishi (import, kamera ochish) o'lchovga kirmaydi
+        time.sleep(args.warmup)
+        first = pool.stats()['processed_frames']
+        start = time.perf_counter()
+        time.sleep(args.seconds)
+        pool.stop()
+        rate = (pool.stats()['processed_frames'] - first) / (time.perf_counter() - start)
+
+        baseline = baseline or rate
+        print(f"📊 {pool.num_workers} worker: {rate:.1f} kadr/s (x{rate / baseline:.2f})")
+
+
+def write_attendance_history(path, rows, per_day=500):
+    """
+    Sun'iy tarix: o'tgan kunlar bo'yicha `rows` ta qator (bugungi qatorlarsiz)
+    """
+    today = datetime.now()
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(ATTENDANCE_HEADER)
+        days = max(1, rows // per_day)
+        for i in range(rows):
+            day = today - timedelta(days=days - i // per_day)
+            writer.writerow([f"S{i % per_day:06d}", f"Talaba {i % per_day}",
+                             day.strftime(config.ATTENDANCE_DATE_FORMAT), '09:00:00'])
+
+
+def legacy_mark(path, student_id, date_str):
+    """
+    Eski usul: har bir yozishda butun CSV'ni o'qib takrorni qidirish
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if len(row) >= 3 and row[0] == student_id and row[2] == date_str:
+                return False
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerow([student_id, student_id, date_str, '09:00:00'])
+    return True
+
+
+def legacy_today(path, date_str):
+    """
+    Eski /api/attendance_today: butun CSV DictReader bilan o'qiladi
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [row for row in csv.DictReader(f) if row['Date'] == date_str]
+
+
+def bench_attendance(args):
+    """
+    Bitta davomat yozish va bugungi ro'yxatni olish vaqti (ms) tarixdagi qatorlar soniga qarab
+    """
+    date_str = datetime.now().strftime(config.ATTENDANCE_DATE_FORMAT)
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = os.path.join(tmp, f"attendance_{rows}.csv")
+            write_attendance_history(path, rows)
+
+            legacy = ''
+            if args.legacy_marks:
+                start = time.perf_counter()
+                legacy_today(path, date_str)
+                today_ms = (time.perf_counter() - start) * 1000
+                start = time.perf_counter()
+                for i in range(args.legacy_marks):
+                    legacy_mark(path, f"L{i:06d}", date_str)
+                legacy_ms = (time.perf_counter() - start) * 1000 / args.legacy_marks
+                legacy = f" | eski usul: yozish {legacy_ms:.3f} ms, bugungi ro'yxat {today_ms:.1f} ms"
+
+            if args.backend == 'daily':
+                # Tarix kunlik fayllarga ko'chiriladi (birinchi ishga tushishdagidek)
+                store = DailyAttendanceStore(os.path.join(tmp, f"daily_{rows}"), legacy_path=path)
+            else:
+                store = AttendanceStore(path)
+
+            start = time.perf_counter()
+            store.is_marked('warmup')
+            load_ms = (time.perf_counter() - start) * 1000
+
+            # Yarmi yangi, yarmi takroriy yozish
+            start = time.perf_counter()
+            for i in range(args.marks):
+                store.mark(f"N{i % (args.marks // 2 or 1):06d}", "Talaba")
+            store_ms = (time.perf_counter() - start) * 1000 / args.marks
+
+            start = time.perf_counter()
+            for _ in range(args.reads):
+                store.today()
+            read_ms = (time.perf_counter() - start) * 1000 / args.reads
+
+            print(f"📊 {rows:>9} qator: yuklash {load_ms:.1f} ms, yozish {store_ms:.3f} ms, "
+                  f"bugungi ro'yxat {read_ms:.3f} ms{legacy}")
+
+
+def bench_writers(args):
+    """
+    Bir vaqtda yozayotgan thread'lar: umumiy yozish tezligi va takrorlar tekshiruvi.
+    Har bir thread bir xil talabalarni yozadi - faqat birinchisi qabul qilinishi kerak.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            for threads in args.threads:
+                suffix = {'sqlite': '.db', 'csv': '.csv'}.get(backend, '')
+                path = os.path.join(tmp, f"{backend}_{threads}{suffix}")
+                if backend == 'csv':
+                    write_attendance_history(path, args.rows)
+                store = create_attendance_store(backend, path)
+                if args.write_behind:
+                    store = AttendanceWriter(store)
+                store.is_marked('warmup')
+
+                accepted = []
+
+                def writer(offset):
+                    count = 0
+                    for i in range(args.marks):
+                        # Yarmi umumiy (takror), yarmi thread'ning o'z talabalari
+                        student_id = f"S{i:06d}" if i % 2 else f"T{offset}_{i:06d}"
+                        marked, _, _ = store.mark(student_id, "Talaba")
+                        count += marked
+                    accepted.append(count)
+
+                workers = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+                start = time.perf_counter()
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                mark_elapsed = time.perf_counter() - start
+                if args.write_behind:
+                    # Diskka tushguncha bo'lgan vaqt ham hisobga olinadi
+                    store.close()
+                elapsed = time.perf_counter() - start
+
+                expected = threads * (args.marks // 2) + args.marks // 2
+                rate = threads * args.marks / elapsed
+                status = "✅" if sum(accepted) == expected else f"❌ ({sum(accepted)} != {expected})"
+                mark_us = mark_elapsed * 1e6 / (threads * args.marks)
+                print(f"📊 {backend:>6}, {threads:>2} thread: {rate:,.0f} yozish/s, "
+                      f"mark() {mark_us:.1f} µs, takrorsiz: {status}")
+                if args.write_behind:
+                    stats = store.stats()
+                    print(f"   batch: o'rtacha {stats['avg_batch']}, maks {stats['max_batch']}, "
+                          f"flush {stats['avg_flush_ms']} ms (maks {stats['max_flush_ms']} ms)")
+
+
+def sighting_schedule(present, visible, frames, leave_ratio):
+    """
+    Sun'iy ma'ruza: har kadrda `visible` ta yuz navbat bilan ko'rinadi,
+    yarim vaqtdan keyin `leave_ratio` qismi chiqib ketadi (boshqa ko'rinmaydi)
+
+    Yields:
+        list: shu kadrda ko'ringan ID'lar
+    """
+    ids = [f"S{i:05d}" for i in range(present)]
+    staying = ids[int(present * leave_ratio):]
+    for frame in range(frames):
+        group = ids if frame < frames // 2 else staying
+        start = frame * visible
+        yield [group[(start + j) % len(group)] for j in range(min(visible, len(group)))]
+
+
+def legacy_sessions(schedule, fps, timeout):
+    """
+    Eski usul: har kadrda datetime va barcha ochiq sessiyalarni ko'rib chiqish
+    """
+    active = {}
+    departures = 0
+    start = datetime.now()
+    for frame, seen in enumerate(schedule):
+        now = start + timedelta(seconds=frame / fps)
+        for name in seen:
+            if name in active:
+                active[name]['last_seen'] = now
+            else:
+                active[name] = {'arrival': now, 'last_seen': now}
+        for name in list(active.keys()):
+            if (now - active[name]['last_seen']).total_seconds() > timeout:
+                del active[name]
+                departures += 1
+    return departures
+
+
+def bench_sessions(args):
+    """
+    Kadr boshiga kelish/ketish hisobining narxi (tanib olishsiz), xonadagi odamlar soniga qarab
+    """
+    import contextlib
+    import io
+
+    timeout = config.SESSION_DEPARTURE_TIMEOUT
+    frames = int(args.seconds * args.fps)
+    with tempfile.TemporaryDirectory() as tmp:
+        for present in args.present:
+            start = time.perf_counter()
+            legacy_departed = legacy_sessions(
+                sighting_schedule(present, args.visible, frames, args.leave), args.fps, timeout)
+            legacy_us = (time.perf_counter() - start) * 1e6 / frames
+
+            # Soxta monotonic soat: kadrlar FPS bo'yicha, kutishsiz
+            clock = [0.0]
+            log = SessionLog(os.path.join(tmp, f"sessions_{present}.log"),
+                             os.path.join(tmp, f"sessions_{present}.csv"),
+                             legacy_path=os.path.join(tmp, 'none.csv'),
+                             timeout=timeout, clock=lambda: clock[0])
+            departed = 0
+            schedule = list(sighting_schedule(present, args.visible, frames, args.leave))
+
+            # ARRIVAL/DEPARTURE chop etish o'lchovga kirmaydi
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                for frame, seen in enumerate(schedule):
+                    clock[0] = frame / args.fps
+                    for student_id in seen:
+                        log.seen(student_id, student_id)
+                    departed += len(log.expire())
+                heap_us = (time.perf_counter() - start) * 1e6 / frames
+                log.close()
+
+            status = "✅" if departed == legacy_departed else f"❌ ({departed} != {legacy_departed})"
+            print(f"📊 {present:>5} kishi: eski usul {legacy_us:8.1f} µs/kadr, "
+                  f"heap {heap_us:6.1f} µs/kadr ({legacy_us / heap_us:.1f}x), "
+                  f"ketganlar {departed} {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Davomat tizimi benchmark'lari")
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help="Sun'iy galereya hajmi (encoding'lar soni)")
+    parser.add_argument('--per-student', type=int, default=5)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    recall = subparsers.add_parser('recall', help="IVF recall va tezligi")
+    recall.add_argument('--probes', type=int, default=500)
+    recall.add_argument('--lists', type=int, default=config.IVF_NUM_LISTS)
+    recall.add_argument('--nprobe', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    recall.set_defaults(func=bench_recall)
+
+    enroll = subparsers.add_parser('enroll', help="Encoding yaratish tezligi (rasm/s)")
+    enroll.add_argument('--limit', type=int, default=0, help="Rasmlar soni (0 = hammasi)")
+    enroll.add_argument('--workers', type=int, default=None)
+    enroll.add_argument('--chunk-size', type=int, default=None)
+    enroll.set_defaults(func=bench_enroll)
+
+    pool = subparsers.add_parser('pool', help="Ko'p kamerali worker pool (kadr/s)")
+    pool.add_argument('--source', required=True, help="Video fayl (har bir kamera uchun)")
+    pool.add_argument('--cameras', type=int, default=4)
+    pool.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    pool.add_argument('--seconds', type=float, default=20.0)
+    pool.add_argument('--warmup', type=float, default=5.0)
+    pool.add_argument('--no-motion-gate', action='store_true')
+    pool.set_defaults(func=bench_pool)
+
+    attendance = subparsers.add_parser('attendance', help="Davomat yozish vaqti (ms)")
+    attendance.add_argument('--rows', type=int, nargs='+', default=[0, 10000, 100000, 1000000])
+    attendance.add_argument('--backend', choices=['daily', 'csv'], default='daily')
+    attendance.add_argument('--marks', type=int, default=2000)
+    attendance.add_argument('--reads', type=int, default=200, help="today() chaqiruvlari")
+    attendance.add_argument('--legacy-marks', type=int, default=5,
+                            help="Eski (to'liq skan) usul bilan yozishlar soni (0 = o'tkazish)")
+    attendance.set_defaults(func=bench_attendance)
+
+    writers = subparsers.add_parser('writers', help="CSV vs SQLite, parallel yozuvchilar")
+    writers.add_argument('--backends', nargs='+', default=['daily', 'csv', 'sqlite'])
+    writers.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16])
+    writers.add_argument('--marks', type=int, default=1000, help="Har bir thread uchun")
+    writers.add_argument('--rows', type=int, default=100000, help="CSV tarixidagi qatorlar")
+    writers.add_argument('--write-behind', action='store_true',
+                         help="AttendanceWriter orqali (guruhlab yozish)")
+    writers.set_defaults(func=bench_writers)
+
+    sessions = subparsers.add_parser('sessions', help="Ketishni aniqlash: eski skan vs heap")
+    sessions.add_argument('--present', type=int, nargs='+', default=[100, 500, 2000])
+    sessions.add_argument('--visible', type=int, default=20, help="Kadrdagi yuzlar soni")
+    sessions.add_argument('--fps', type=float, default=30.0)
+    sessions.add_argument('--seconds', type=float, default=120.0, help="Simulyatsiya davomiyligi")
+    sessions.add_argument('--leave', type=float, default=0.2, help="Yarmida chiqib ketadiganlar ulushi")
+    sessions.set_defaults(func=bench_sessions)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+"""
+KO'P KAMERALI WORKER POOL
+
+    ota jarayon ──► SharedGalleryPublisher ──► [shared memory galereya]
+        │                                        ▲       ▲
+        │ control_queue (yangi galereya)         │       │
+        ├──────────────► worker 1 (kamera A, C) ─┘       │
+        └──────────────► worker 2 (kamera B, D) ─────────┘
+                              │
+        ◄──── event_queue ────┘  ('attendance', ...) / ('stats', ...)
+        │
+    writer thread ──► face_system.mark_attendance (yagona yozuvchi)
+
+Har bir worker - alohida jarayon (GIL yo'q), o'z kameralari uchun o'z
+FaceTracker va MotionGate'iga ega. Galereya bir marta shared memory'ga
+yoziladi, worker'lar undan nusxasiz o'qiydi. Davomat faqat ota jarayondagi
+bitta thread orqali yoziladi - CSV'ga parallel yozish bo'lmaydi.
+
+Ishga tushirish (barcha config.CAMERAS bilan):
+    python camera_pool.py
+"""
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import cv2
+import config
+
+
+def open_capture(spec):
+    """
+    config.CAMERAS dagi yozuv bo'yicha kamerani ochish
+
+    Args:
+        spec: {'source': 0 yoki fayl/URL, 'width', 'height', 'fps' (ixtiyoriy)}
+    """
+    capture = cv2.VideoCapture(spec['source'])
+    if 'width' in spec:
+        capture.set(cv2.CAP_PROP_FRAME_WIDTH, spec['width'])
+    if 'height' in spec:
+        capture.set(cv2.CAP_PROP_FRAME_HEIGHT, spec['height'])
+    capture.set(cv2.CAP_PROP_FPS, spec.get('fps', config.VIDEO_FPS))
+    return capture
+
+
+def assign_cameras(camera_ids, num_workers):
+    """
+    Kameralarni worker'larga navbatma-navbat (round-robin) taqsimlash
+
+    Returns:
+        list: har bir worker uchun kamera id'lari ro'yxati
+    """
+    assignments = [[] for _ in range(num_workers)]
+    for i, camera_id in enumerate(camera_ids):
+        assignments[i % num_workers].append(camera_id)
+    return [cameras for cameras in assignments if cameras]
+
+
+# ===== WORKER JARAYONI =====
+
+class _CameraState:
+    """
+    Bitta kameraning worker ichidagi holati
+    """
+
+    def __init__(self, camera_id, spec):
+        from face_tracker import FaceTracker
+        from motion_gate import MotionGate
+        from quality_controller import QualityController
+
+        self.camera_id = camera_id
+        self.spec = spec
+        self.capture = open_capture(spec)
+        self.tracker = FaceTracker() if config.USE_FACE_TRACKER else None
+        self.motion_gate = MotionGate() if config.USE_MOTION_GATE else None
+        self.quality = QualityController.for_camera(spec) if config.USE_QUALITY_CONTROLLER else None
+        self.latest_results = []
+        self.last_sent = {}
+        self.captured = 0
+        self.processed = 0
+        self.closed = False
+
+    def next_frame(self):
+        """
+        Keyingi kadr: o'tkazib yuboriladigan kadrlar faqat grab() qilinadi (decode yo'q)
+
+        Returns:
+            frame yoki None (bu kadr tanib olinmaydi)
+        """
+        if not self.capture.grab():
+            if self.spec.get('loop'):
+                self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            else:
+                self.closed = True
+            return None
+
+        self.captured += 1
+        every_n = self.quality.skip if self.quality is not None else config.PROCESS_EVERY_N_FRAMES
+        if self.captured % every_n != 0:
+            return None
+
+        success, frame = self.capture.retrieve()
+        return frame if success else None
+
+    def infer(self, face_system, frame):
+        self.processed += 1
+        changed, regions = True, None
+        if self.motion_gate is not None:
+            changed, regions = self.motion_gate.check(frame)
+
+        if not changed:
+            if self.tracker is not None:
+                self.latest_results = self.tracker.predict(frame)
+            return []
+
+        scale = upsample = None
+        if self.quality is not None:
+            scale, upsample = self.quality.scale, self.quality.upsample
+
+        start = time.perf_counter()
+        if self.tracker is not None:
+            results = face_system.recognize_faces_tracked(frame, self.tracker, regions,
+                                                          scale, upsample)
+        else:
+            results = face_system.recognize_faces_in_frame(frame, scale, upsample)
+        if self.quality is not None:
+            self.quality.record(time.perf_counter() - start)
+        self.latest_results = results
+        return results
+
+    def recognized(self, results, now):
+        """
+        Spam oldini olgan holda davomatga yuboriladigan talabalar
+        """
+        for result in results:
+            student_id = result['student_id']
+            if not student_id or result['name'] == "Noma'lum":
+                continue
+            if now - self.last_sent.get(student_id, 0.0) > config.RECOGNITION_COOLDOWN_SECONDS:
+                self.last_sent[student_id] = now
+                yield student_id, result['name']
+
+    def stats(self):
+        return {
+            'captured': self.captured,
+            'processed': self.processed,
+            'closed': self.closed,
+            'motion_gate': self.motion_gate.stats() if self.motion_gate is not None else None,
+            'quality': self.quality.stats() if self.quality is not None else None
+        }
+
+
+def worker_main(worker_id, cameras, descriptor, control_queue, event_queue, stop_event,
+                overrides=None):
+    """
+    Worker jarayoni: berilgan kameralarni navbatma-navbat o'qib tanib olish
+
+    Args:
+        cameras: {camera_id: spec}
+        descriptor: SharedGalleryPublisher.publish() natijasi
+        overrides: worker ichida config qiymatlarini almashtirish (masalan, benchmark)
+    """
+    for name, value in (overrides or {}).items():
+        setattr(config, name, value)
+
+    from face_recognition_system import FaceRecognitionSystem
+    from shared_gallery import SharedGalleryReader
+
+    face_system = FaceRecognitionSystem(load=False)
+    reader = SharedGalleryReader()
+    gallery = reader.attach(descriptor)
+    if gallery is not None:
+        face_system.gallery = gallery
+
+    states = [_CameraState(camera_id, spec) for camera_id, spec in cameras.items()]
+    last_stats = time.monotonic()
+
+    def send_stats():
+        event_queue.put(('stats', worker_id, {
+            'pid': os.getpid(),
+            'generation': reader.generation,
+            'cameras': {state.camera_id: state.stats() for state in states}
+        }))
+
+    try:
+        while not stop_event.is_set():
+            # Yangi galereya: faqat eng so'nggi tavsifnoma muhim
+            latest = None
+            try:
+                while True:
+                    latest = control_queue.get_nowait()
+            except queue.Empty:
+                pass
+            if latest is not None and latest['generation'] > reader.generation:
+                gallery = reader.attach(latest)
+                if gallery is not None:
+                    face_system.gallery = gallery
+                    reader.release_old()
+
+            for state in states:
+                if state.closed:
+                    continue
+                frame = state.next_frame()
+                if frame is None:
+                    continue
+                results = state.infer(face_system, frame)
+                now = time.time()
+                for student_id, name in state.recognized(results, now):
+                    event_queue.put(('attendance', state.camera_id, student_id, name, now))
+
+            if all(state.closed for state in states):
+                break
+
+            if time.monotonic() - last_stats >= config.CAMERA_POOL_STATS_SECONDS:
+                last_stats = time.monotonic()
+                send_stats()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        send_stats()
+        for state in states:
+            state.capture.release()
+
+
+# ===== OTA JARAYON =====
+
+class CameraPool:
+    """
+    Kameralarni worker jarayonlar o'rtasida taqsimlash va ularni boshqarish
+    """
+
+    def __init__(self, face_system, camera_ids=None, cameras=None, num_workers=None,
+                 on_attendance=None, overrides=None):
+        """
+        Args:
+            face_system: ota jarayondagi FaceRecognitionSystem (galereya va davomat)
+            camera_ids: config.CAMERAS dagi id'lar (None = hammasi)
+            cameras: {camera_id: spec} - config.CAMERAS o'rniga to'g'ridan-to'g'ri
+            num_workers: None = min(kameralar soni, CPU core'lar)
+            on_attendance: (camera_id, student_id, name, timestamp) -> None
+        """
+        if cameras is None:
+            camera_ids = list(config.CAMERAS) if camera_ids is None else list(camera_ids)
+            cameras = {camera_id: config.CAMERAS[camera_id] for camera_id in camera_ids}
+        self.cameras = dict(cameras)
+
+        if num_workers is None:
+            num_workers = config.CAMERA_POOL_WORKERS or os.cpu_count() or 1
+        self.num_workers = max(1, min(num_workers, len(self.cameras)))
+
+        self.face_system = face_system
+        self.on_attendance = on_attendance or self._mark_attendance
+        self.overrides = overrides
+
+        self.worker_stats = {}
+        self.attendance_events = 0
+        self.gallery_generation = 0
+
+        self._publisher = None
+        self._published = None
+        self._gallery_mtime = self._meta_mtime()
+        self._processes = []
+        self._control_queues = []
+        self._writer = None
+        self.started_at = None
+
+    def start(self):
+        from shared_gallery import SharedGalleryPublisher
+
+        # spawn: worker'lar Flask/thread holatini meros qilib olmaydi
+        context = mp.get_context('spawn')
+        self._event_queue = context.Queue()
+        self._stop_event = context.Event()
+
+        self._publisher = SharedGalleryPublisher()
+        descriptor = self._publish()
+
+        for worker_id, camera_ids in enumerate(assign_cameras(list(self.cameras), self.num_workers)):
+            control_queue = context.Queue()
+            process = context.Process(
+                target=worker_main,
+                args=(worker_id, {cid: self.cameras[cid] for cid in camera_ids}, descriptor,
+                      control_queue, self._event_queue, self._stop_event, self.overrides),
+                name=f'camera-worker-{worker_id}',
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+            self._control_queues.append(control_queue)
+
+        self._writer = threading.Thread(target=self._writer_loop, name='pool-writer', daemon=True)
+        self._writer.start()
+        self.started_at = time.monotonic()
+
+        print(f"🎥 Camera pool: {len(self.cameras)} ta kamera, {len(self._processes)} ta worker")
+        return self
+
+    def stop(self, timeout=5.0):
+        if self._publisher is None:
+            return
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        if self._writer is not None:
+            self._writer.join(timeout)
+        self._publisher.close()
+        self._publisher = None
+
+    @property
+    def running(self):
+        return any(process.is_alive() for process in self._processes)
+
+    # ===== GALEREYA =====
+
+    def _publish(self):
+        self._published = self.face_system.gallery
+        descriptor = self._publisher.publish(self._published)
+        self.gallery_generation = descriptor['generation']
+        return descriptor
+
+    def publish_gallery(self):
+        """
+        Joriy galereyani qayta nashr qilish va worker'larga xabar berish
+        """
+        descriptor = self._publish()
+        for control_queue in self._control_queues:
+            control_queue.put(descriptor)
+        print(f"🔄 Galereya worker'larga yuborildi (avlod {descriptor['generation']})")
+
+    @staticmethod
+    def _meta_mtime():
+        try:
+            return os.path.getmtime(config.GALLERY_META_FILE)
+        except OSError:
+            return None
+
+    def _check_gallery(self):
+        # Boshqa jarayon (masalan, benchmark yoki qayta encode) galereyani diskda o'zgartirgan
+        mtime = self._meta_mtime()
+        if mtime != self._gallery_mtime:
+            self._gallery_mtime = mtime
+            if self.face_system.gallery is self._published:
+                self.face_system.load_encodings()
+
+        # Shu jarayonda API orqali yangi snapshot e'lon qilingan
+        if self.face_system.gallery is not self._published:
+            self.publish_gallery()
+
+    # ===== HODISALAR (YAGONA YOZUVCHI) =====
+
+    def _mark_attendance(self, camera_id, student_id, name, timestamp):
+        self.face_system.mark_attendance(student_id, name)
+
+    def _writer_loop(self):
+        last_check = time.monotonic()
+        while not (self._stop_event.is_set() and not self.running and self._event_queue.empty()):
+            try:
+                event = self._event_queue.get(timeout=0.5)
+            except queue.Empty:
+                event = None
+            except (EOFError, OSError):
+                break
+
+            if event is not None:
+                if event[0] == 'attendance':
+                    self.attendance_events += 1
+                    self.on_attendance(*event[1:])
+                elif event[0] == 'stats':
+                    self.worker_stats[event[1]] = event[2]
+
+            if not self._stop_event.is_set() and \
+                    time.monotonic() - last_check >= config.GALLERY_RELOAD_SECONDS:
+                last_check = time.monotonic()
+                self._check_gallery()
+
+    def stats(self):
+        """
+        Umumiy statistika: har bir kamera bo'yicha qayta ishlangan kadrlar
+        """
+        cameras = {}
+        for worker_stats in list(self.worker_stats.values()):
+            cameras.update(worker_stats['cameras'])
+
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        processed = sum(camera['processed'] for camera in cameras.values())
+        return {
+            'workers': len(self._processes),
+            'alive': sum(process.is_alive() for process in self._processes),
+            'gallery_generation': self.gallery_generation,
+            'attendance_events': self.attendance_events,
+            'processed_frames': processed,
+            'processed_per_second': processed / elapsed if elapsed else 0.0,
+            'cameras': cameras
+        }
+
+
+def main():
+    from face_recognition_system import FaceRecognitionSystem
+
+    face_system = FaceRecognitionSystem()
+    pool = CameraPool(face_system).start()
+    try:
+        while pool.running:
+            time.sleep(config.CAMERA_POOL_STATS_SECONDS)
+            stats = pool.stats()
+            print(f"📊 {stats['processed_per_second']:.1f} kadr/s, "
+                  f"davomat: {stats['attendance_events']}, worker: {stats['alive']}/{stats['workers']}")
+    except KeyboardInterrupt:
+        print("\n⏹️  To'xtatilmoqda...")
+    finally:
+        pool.stop()
+        # Write-behind navbatidagi davomat diskka (aks holda oxirgi yozuvlar yo'qoladi)
+        face_system.attendance.close()
+
+
+if __name__ == '__main__':
+    main()
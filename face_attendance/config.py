@@ -2,22 +2,47 @@ import os
 
 # ===== PAPKA YO'LLARI =====
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Repozitoriya ildizi (database/, ai_modules/ shu yerda)
+PROJECT_ROOT = os.path.dirname(BASE_DIR)
 DATASET_DIR = os.path.join(BASE_DIR, 'dataset')
 ENCODINGS_DIR = os.path.join(BASE_DIR, 'encodings')
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 
-# Encoding faylining yo'li
+# Encoding faylining yo'li (eski PKL format, birinchi yuklashda ko'chiriladi)
 ENCODINGS_FILE = os.path.join(ENCODINGS_DIR, 'face_encodings.pkl')
 
-# Davomat CSV fayli
+# Yangi binar galereya formati (np.load(mmap_mode='r') bilan yuklanadi)
+GALLERY_MATRIX_FILE = os.path.join(ENCODINGS_DIR, 'face_gallery.npy')
+GALLERY_LABELS_FILE = os.path.join(ENCODINGS_DIR, 'face_gallery_labels.npy')
+GALLERY_META_FILE = os.path.join(ENCODINGS_DIR, 'face_gallery.json')
+
+# Avtomatik ko'chiriladigan eski PKL fayllar (tartib bo'yicha)
+LEGACY_ENCODINGS_FILES = [
+    ENCODINGS_FILE,
+    os.path.join(PROJECT_ROOT, 'attendance system', 'encodings.pkl'),
+]
+
+# Encoding keshi (rasm mazmuni xeshi bo'yicha) - qayta qurishda faqat yangi rasmlar
+ENCODING_CACHE_FILE = os.path.join(ENCODINGS_DIR, 'encoding_cache.npz')
+
+# ANN (IVF) indeks fayli - encoding fayli yonida saqlanadi
+ANN_INDEX_FILE = os.path.join(ENCODINGS_DIR, 'face_index_ivf.npz')
+
+# Davomat CSV fayli (bitta fayl - ATTENDANCE_BACKEND = 'csv')
 ATTENDANCE_FILE = os.path.join(DATA_DIR, 'attendance.csv')
 
+# Kunlik davomat fayllari: data/attendance/YYYY-MM-DD.csv (ATTENDANCE_BACKEND = 'daily')
+ATTENDANCE_DIR = os.path.join(DATA_DIR, 'attendance')
+
 # ===== YUZNI TANIB OLISH SOZLAMALARI =====
 
 # Model aniqligi (smaller = tezroq, larger = aniqroq)
 # 'small' yoki 'large' bo'lishi mumkin
 FACE_RECOGNITION_MODEL = 'large'  # OPTIMAL TANLANGAN!
 
+# Dataset rasmlaridan encoding yaratishda jitter soni (kam = tezroq)
+ENCODING_NUM_JITTERS = 1
+
 # Yuzni topish aniqligi (0-2 oralig'ida)
 # Past qiymat = tezroq lekin kamroq yuz topadi
 # Yuqori qiymat = sekinroq lekin ko'proq yuz topadi
@@ -28,6 +53,51 @@ FACE_DETECTION_UPSAMPLE = 1  # Default: 1 (optimal)
 # Yuqori qiymat = yumshoqroq (ko'proq noto'g'ri tanish)
 FACE_MATCH_TOLERANCE = 0.6  # Default: 0.6 (optimal)
 
+# Galereyadan qidirish usuli:
+# 'brute' = har bir encoding bilan taqqoslash (O(rasmlar))
+# 'prototype' = avval talaba prototiplari, keyin faqat nomzodlar (O(talabalar))
+# 'ivf' = taxminiy (ANN) qidiruv, 100k+ encoding uchun
+FACE_MATCHER = 'prototype'
+
+# Prototip qidiruvida to'liq tekshiriladigan nomzod talabalar soni
+MATCHER_TOP_K_STUDENTS = 5
+
+# Tekshirish rejimi: har bir natijani 'brute' bilan solishtiradi (sekin!)
+MATCHER_VERIFY = False
+
+# ===== ANN (IVF) SOZLAMALARI =====
+# Recall/tezlikni tanlash uchun: python benchmark.py recall
+
+# Klasterlar soni (None = sqrt(encoding'lar soni))
+IVF_NUM_LISTS = None
+
+# Har bir probe uchun tekshiriladigan klasterlar soni
+# Yuqori qiymat = aniqroq lekin sekinroq
+IVF_NPROBE = 8
+
+# K-means o'qitish iteratsiyalari
+IVF_TRAIN_ITERATIONS = 20
+
+# Tasodifiy son generatori (qayta tiklanadigan indeks uchun)
+IVF_RANDOM_SEED = 42
+
+# ===== TEZKOR OLDINDAN ANIQLASH (HAAR CASCADE) =====
+
+# HOG'dan oldin tezkor Haar cascade: yuz yo'q kadrlar darhol tashlanadi,
+# HOG va encoding faqat topilgan hududlarda ishlaydi
+USE_CASCADE_PREDETECTOR = False
+
+# cv2.data.haarcascades ichidagi fayl
+CASCADE_FILE = 'haarcascade_frontalface_default.xml'
+
+# detectMultiScale parametrlari (past min_neighbors = kamroq yuz o'tkazib yuboriladi)
+CASCADE_SCALE_FACTOR = 1.2
+CASCADE_MIN_NEIGHBORS = 3
+CASCADE_MIN_SIZE = 20  # kichraytirilgan kadrda, piksel
+
+# Topilgan hudud atrofiga qo'shiladigan chegara (HOG uchun)
+CASCADE_PADDING = 0.5
+
 # ===== RASM SOZLAMALARI =====
 
 # Rasmlarni kichraytirish (tezlikni oshirish uchun)
@@ -38,6 +108,107 @@ FRAME_SCALE = 0.5  # Kamera rasmlarini 2 marta kichraytiramiz
 # Yuqori qiymat = tezroq lekin kamroq aniq
 PROCESS_EVERY_N_FRAMES = 2  # Har 2-kadrda bir tekshirish
 
+# ===== ADAPTIV SIFAT (QUALITY CONTROLLER) =====
+
+# FRAME_SCALE, FACE_DETECTION_UPSAMPLE va PROCESS_EVERY_N_FRAMES ish vaqtida
+# kamera byudjetiga qarab o'zgartiriladi (yuqoridagilar - boshlang'ich qiymat)
+USE_QUALITY_CONTROLLER = True
+
+# Byudjet (kamera bo'yicha CAMERAS dagi 'budget_ms' / 'cpu_budget' bilan almashtiriladi)
+QUALITY_BUDGET_MS = 150  # Bitta tanib olish kadri uchun maksimal vaqt (ms)
+QUALITY_CPU_BUDGET = 0.5  # Kamera uchun CPU ulushi (1.0 = bitta core to'liq)
+
+# Sifat pog'onalari (scale, upsample) - arzonidan qimmatiga
+QUALITY_LEVELS = [
+    (0.25, 0),
+    (0.25, 1),
+    (0.35, 1),
+    (0.5, 1),
+    (0.75, 1),
+    (1.0, 1),
+]
+
+# PROCESS_EVERY_N_FRAMES chegaralari
+QUALITY_MIN_SKIP = 1
+QUALITY_MAX_SKIP = 6
+
+# Gisterezis: qaror QUALITY_WINDOW ta o'lchovdan keyin qabul qilinadi,
+# sifat faqat byudjetning LOW_WATERMARK qismidan kam ishlatilganda oshiriladi
+QUALITY_WINDOW = 10
+QUALITY_LOW_WATERMARK = 0.6
+
+# ===== HARAKAT FILTRI (MOTION GATE) =====
+
+# Kadr o'zgarmagan bo'lsa yuz aniqlash ishlamaydi (bo'sh xonada CPU tejaladi)
+USE_MOTION_GATE = True
+
+# Taqqoslash uchun kadr kengligi (piksel) - kichik = tezroq
+MOTION_GATE_WIDTH = 160
+
+# Piksel "o'zgargan" hisoblanishi uchun kulrang farq (0-255)
+MOTION_PIXEL_THRESHOLD = 25
+
+# O'zgargan piksellar ulushi shundan katta bo'lsa - kadr o'zgargan
+MOTION_THRESHOLD = 0.005
+
+# Harakat bo'lmasa ham har N soniyada to'liq tekshirish
+MOTION_REFRESH_SECONDS = 5.0
+
+# Yuzlarni faqat o'zgargan hududlarda qidirish
+MOTION_LIMIT_TO_REGIONS = True
+
+# Hudud atrofiga qo'shiladigan chegara (hudud o'lchamiga nisbatan)
+MOTION_REGION_PADDING = 0.5
+
+# Hududlar soni yoki umumiy maydon ulushi shundan oshsa - butun kadr tekshiriladi
+MOTION_MAX_REGIONS = 4
+MOTION_MAX_REGION_AREA = 0.5
+
+# ===== YUZLARNI KUZATISH (TRACKING) =====
+
+# Kadrlar orasida yuzlarni kuzatish (tanilgan yuz qayta encode qilinmaydi)
+USE_FACE_TRACKER = True
+
+# 'iou' = faqat aniqlash natijalarini bog'lash
+# 'kcf', 'csrt', 'mosse' = oraliq kadrlarda OpenCV tracker (opencv-contrib kerak)
+TRACKER_BACKEND = 'iou'
+
+# Aniqlangan yuzni mavjud track bilan bog'lash uchun minimal IoU
+TRACKER_IOU_THRESHOLD = 0.3
+
+# Tanilgan paytdagi joyiga nisbatan IoU shundan past bo'lsa - qayta encode
+TRACKER_REENCODE_IOU = 0.5
+
+# Necha marta ketma-ket topilmasa track o'chiriladi
+TRACKER_MAX_MISSED = 3
+
+# Shu masofadan yaqin bo'lgan tanish "ishonchli" hisoblanadi
+TRACKER_CONFIDENT_DISTANCE = 0.5
+
+# ===== KAMERALAR =====
+
+# Kameralar ro'yxati: id -> sozlamalar
+# source: kamera indeksi (0, 1, 2...) yoki video fayl / RTSP manzil
+# loop: video fayl tugaganda boshidan boshlash
+CAMERAS = {
+    'main': {'source': 0, 'width': 640, 'height': 480, 'fps': 30},
+}
+
+# Web interfeysdagi /video_feed ko'rsatadigan kamera
+DEFAULT_CAMERA = 'main'
+
+# Qo'shimcha kameralar alohida worker jarayonlarda (camera_pool.py)
+USE_CAMERA_POOL = False
+CAMERA_POOL_CAMERAS = []  # CAMERAS dagi id'lar (DEFAULT_CAMERA'dan tashqari)
+CAMERA_POOL_WORKERS = None  # None = min(kameralar soni, CPU core'lar)
+
+# Worker statistikasi va galereya o'zgarishini tekshirish oralig'i (soniya)
+CAMERA_POOL_STATS_SECONDS = 5.0
+GALLERY_RELOAD_SECONDS = 5.0
+
+# Bir talaba necha soniyada bir marta qayta davomatga yuboriladi (spam oldini olish)
+RECOGNITION_COOLDOWN_SECONDS = 30
+
 # ===== MULTI-PROCESSING SOZLAMALARI =====
 
 # Parallel processing ishlatish (tezlashtirish uchun)
@@ -47,6 +218,10 @@ USE_PARALLEL_PROCESSING = True
 # Agar kompyuter sekin bo'lsa, kamroq qiymat qo'ying
 NUM_CPU_CORES = None  # Avtomatik aniqlash
 
+# Har bir worker'ga bir martada yuboriladigan rasmlar soni
+# Kichik = yuklama teng taqsimlanadi, katta = kamroq IPC xarajati
+PARALLEL_CHUNK_SIZE = 8
+
 # ===== DAVOMAT SOZLAMALARI =====
 
 # Bir talaba bir kun ichida necha marta qayd qilinishi
@@ -57,6 +232,66 @@ UNIQUE_ATTENDANCE_PER_DAY = True
 ATTENDANCE_DATE_FORMAT = '%Y-%m-%d'
 ATTENDANCE_TIME_FORMAT = '%H:%M:%S'
 
+# Davomat qayerga yoziladi:
+# 'daily' = ATTENDANCE_DIR ichida har kun uchun alohida fayl (o'tgan kunlar - faqat o'qish)
+# 'csv' = ATTENDANCE_FILE (bitta fayl)
+# 'sqlite' = ATTENDANCE_DB_FILE (WAL; ai_modules va database/db_setup.py bilan umumiy baza)
+ATTENDANCE_BACKEND = 'daily'
+
+# O'tgan kunlar fayllaridan xotirada saqlanadiganlari soni (o'zgarmas - kesh xavfsiz)
+ATTENDANCE_SEGMENT_CACHE = 32
+
+# SQLite davomat bazasi (database/db_setup.py dagi DB_PATH bilan bir xil fayl)
+ATTENDANCE_DB_FILE = os.path.join(PROJECT_ROOT, 'data', 'attendance.db')
+
+# Write-behind: davomat darhol xotirada qayd qilinadi, diskka fon thread'ida
+# guruhlab yoziladi (N ta yozuv yoki T soniya - qaysi biri oldin bo'lsa)
+ATTENDANCE_WRITE_BEHIND = True
+ATTENDANCE_BATCH_SIZE = 64
+ATTENDANCE_FLUSH_SECONDS = 1.0
+# Yozish xatosidan keyin qayta urinish oralig'i har safar ikki baravar (shu chegaragacha)
+ATTENDANCE_RETRY_MAX_SECONDS = 30.0
+
+# ===== KELISH/KETISH SESSIYALARI =====
+
+# Hodisalar jurnali: faqat oxiriga yoziladi (seq,ARRIVAL|DEPARTURE|HEARTBEAT,id,ism,vaqt)
+SESSION_LOG_FILE = os.path.join(DATA_DIR, 'sessions.log')
+
+# Yopilgan sessiyalar jadvali (jurnal siqilganda to'ldiriladi)
+SESSIONS_FILE = os.path.join(DATA_DIR, 'sessions.csv')
+
+# Eski format (har hodisada butunlay qayta yozilgan) - bir marta ko'chiriladi
+SESSIONS_LEGACY_FILE = os.path.join(DATA_DIR, 'attendance_sessions.csv')
+
+# Necha soniya ko'rinmasa - "ketdi" deb hisoblanadi
+SESSION_DEPARTURE_TIMEOUT = 10
+
+# Jurnalni siqish: N ta hodisadan yoki T soniyadan keyin (qaysi biri oldin bo'lsa)
+SESSION_COMPACT_EVENTS = 1000
+SESSION_COMPACT_SECONDS = 300
+
+# True = har bir hodisadan keyin fsync (sekinroq, lekin elektr uzilsa ham yo'qolmaydi)
+SESSION_LOG_FSYNC = False
+
+# Web ilovada kelish/ketishni kuzatish (asosiy kamera oqimi bo'yicha)
+USE_SESSION_TRACKING = True
+
+# Ketganlarni tekshirish oralig'i (soniya) - kadr bo'lmasa ham ishlaydi
+SESSION_EXPIRE_INTERVAL = 1.0
+
+# Xonada kimdir bo'lsa, jurnalga shu oraliqda HEARTBEAT (devor vaqti) yoziladi:
+# to'satdan to'xtashdan keyin ochiq sessiyalar shu vaqt + timeout bilan yopiladi
+SESSION_HEARTBEAT_SECONDS = 5.0
+
+# ===== TAHLIL (BANDLIK VA O'TIRISH VAQTI) =====
+
+# Yig'indilar checkpoint'i: qayta ishga tushishda faqat undan keyingi hodisalar o'ynaladi
+ANALYTICS_CHECKPOINT_FILE = os.path.join(DATA_DIR, 'analytics.json')
+
+# Checkpoint: N ta hodisadan yoki T soniyadan keyin (jurnal siqilishidan oldin ham)
+ANALYTICS_CHECKPOINT_EVENTS = 200
+ANALYTICS_CHECKPOINT_SECONDS = 60
+
 # ===== WEB INTERFACE SOZLAMALARI =====
 
 # Flask server porti
@@ -66,6 +301,27 @@ FLASK_DEBUG = True
 # Video stream FPS
 VIDEO_FPS = 30
 
+# Stream JPEG sifati (0-100)
+STREAM_JPEG_QUALITY = 85
+
+# Pipeline navbatlari hajmi (to'lganda eng eski kadr tashlanadi)
+PIPELINE_INFERENCE_QUEUE_SIZE = 1  # Tanib olish faqat eng yangi kadrni oladi
+PIPELINE_RENDER_QUEUE_SIZE = 2
+PIPELINE_OUTPUT_QUEUE_SIZE = 1  # Har bir mijoz uchun: faqat eng so'nggi kadr
+
+# Preview stream (/video_feed?profile=preview): ramkalarsiz, kichik va siyrak.
+# Ramkalar /api/detections/stream bo'yicha brauzerda chiziladi.
+# Tanib olish o'lchami (FRAME_SCALE) bunga bog'liq emas.
+STREAM_PREVIEW_WIDTH = 320
+STREAM_PREVIEW_FPS = 8
+STREAM_PREVIEW_JPEG_QUALITY = 60
+
+# SSE ulanishi uzilib qolmasligi uchun bo'sh xabar oralig'i (soniya)
+SSE_KEEPALIVE_SECONDS = 15
+
+# /api/events: har bir mijoz navbatidagi hodisalar soni (to'lsa - snapshot qayta yuboriladi)
+EVENT_QUEUE_SIZE = 256
+
 # ===== XAVFSIZLIK =====
 
 # Maksimal rasm hajmi (MB)
@@ -0,0 +1,130 @@
+"""
+ENCODING KESHI (CONTENT-ADDRESSED)
+
+Kalit: rasm fayli mazmunining SHA-1 xeshi + FACE_RECOGNITION_MODEL + num_jitters.
+Qiymat: encoding yoki "yuz topilmadi" belgisi.
+
+Fayl nomi o'zgarsa yoki boshqa papkaga ko'chirilsa ham kesh ishlaydi;
+rasm o'zgarsa - xesh o'zgaradi va qayta encode qilinadi.
+"""
+import hashlib
+import os
+import threading
+import numpy as np
+import config
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    Fayl mazmunining SHA-1 xeshi
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(path):
+    """
+    Rasm uchun kesh kaliti (mazmun + model + jitter)
+    """
+    return f"{file_digest(path)}:{config.FACE_RECOGNITION_MODEL}:{config.ENCODING_NUM_JITTERS}"
+
+
+class EncodingCache:
+    """
+    Diskdagi encoding keshi (ENCODING_CACHE_FILE, .npz)
+
+    Statistika (hits, misses, no_face, evicted) har bir qurish uchun
+    reset_stats() bilan nolga tushiriladi.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or config.ENCODING_CACHE_FILE
+        self._entries = {}  # key -> np.ndarray yoki None (yuz topilmadi)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.reset_stats()
+        self.load()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.no_face = 0
+        self.evicted = 0
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                keys = data['keys'].tolist()
+                encodings = data['encodings']
+                has_face = data['has_face']
+                self._entries = {
+                    key: (encodings[i] if has_face[i] else None)
+                    for i, key in enumerate(keys)
+                }
+        except Exception as e:
+            print(f"⚠️  Encoding keshini yuklashda xato: {e}")
+            self._entries = {}
+
+    def save(self):
+        """
+        Keshni atomik saqlash (faqat o'zgargan bo'lsa)
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            keys = list(self._entries)
+            values = [self._entries[key] for key in keys]
+            self._dirty = False
+
+        has_face = np.array([value is not None for value in values], dtype=bool)
+        encodings = np.zeros((len(keys), 128), dtype=np.float32)
+        for i, value in enumerate(values):
+            if value is not None:
+                encodings[i] = value
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, keys=np.array(keys, dtype=str), encodings=encodings, has_face=has_face)
+        os.replace(tmp_path, self.path)
+
+    def lookup(self, key):
+        """
+        Returns:
+            tuple: (topildimi, encoding yoki None)
+        """
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def store(self, key, encoding):
+        with self._lock:
+            if encoding is None:
+                self.no_face += 1
+            else:
+                encoding = np.asarray(encoding, dtype=np.float32)
+            self._entries[key] = encoding
+            self._dirty = True
+
+    def prune(self, live_keys):
+        """
+        Datasetda endi yo'q (o'chirilgan yoki o'zgargan) rasmlar yozuvlarini o'chirish
+        """
+        live_keys = set(live_keys)
+        with self._lock:
+            stale = [key for key in self._entries if key not in live_keys]
+            for key in stale:
+                del self._entries[key]
+            self.evicted += len(stale)
+            self._dirty = self._dirty or bool(stale)
+
+    def summary(self):
+        return (f"💾 Kesh: {self.hits} ta hit, {self.misses} ta miss "
+                f"({self.no_face} tasida yuz topilmadi), {self.evicted} ta o'chirildi")
@@ -0,0 +1,154 @@
+"""
+ENCODING OMBORI (BINAR, MEMORY-MAPPED)
+
+Galereya diskda uchta faylda saqlanadi:
+- face_gallery.npy         (N, 128) float32 matritsa
+- face_gallery_labels.npy  (N,) int32 - har bir qator uchun talaba indeksi
+- face_gallery.json        versiya, talaba ID va ismlari, qatorlar soni
+
+Matritsa np.load(mmap_mode='r') bilan ochiladi: yuklash deyarli O(1) va
+bir nechta jarayon bir xil sahifalarni (page cache) bo'lishadi.
+"""
+import json
+import os
+import pickle
+from datetime import datetime
+import numpy as np
+import config
+
+GALLERY_FORMAT_VERSION = 1
+
+
+def _atomic_save_npy(path, array):
+    """
+    Vaqtinchalik faylga yozib, keyin os.replace - o'quvchilar hech qachon
+    yarim yozilgan faylni ko'rmaydi (eski mmap'lar eski inode'da qoladi)
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def save_gallery(matrix, labels, student_ids, student_names):
+    """
+    Galereyani binar formatda saqlash
+
+    Args:
+        matrix: (N, 128) encoding'lar
+        labels: (N,) talaba indekslari
+        student_ids: indeks -> student_id
+        student_names: indeks -> ism
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    labels = np.ascontiguousarray(labels, dtype=np.int32)
+
+    _atomic_save_npy(config.GALLERY_MATRIX_FILE, matrix)
+    _atomic_save_npy(config.GALLERY_LABELS_FILE, labels)
+
+    # Meta fayl oxirida yoziladi - u "commit" vazifasini bajaradi
+    meta = {
+        'version': GALLERY_FORMAT_VERSION,
+        'count': int(len(matrix)),
+        'dim': int(matrix.shape[1]),
+        'student_ids': list(student_ids),
+        'student_names': list(student_names),
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    tmp_path = f"{config.GALLERY_META_FILE}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_path, config.GALLERY_META_FILE)
+
+
+def load_gallery():
+    """
+    Galereyani yuklash (matritsa va yorliqlar memory-mapped)
+
+    Returns:
+        dict yoki None: {'matrix', 'labels', 'student_ids', 'student_names', 'created_at'}
+    """
+    if not os.path.exists(config.GALLERY_META_FILE):
+        return None
+
+    with open(config.GALLERY_META_FILE, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    if meta.get('version') != GALLERY_FORMAT_VERSION:
+        raise ValueError(f"Galereya formati versiyasi qo'llab-quvvatlanmaydi: {meta.get('version')}")
+
+    matrix = np.load(config.GALLERY_MATRIX_FILE, mmap_mode='r')
+    labels = np.load(config.GALLERY_LABELS_FILE, mmap_mode='r')
+
+    if len(matrix) != meta['count'] or len(labels) != meta['count']:
+        raise ValueError("Galereya fayllari bir-biriga mos emas")
+
+    return {
+        'matrix': matrix,
+        'labels': labels,
+        'student_ids': meta['student_ids'],
+        'student_names': meta['student_names'],
+        'created_at': meta.get('created_at'),
+    }
+
+
+def pack_rows(encodings, ids, names):
+    """
+    Qatorma-qator ro'yxatlarni (encodings, ids, names) galereya ko'rinishiga o'tkazish
+
+    Returns:
+        tuple: (matrix, labels, student_ids, student_names)
+    """
+    student_index = {}
+    student_names = []
+    labels = np.empty(len(ids), dtype=np.int32)
+    for row, (student_id, name) in enumerate(zip(ids, names)):
+        if student_id not in student_index:
+            student_index[student_id] = len(student_index)
+            student_names.append(name)
+        labels[row] = student_index[student_id]
+
+    if len(encodings):
+        matrix = np.ascontiguousarray(np.asarray(encodings, dtype=np.float32))
+    else:
+        matrix = np.empty((0, 128), dtype=np.float32)
+
+    return matrix, labels, list(student_index), student_names
+
+
+def migrate_legacy_pickle():
+    """
+    Eski PKL fayllarni (LEGACY_ENCODINGS_FILES) yangi formatga ko'chirish.
+    Eski 'attendance system/encodings.pkl' da 'ids' yo'q - ism ID sifatida olinadi.
+
+    Bo'sh fayllar o'tkazib yuboriladi, bo'sh bo'lmaganlari birlashtiriladi:
+    galereya faqat kamida bitta encoding ko'chirilganda yoziladi, aks holda
+    keyingi ishga tushishda yana urinib ko'riladi.
+
+    Returns:
+        bool: ko'chirildimi
+    """
+    encodings, ids, names = [], [], []
+    for path in config.LEGACY_ENCODINGS_FILES:
+        if not os.path.exists(path):
+            continue
+
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+
+        if not len(data.get('encodings', [])):
+            print(f"ℹ️  Eski encoding fayli bo'sh, o'tkazib yuborildi: {path}")
+            continue
+
+        file_names = list(data['names'])
+        encodings.extend(data['encodings'])
+        names.extend(file_names)
+        ids.extend(data.get('ids', file_names))
+        print(f"🔁 Eski encoding fayli o'qildi: {path} ({len(file_names)} ta)")
+
+    if not ids:
+        return False
+
+    save_gallery(*pack_rows(encodings, ids, names))
+    print(f"🔁 Eski encoding'lar ko'chirildi: jami {len(ids)} ta")
+    return True
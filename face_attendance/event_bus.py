@@ -0,0 +1,71 @@
+"""
+HODISALAR SHINASI (dashboard uchun push kanali)
+
+    mark_attendance / galereya / kamera ──► EventBus.publish ──► SSE matn (bir marta)
+                                                   │
+                       ┌───────────────────────────┼──────────────────┐
+                 [mijoz 1 navbati]         [mijoz 2 navbati]   ...  (/api/events)
+
+Hodisa bir marta JSON va SSE formatiga o'tkaziladi, keyin tayyor matn har
+bir mijoz navbatiga qo'yiladi: server ishi hodisalar soniga bog'liq,
+mijozlar soni x so'rov chastotasiga emas. Mijoz ulanganda (va navbati
+to'lib hodisa yo'qotganda) unga to'liq holat - snapshot yuboriladi.
+"""
+import itertools
+import json
+import threading
+import config
+from video_pipeline import DropOldestQueue
+
+
+def sse_message(event, data, event_id=None):
+    """
+    Bitta SSE xabar matni
+    """
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class EventBus:
+    """
+    Hodisalarni barcha obunachilarga tarqatish (publish bloklanmaydi)
+    """
+
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or config.EVENT_QUEUE_SIZE
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.published = 0
+
+    def subscribe(self):
+        subscriber = DropOldestQueue(self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        subscriber.close()
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event, data):
+        """
+        Hodisani yuborish (istalgan thread'dan; sekin mijoz kutilmaydi)
+        """
+        with self._lock:
+            message = sse_message(event, data, next(self._ids))
+            self.published += 1
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            subscriber.put(message)
+
+    def stats(self):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            'subscribers': len(subscribers),
+            'published': self.published,
+            'dropped': sum(subscriber.dropped for subscriber in subscribers)
+        }
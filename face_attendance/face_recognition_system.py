@@ -1,13 +1,18 @@
 import face_recognition
 import cv2
-import pickle
 import os
 import numpy as np
-from datetime import datetime
 from pathlib import Path
 import concurrent.futures
-import csv
+import contextlib
+import threading
+import time
 import config
+import encoding_store
+from attendance_store import AttendanceWriter, create_attendance_store
+from encoding_cache import EncodingCache, cache_key
+from motion_gate import merge_boxes, pad_box
+from gallery import ENCODING_DIM, BruteForceMatcher, Gallery
 
 
 class FaceRecognitionSystem:
@@ -20,24 +25,83 @@ class FaceRecognitionSystem:
     3. Davomat yozish
     """
 
-    def __init__(self):
-        """Tizimni boshlash"""
-        self.known_face_encodings = []
-        self.known_face_names = []
-        self.known_face_ids = []
+    def __init__(self, load=True):
+        """
+        Tizimni boshlash
+
+        Args:
+            load: False bo'lsa diskdan hech narsa yuklanmaydi va davomat ombori ochilmaydi -
+                  galereya tashqaridan beriladi (masalan, camera_pool worker'lari shared memory'dan)
+        """
+        # Joriy galereya (o'zgarmas snapshot). O'quvchilar qulfsiz o'qiydi,
+        # yozuvchilar yangi snapshot yaratib, bitta atomik o'zlashtirish bilan almashtiradi.
+        self.gallery = Gallery.empty()
+        self._enroll_lock = threading.Lock()
+
+        # Hodisa tinglovchilari: (event, data) -> None (masalan, app'dagi EventBus.publish)
+        self.listeners = []
+
+        # Tanib olish bosqichlari vaqti va tezkor oldindan aniqlash (ixtiyoriy)
+        self.pipeline_stats = PipelineStats()
+        self.cascade = load_cascade() if config.USE_CASCADE_PREDETECTOR else None
+        self.encoding_cache = None
+
+        # Davomat faqat asosiy jarayonda (worker'lar hodisani ota jarayonga yuboradi)
+        self.attendance = None
+
+        if not load:
+            return
 
         # Papkalarni yaratish
         config.create_required_directories()
 
+        # Davomat fayli va bugungi kun indeksi (takroriy tekshirish O(1)).
+        # Write-behind: disk I/O video oqimidan tashqarida, fon thread'ida
+        self.attendance = create_attendance_store()
+        if config.ATTENDANCE_WRITE_BEHIND:
+            self.attendance = AttendanceWriter(self.attendance)
+
+        # Rasm mazmuni bo'yicha encoding keshi
+        self.encoding_cache = EncodingCache()
+
         # Encoding'larni yuklash (agar mavjud bo'lsa)
         self.load_encodings()
 
+    # Eski kod bilan moslik: qatorma-qator ko'rinishlar joriy snapshot'dan olinadi
+    @property
+    def known_face_encodings(self):
+        return self.gallery.matrix
+
+    @property
+    def known_face_ids(self):
+        return self.gallery.row_ids
+
+    @property
+    def known_face_names(self):
+        return self.gallery.row_names
+
+    @property
+    def gallery_matrix(self):
+        return self.gallery.matrix
+
+    @property
+    def gallery_labels(self):
+        return self.gallery.labels
+
+    @property
+    def matcher(self):
+        return self.gallery.matcher
+
     # ===== 1. ENCODING YARATISH VA SAQLASH =====
 
     def create_encodings_from_dataset(self):
         """
         Dataset papkasidan barcha rasmlarni o'qib, encoding yaratadi
         va saqlaydi. Bu jarayon FAQAT BIR MARTA bajariladi!
+        Keyingi o'zgarishlar uchun add_student / add_photos / remove_student.
+
+        Yangi galereya alohida yig'iladi va tayyor bo'lgach atomik almashtiriladi,
+        shuning uchun video oqim jarayon davomida eski galereya bilan ishlayveradi.
 
         Dataset strukturasi:
         dataset/
@@ -52,10 +116,6 @@ class FaceRecognitionSystem:
         print("🔄 ENCODING YARATISH JARAYONI BOSHLANDI...")
         print("=" * 60)
 
-        self.known_face_encodings = []
-        self.known_face_names = []
-        self.known_face_ids = []
-
         # Dataset papkasini tekshirish
         if not os.path.exists(config.DATASET_DIR):
             print("❌ Dataset papkasi topilmadi!")
@@ -69,20 +129,39 @@ class FaceRecognitionSystem:
             print("⚠️  Dataset bo'sh!")
             return False
 
-        total_images = 0
-        successful_encodings = 0
+        # Barcha rasmlar ro'yxati (talaba bo'yicha)
+        image_paths = []
+        image_ids = []
+        for student_id in student_folders:
+            student_images = list_student_images(student_id)
+            image_paths.extend(student_images)
+            image_ids.extend([student_id] * len(student_images))
 
-        # Parallel processing yoki oddiy processing
-        if config.USE_PARALLEL_PROCESSING:
-            successful_encodings = self._process_dataset_parallel(student_folders)
-        else:
-            for student_id in student_folders:
-                count = self._process_student_folder(student_id)
-                successful_encodings += count
+        print(f"🖼️  Jami rasmlar: {len(image_paths)}")
+
+        # Faqat keshda yo'q (yangi yoki o'zgargan) rasmlar encode qilinadi
+        self.encoding_cache.reset_stats()
+        results, keys = self._encode_images(image_paths, parallel=config.USE_PARALLEL_PROCESSING)
+
+        # O'chirilgan rasmlar yozuvlarini keshdan tozalash
+        self.encoding_cache.prune(key for key in keys if key is not None)
+        self.encoding_cache.save()
+        print(self.encoding_cache.summary())
+
+        encodings = []
+        ids = []
+        for student_id, encoding in zip(image_ids, results):
+            if encoding is not None:
+                encodings.append(encoding)
+                ids.append(student_id)
+
+        successful_encodings = len(encodings)
 
         # Natijani saqlash
         if successful_encodings > 0:
-            self.save_encodings()
+            names = [default_student_name(student_id) for student_id in ids]
+            with self._enroll_lock:
+                self._publish(Gallery.from_rows(encodings, ids, names))
             print("\n" + "=" * 60)
             print(f"✅ MUVAFFAQIYATLI YAKUNLANDI!")
             print(f"📊 Jami talabalar: {len(student_folders)}")
@@ -93,183 +172,430 @@ class FaceRecognitionSystem:
             print("❌ Encoding yaratilmadi!")
             return False
 
-    def _process_student_folder(self, student_id):
+    def _encode_images(self, image_paths, parallel=False):
         """
-        Bitta talaba papkasidagi barcha rasmlardan encoding yaratadi
+        Rasmlardan encoding olish: avval keshdan, qolganlari encode qilinadi
+
+        Returns:
+            tuple: (encoding'lar yoki None ro'yxati, kesh kalitlari ro'yxati)
         """
-        student_path = os.path.join(config.DATASET_DIR, student_id)
-        image_files = [f for f in os.listdir(student_path)
-                       if f.lower().endswith(('.jpg', '.jpeg', '.png'))]
+        results = [None] * len(image_paths)
+        keys = [None] * len(image_paths)
+        missing = []
 
-        if not image_files:
-            return 0
+        for i, image_path in enumerate(image_paths):
+            try:
+                keys[i] = cache_key(image_path)
+            except OSError as e:
+                print(f"  ❌ {os.path.basename(image_path)} - o'qib bo'lmadi: {e}")
+                continue
+
+            found, encoding = self.encoding_cache.lookup(keys[i])
+            if found:
+                results[i] = encoding
+            else:
+                missing.append(i)
+
+        if missing:
+            missing_paths = [image_paths[i] for i in missing]
+            if parallel:
+                encoded = self._process_dataset_parallel(missing_paths)
+            else:
+                encoded = map(encode_image, missing_paths)
+
+            for i, encoding in zip(missing, encoded):
+                results[i] = encoding
+                self.encoding_cache.store(keys[i], encoding)
+
+        return results, keys
+
+    def _process_dataset_parallel(self, image_paths):
+        """
+        Parallel processing yordamida tezroq encoding yaratish
+        """
+        return encode_images_parallel(image_paths)
 
-        print(f"\n👤 {student_id} - {len(image_files)} ta rasm")
+    # ===== 1.1 BOSQICHMA-BOSQICH (INCREMENTAL) RO'YXATGA OLISH =====
 
-        successful_count = 0
+    def add_student(self, student_id, name=None, image_paths=None):
+        """
+        Yangi talabani qo'shish - faqat uning rasmlari encode qilinadi
 
-        for image_file in image_files:
-            image_path = os.path.join(student_path, image_file)
+        Args:
+            student_id: Talaba ID
+            name: Talaba ismi (default: Talaba_<id>)
+            image_paths: Rasmlar yo'llari (default: dataset/<student_id>/ dagi barcha rasmlar)
 
-            try:
-                # Rasmni yuklash
-                image = face_recognition.load_image_file(image_path)
-
-                # Yuzni topish va encoding yaratish
-                face_encodings = face_recognition.face_encodings(
-                    image,
-                    model=config.FACE_RECOGNITION_MODEL,
-                    num_jitters=1  # Tezlik uchun kam qiymat
-                )
+        Returns:
+            int: qo'shilgan encoding'lar soni
+        """
+        if student_id in self.gallery.student_index:
+            raise ValueError(f"Talaba allaqachon mavjud: {student_id}")
 
-                if face_encodings:
-                    # Birinchi yuzni olish (agar bir nechta yuz bo'lsa)
-                    encoding = face_encodings[0]
+        if image_paths is None:
+            image_paths = list_student_images(student_id)
 
-                    self.known_face_encodings.append(encoding)
-                    self.known_face_ids.append(student_id)
-                    self.known_face_names.append(f"Talaba_{student_id}")
+        return self._enroll(student_id, name or default_student_name(student_id), image_paths)
 
-                    successful_count += 1
-                    print(f"  ✅ {image_file} - encoding yaratildi")
-                else:
-                    print(f"  ⚠️  {image_file} - yuz topilmadi")
+    def add_photos(self, student_id, image_paths, replace=None):
+        """
+        Mavjud talabaga yangi rasmlar qo'shish (faqat shu rasmlar encode qilinadi)
 
-            except Exception as e:
-                print(f"  ❌ {image_file} - xato: {e}")
+        Args:
+            replace: ustiga yozilgan rasmlarning eski encoding'lari - talabaning
+                     shu encoding'lari galereyadan olib tashlanadi (photo_encodings)
+
+        Returns:
+            int: qo'shilgan encoding'lar soni
+        """
+        gallery = self.gallery
+        if student_id not in gallery.student_index:
+            raise ValueError(f"Talaba topilmadi: {student_id}")
 
-        return successful_count
+        name = gallery.student_names[gallery.student_index[student_id]]
+        return self._enroll(student_id, name, image_paths, replace=replace)
 
-    def _process_dataset_parallel(self, student_folders):
+    def photo_encodings(self, image_paths):
         """
-        Parallel processing yordamida tezroq encoding yaratish
+        Rasmlar encoding'lari (kesh orqali - odatda qayta encode qilinmaydi).
+        Rasm ustiga yozilishidan oldin eski encoding'ni olish uchun.
+
+        Returns:
+            list: yuz topilgan rasmlar encoding'lari
+        """
+        results, _ = self._encode_images(image_paths)
+        return [encoding for encoding in results if encoding is not None]
+
+    def remove_student(self, student_id):
         """
-        print(f"⚡ Parallel processing ishga tushirildi (CPU cores: {config.NUM_CPU_CORES or 'auto'})")
+        Talabani galereyadan o'chirish
 
-        with concurrent.futures.ProcessPoolExecutor(
-                max_workers=config.NUM_CPU_CORES
-        ) as executor:
-            results = executor.map(self._process_student_folder, student_folders)
+        Returns:
+            int: o'chirilgan encoding'lar soni
+        """
+        with self._enroll_lock:
+            current = self.gallery
+            if student_id not in current.student_index:
+                raise ValueError(f"Talaba topilmadi: {student_id}")
+
+            updated = current.without_student(student_id)
+            self._publish(updated)
+
+        removed = len(current.matrix) - len(updated.matrix)
+        print(f"🗑️  Talaba o'chirildi: {student_id} ({removed} ta encoding)")
+        return removed
 
-        return sum(results)
+    def _enroll(self, student_id, name, image_paths, replace=None):
+        """
+        Rasmlarni encode qilish (qulfsiz, sekin qism) va galereyaga qo'shish
+        """
+        results, _ = self._encode_images(image_paths)
+        self.encoding_cache.save()
+
+        encodings = [encoding for encoding in results if encoding is not None]
+        if not encodings:
+            if replace:
+                # Yangi rasmda yuz yo'q, lekin ustiga yozilgan rasm encoding'lari baribir eskirdi
+                with self._enroll_lock:
+                    if student_id in self.gallery.student_index:
+                        self._publish(self.gallery.with_rows([], student_id, name, replace=replace))
+            print(f"⚠️  {student_id} - yuz topilmadi, yangi encoding qo'shilmadi")
+            return 0
+
+        with self._enroll_lock:
+            self._publish(self.gallery.with_rows(encodings, student_id, name, replace=replace))
+
+        print(f"✅ {student_id} - {len(encodings)} ta encoding qo'shildi")
+        return len(encodings)
+
+    def _publish(self, gallery):
+        """
+        Yangi snapshot'ni diskka yozish va atomik almashtirish.
+        _enroll_lock ichida chaqiriladi (yozuvchilar ketma-ket).
+        """
+        encoding_store.save_gallery(
+            gallery.matrix,
+            gallery.labels,
+            gallery.student_ids,
+            gallery.student_names
+        )
+        self.gallery = gallery
+        self._notify_gallery()
 
     def save_encodings(self):
         """
-        Encoding'larni PKL faylga saqlash
+        Joriy galereyani binar formatga saqlash (encoding_store)
         Bu jarayon keyingi ishlatishlar uchun encoding'larni saqlaydi
         """
-        data = {
-            'encodings': self.known_face_encodings,
-            'ids': self.known_face_ids,
-            'names': self.known_face_names,
-            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
-
-        with open(config.ENCODINGS_FILE, 'wb') as f:
-            pickle.dump(data, f)
+        gallery = self.gallery
+        encoding_store.save_gallery(
+            gallery.matrix,
+            gallery.labels,
+            gallery.student_ids,
+            gallery.student_names
+        )
 
-        print(f"\n💾 Encoding'lar saqlandi: {config.ENCODINGS_FILE}")
+        print(f"\n💾 Encoding'lar saqlandi: {config.GALLERY_MATRIX_FILE}")
 
     def load_encodings(self):
         """
-        Avval saqlangan encoding'larni yuklash
-        Agar fayl bo'lmasa, bo'sh ro'yxat qaytaradi
+        Avval saqlangan encoding'larni yuklash (memory-mapped, deyarli O(1))
+        Yangi format bo'lmasa (yoki galereya bo'sh bo'lsa), eski PKL fayllar avtomatik ko'chiriladi
         """
-        if os.path.exists(config.ENCODINGS_FILE):
-            try:
-                with open(config.ENCODINGS_FILE, 'rb') as f:
-                    data = pickle.load(f)
-
-                self.known_face_encodings = data['encodings']
-                self.known_face_ids = data['ids']
-                self.known_face_names = data['names']
+        try:
+            data = encoding_store.load_gallery()
+            # Bo'sh galereya (masalan, bo'sh PKL'dan ko'chirilgan) - ko'chirish qayta uriniladi
+            empty = data is None or len(data['matrix']) == 0
+            if empty and encoding_store.migrate_legacy_pickle():
+                data = encoding_store.load_gallery()
+        except Exception as e:
+            print(f"⚠️  Encoding yuklashda xato: {e}")
+            return False
 
-                print(f"✅ Encoding'lar yuklandi: {len(self.known_face_encodings)} ta")
-                print(f"📅 Yaratilgan: {data.get('created_at', 'Noma\'lum')}")
-                return True
-            except Exception as e:
-                print(f"⚠️  Encoding yuklashda xato: {e}")
-                return False
-        else:
+        if data is None:
             print("ℹ️  Encoding fayli topilmadi. Yangi yarating!")
             return False
 
+        self.gallery = Gallery(data['matrix'], data['labels'],
+                               data['student_ids'], data['student_names'])
+        self._notify_gallery()
+
+        print(f"✅ Encoding'lar yuklandi: {len(self.gallery.matrix)} ta")
+        created_at = data.get('created_at') or "Noma'lum"
+        print(f"📅 Yaratilgan: {created_at}")
+        return True
+
+    def match_encodings(self, face_encodings, gallery=None):
+        """
+        Kadrdagi barcha yuzlarni galereya bilan BIR matritsa amalida taqqoslash
+
+        Args:
+            face_encodings: (M, 128) encoding'lar ro'yxati yoki massivi
+            gallery: snapshot (default: joriy galereya)
+
+        Returns:
+            tuple: (best_indices, best_distances, matches) - har biri M uzunlikda
+        """
+        gallery = gallery or self.gallery
+        probes = np.asarray(face_encodings, dtype=np.float32).reshape(-1, ENCODING_DIM)
+        best_indices, best_distances = gallery.matcher.search(probes)
+        matches = best_distances <= config.FACE_MATCH_TOLERANCE
+
+        if config.MATCHER_VERIFY and not isinstance(gallery.matcher, BruteForceMatcher):
+            self._verify_matches(gallery, probes, best_indices, matches)
+
+        return best_indices, best_distances, matches
+
+    def _verify_matches(self, gallery, probes, best_indices, matches):
+        """
+        Tekshirish rejimi: natijani to'liq (brute-force) qidiruv bilan solishtirish.
+        Tolerance ichidagi har bir qaror bir xil bo'lishi shart.
+        """
+        brute = BruteForceMatcher(gallery.matrix, gallery.sq_norms, gallery.labels)
+        exact_indices, exact_distances = brute.search(probes)
+        exact_matches = exact_distances <= config.FACE_MATCH_TOLERANCE
+
+        for i in range(len(probes)):
+            same = exact_matches[i] == matches[i] and (
+                not matches[i] or
+                gallery.labels[exact_indices[i]] == gallery.labels[best_indices[i]]
+            )
+            if not same:
+                print(f"⚠️  Matcher farqi: {config.FACE_MATCHER} -> {best_indices[i]}, "
+                      f"brute -> {exact_indices[i]} ({exact_distances[i]:.4f})")
+
     # ===== 2. REAL-TIME YUZNI TANIB OLISH =====
 
-    def recognize_faces_in_frame(self, frame):
+    def recognize_faces_in_frame(self, frame, scale=None, upsample=None):
         """
         Bir kadrda (frame) yuzlarni tanib olish
 
         Args:
             frame: OpenCV frame (numpy array)
+            scale, upsample: None bo'lsa config.FRAME_SCALE / FACE_DETECTION_UPSAMPLE
 
         Returns:
-            list: [(name, location), ...] formatida natija
+            list: [{'name', 'student_id', 'location', 'distance'}, ...] formatida natija
         """
+        # Kadr davomida bitta snapshot ishlatiladi (almashtirish xavfsiz)
+        gallery = self.gallery
+
         # Encoding'lar mavjudligini tekshirish
-        if not self.known_face_encodings:
+        if len(gallery.matrix) == 0:
             return []
 
+        rgb_frame, face_locations, full_locations = self._detect_faces(frame, None, scale, upsample)
+        identities = self._identify(gallery, rgb_frame, face_locations)
+
+        results = []
+        for (name, student_id, distance), location in zip(identities, full_locations):
+            results.append({
+                'name': name,
+                'student_id': student_id,
+                'location': location,
+                'distance': distance
+            })
+
+        return results
+
+    def recognize_faces_tracked(self, frame, tracker, regions=None, scale=None, upsample=None):
+        """
+        Tracker bilan tanib olish: yuzlar har safar topiladi, lekin ishonchli
+        tanilgan va joyi deyarli o'zgarmagan yuzlar qayta encode qilinmaydi
+
+        Args:
+            frame: OpenCV frame
+            tracker: FaceTracker (har bir kamera uchun alohida)
+            regions: yuz faqat shu hududlarda qidiriladi (None = butun kadr)
+            scale, upsample: None bo'lsa config qiymatlari (QualityController beradi)
+
+        Returns:
+            list: recognize_faces_in_frame formatida + 'track_id'
+        """
+        gallery = self.gallery
+        if len(gallery.matrix) == 0:
+            return []
+
+        rgb_frame, face_locations, full_locations = self._detect_faces(frame, regions, scale, upsample)
+        pending = tracker.update(full_locations, frame, regions)
+
+        if pending:
+            pending_locations = [face_locations[di] for di, _ in pending]
+            identities = self._identify(gallery, rgb_frame, pending_locations)
+            for (_, track), (name, student_id, distance) in zip(pending, identities):
+                tracker.set_identity(track, name, student_id, distance)
+
+        return tracker.results()
+
+    def _detect_faces(self, frame, regions=None, scale=None, upsample=None):
+        """
+        Kichraytirilgan kadrda yuzlarni topish
+
+        Args:
+            frame: OpenCV frame
+            regions: [(top, right, bottom, left), ...] asl o'lchamda -
+                     berilsa, HOG faqat shu hududlarda ishlaydi
+            scale: kichraytirish koeffitsienti (None = config.FRAME_SCALE)
+            upsample: HOG upsample (None = config.FACE_DETECTION_UPSAMPLE)
+
+        Returns:
+            tuple: (rgb_frame, kichik kadrdagi joylar, asl o'lchamdagi joylar)
+        """
+        scale = scale or config.FRAME_SCALE
+        upsample = config.FACE_DETECTION_UPSAMPLE if upsample is None else upsample
+
         # Rasmni kichraytirish (tezlik uchun)
-        small_frame = cv2.resize(frame, (0, 0), fx=config.FRAME_SCALE, fy=config.FRAME_SCALE)
+        small_frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale)
 
         # BGR dan RGB ga o'tkazish (face_recognition RGB bilan ishlaydi)
         rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
 
+        self.pipeline_stats.count_frame()
+
+        # Tezkor oldindan aniqlash: yuz yo'q bo'lsa HOG ishlamaydi
+        if self.cascade is not None:
+            with self.pipeline_stats.stage('predetect'):
+                candidates = self._cascade_candidates(small_frame, regions, frame.shape[:2], scale)
+            if not candidates:
+                self.pipeline_stats.count_rejected()
+                return rgb_frame, [], []
+            regions = candidates
+
         # Yuzlarni topish
-        face_locations = face_recognition.face_locations(
-            rgb_frame,
-            number_of_times_to_upsample=config.FACE_DETECTION_UPSAMPLE
-        )
+        with self.pipeline_stats.stage('detect'):
+            if regions is None:
+                face_locations = face_recognition.face_locations(
+                    rgb_frame,
+                    number_of_times_to_upsample=upsample
+                )
+            else:
+                face_locations = self._detect_in_regions(rgb_frame, regions, scale, upsample)
 
-        # Yuz encoding'larini yaratish
-        face_encodings = face_recognition.face_encodings(
-            rgb_frame,
-            face_locations,
-            model=config.FACE_RECOGNITION_MODEL
+        # Location'ni asl o'lchamga qaytarish
+        full_locations = [
+            tuple(int(value / scale) for value in location)
+            for location in face_locations
+        ]
+
+        return rgb_frame, face_locations, full_locations
+
+    def _cascade_candidates(self, small_frame, regions, frame_shape, scale):
+        """
+        Haar cascade bilan yuz bo'lishi mumkin bo'lgan hududlar (asl o'lchamda, kengaytirilgan)
+
+        Args:
+            regions: harakat hududlari - berilsa, faqat ular bilan kesishgan nomzodlar
+        """
+        gray = cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY)
+        faces = self.cascade.detectMultiScale(
+            gray,
+            scaleFactor=config.CASCADE_SCALE_FACTOR,
+            minNeighbors=config.CASCADE_MIN_NEIGHBORS,
+            minSize=(config.CASCADE_MIN_SIZE, config.CASCADE_MIN_SIZE)
         )
 
-        # Har bir yuzni taqqoslash
-        results = []
-        for face_encoding, face_location in zip(face_encodings, face_locations):
-            # Barcha ma'lum yuzlar bilan taqqoslash
-            matches = face_recognition.compare_faces(
-                self.known_face_encodings,
-                face_encoding,
-                tolerance=config.FACE_MATCH_TOLERANCE
-            )
+        height, width = frame_shape
+        candidates = []
+        for x, y, w, h in faces:
+            box = tuple(int(value / scale) for value in (y, x + w, y + h, x))
+            box = pad_box(box, config.CASCADE_PADDING, height, width)
+            if regions is None or any(_overlaps(box, region) for region in regions):
+                candidates.append(box)
 
-            name = "Noma'lum"
-            student_id = None
+        return merge_boxes(candidates)
 
-            # Eng yaqin o'xshashlikni topish
-            face_distances = face_recognition.face_distance(
-                self.known_face_encodings,
-                face_encoding
-            )
+    def _detect_in_regions(self, rgb_frame, regions, scale, upsample):
+        """
+        HOG aniqlashni faqat berilgan hududlarda ishlatish (kichik kadr koordinatalarida)
+        """
+        face_locations = []
+        for top, right, bottom, left in regions:
+            top, right, bottom, left = (int(value * scale)
+                                        for value in (top, right, bottom, left))
+            crop = rgb_frame[top:bottom, left:right]
+            if crop.size == 0:
+                continue
+
+            for t, r, b, l in face_recognition.face_locations(
+                    np.ascontiguousarray(crop),
+                    number_of_times_to_upsample=upsample):
+                face_locations.append((t + top, r + left, b + top, l + left))
+
+        return face_locations
+
+    def _identify(self, gallery, rgb_frame, face_locations):
+        """
+        Berilgan joylardagi yuzlarni encode qilib, galereya bilan taqqoslash
 
-            if len(face_distances) > 0:
-                best_match_index = np.argmin(face_distances)
+        Returns:
+            list: [(name, student_id, distance), ...]
+        """
+        if not face_locations:
+            return []
 
-                if matches[best_match_index]:
-                    name = self.known_face_names[best_match_index]
-                    student_id = self.known_face_ids[best_match_index]
+        # Yuz encoding'larini yaratish
+        with self.pipeline_stats.stage('encode'):
+            face_encodings = face_recognition.face_encodings(
+                rgb_frame,
+                face_locations,
+                model=config.FACE_RECOGNITION_MODEL
+            )
 
-            # Location'ni asl o'lchamga qaytarish
-            top, right, bottom, left = face_location
-            top = int(top / config.FRAME_SCALE)
-            right = int(right / config.FRAME_SCALE)
-            bottom = int(bottom / config.FRAME_SCALE)
-            left = int(left / config.FRAME_SCALE)
+        # Barcha yuzlarni bir martada taqqoslash
+        with self.pipeline_stats.stage('match'):
+            best_indices, best_distances, matches = self.match_encodings(face_encodings, gallery)
 
-            results.append({
-                'name': name,
-                'student_id': student_id,
-                'location': (top, right, bottom, left),
-                'distance': float(face_distances[best_match_index]) if len(face_distances) > 0 else 1.0
-            })
+        identities = []
+        for i in range(len(face_encodings)):
+            if matches[i]:
+                best_match_index = best_indices[i]
+                identities.append((gallery.row_names[best_match_index],
+                                   gallery.row_ids[best_match_index],
+                                   float(best_distances[i])))
+            else:
+                identities.append(("Noma'lum", None, float(best_distances[i])))
 
-        return results
+        return identities
 
     # ===== 3. DAVOMAT YOZISH =====
 
@@ -281,34 +607,215 @@ class FaceRecognitionSystem:
             student_id: Talaba ID
             student_name: Talaba ismi
         """
-        now = datetime.now()
-        date_str = now.strftime(config.ATTENDANCE_DATE_FORMAT)
-        time_str = now.strftime(config.ATTENDANCE_TIME_FORMAT)
+        marked, date_str, time_str = self.attendance.mark(student_id, student_name)
+        if not marked:
+            print(f"ℹ️  {student_name} bugun allaqachon qayd qilingan")
+            return False
 
-        # CSV faylni yaratish (agar mavjud bo'lmasa)
-        file_exists = os.path.exists(config.ATTENDANCE_FILE)
+        print(f"✅ Davomat qayd qilindi: {student_name} ({date_str} {time_str})")
+        self._notify('attendance', {
+            'student_id': student_id,
+            'name': student_name,
+            'date': date_str,
+            'time': time_str,
+            'count': self.attendance.today_count()
+        })
+        return True
 
-        # Bugungi davomat mavjudligini tekshirish
-        if file_exists and config.UNIQUE_ATTENDANCE_PER_DAY:
-            with open(config.ATTENDANCE_FILE, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if len(row) >= 3 and row[0] == student_id and row[2] == date_str:
-                        print(f"ℹ️  {student_name} bugun allaqachon qayd qilingan")
-                        return False
+    # ===== 4. HODISALAR =====
 
-        # Davomat yozish
-        with open(config.ATTENDANCE_FILE, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
+    def _notify(self, event, data):
+        for listener in self.listeners:
+            try:
+                listener(event, data)
+            except Exception as e:
+                print(f"⚠️  Hodisa tinglovchisida xato ({event}): {e}")
 
-            # Header yozish (agar yangi fayl bo'lsa)
-            if not file_exists:
-                writer.writerow(['Student_ID', 'Name', 'Date', 'Time'])
+    def _notify_gallery(self):
+        roster = self.gallery.roster
+        self._notify('gallery', {
+            'total_students': roster.total_students,
+            'total_encodings': roster.total_encodings,
+            'roster_etag': roster.etag
+        })
 
-            writer.writerow([student_id, student_name, date_str, time_str])
 
-        print(f"✅ Davomat qayd qilindi: {student_name} ({date_str} {time_str})")
-        return True
+# ===== TANIB OLISH BOSQICHLARI STATISTIKASI =====
+
+class PipelineStats:
+    """
+    Har bir bosqich (predetect, detect, encode, match) uchun umumiy vaqt va
+    chaqiruvlar soni, hamda oldindan aniqlash tashlagan kadrlar soni.
+    Bir nechta stream bir vaqtda yozishi mumkin - lock bilan.
+    """
+
+    STAGES = ('predetect', 'detect', 'encode', 'match')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.rejected = 0
+        self.totals = dict.fromkeys(self.STAGES, 0.0)
+        self.calls = dict.fromkeys(self.STAGES, 0)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.totals[name] += elapsed
+                self.calls[name] += 1
+
+    def count_frame(self):
+        with self._lock:
+            self.frames += 1
+
+    def count_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: /api/status uchun JSON-ga mos statistika
+        """
+        with self._lock:
+            return {
+                'frames': self.frames,
+                'predetector_rejected': self.rejected,
+                'stages': {
+                    name: {
+                        'calls': self.calls[name],
+                        'total_ms': round(self.totals[name] * 1000, 1),
+                        'avg_ms': round(self.totals[name] * 1000 / self.calls[name], 2)
+                        if self.calls[name] else 0.0
+                    }
+                    for name in self.STAGES
+                }
+            }
+
+
+def load_cascade():
+    """
+    Haar cascade'ni yuklash. Topilmasa None (oldindan aniqlash o'chiriladi).
+    """
+    haarcascades = getattr(getattr(cv2, 'data', None), 'haarcascades', '')
+    cascade = None
+    if hasattr(cv2, 'CascadeClassifier'):
+        cascade = cv2.CascadeClassifier(os.path.join(haarcascades, config.CASCADE_FILE))
+    if cascade is None or cascade.empty():
+        print(f"⚠️  Haar cascade yuklanmadi: {config.CASCADE_FILE} - oldindan aniqlash o'chirildi")
+        return None
+    return cascade
+
+
+def _overlaps(a, b):
+    """Ikki (top, right, bottom, left) to'rtburchak kesishadimi"""
+    return a[3] < b[1] and b[3] < a[1] and a[0] < b[2] and b[0] < a[2]
+
+
+def default_student_name(student_id):
+    """Dataset'dan olingan talaba uchun default ism"""
+    return f"Talaba_{student_id}"
+
+
+def list_student_images(student_id):
+    """
+    dataset/<student_id>/ ichidagi rasm fayllari yo'llari
+    """
+    student_path = os.path.join(config.DATASET_DIR, student_id)
+    if not os.path.isdir(student_path):
+        return []
+    return [os.path.join(student_path, f) for f in sorted(os.listdir(student_path))
+            if f.lower().endswith(('.jpg', '.jpeg', '.png'))]
+
+
+def encode_image(image_path):
+    """
+    Bitta rasmdan encoding yaratish.
+    Modul darajasidagi funksiya - ProcessPoolExecutor'ga uzatish mumkin.
+
+    Returns:
+        np.ndarray yoki None (yuz topilmasa yoki xato bo'lsa)
+    """
+    try:
+        # Rasmni yuklash
+        image = face_recognition.load_image_file(image_path)
+
+        # Yuzni topish va encoding yaratish
+        face_encodings = face_recognition.face_encodings(
+            image,
+            model=config.FACE_RECOGNITION_MODEL,
+            num_jitters=config.ENCODING_NUM_JITTERS
+        )
+    except Exception as e:
+        print(f"  ❌ {os.path.basename(image_path)} - xato: {e}")
+        return None
+
+    # Birinchi yuzni olish (agar bir nechta yuz bo'lsa)
+    return face_encodings[0] if face_encodings else None
+
+
+def _encode_chunk(chunk):
+    """
+    Worker jarayonida rasmlar bo'lagini encode qilish
+
+    Args:
+        chunk: [(pozitsiya, rasm yo'li), ...]
+
+    Returns:
+        list: [(pozitsiya, encoding yoki None), ...] - natija ota jarayonga qaytadi
+    """
+    return [(position, encode_image(image_path)) for position, image_path in chunk]
+
+
+def encode_images_parallel(image_paths, workers=None, chunk_size=None):
+    """
+    Rasmlarni barcha CPU core'larda encode qilish.
+
+    Ish talaba bo'yicha emas, rasm bo'laklari (PARALLEL_CHUNK_SIZE) bo'yicha
+    taqsimlanadi - ko'p rasmli talaba bitta worker'ni band qilib qo'ymaydi.
+    Natijalar ota jarayonga qaytariladi va tayyor bo'lishi bilan progress chiqadi.
+
+    Returns:
+        list: image_paths bilan bir xil tartibda encoding yoki None
+    """
+    workers = workers or config.NUM_CPU_CORES or os.cpu_count() or 1
+    chunk_size = chunk_size or config.PARALLEL_CHUNK_SIZE
+    total = len(image_paths)
+    results = [None] * total
+    if total == 0:
+        return results
+
+    indexed = list(enumerate(image_paths))
+    chunks = [indexed[i:i + chunk_size] for i in range(0, total, chunk_size)]
+
+    print(f"⚡ Parallel processing ishga tushirildi "
+          f"({workers} ta worker, {len(chunks)} ta bo'lak, {total} ta rasm)")
+
+    started = time.perf_counter()
+    done = 0
+    next_report = 0.0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_encode_chunk, chunk) for chunk in chunks]
+
+        for future in concurrent.futures.as_completed(futures):
+            chunk_results = future.result()
+            for position, encoding in chunk_results:
+                results[position] = encoding
+            done += len(chunk_results)
+
+            # Progress (taxminan har 1 soniyada va oxirida)
+            elapsed = time.perf_counter() - started
+            if elapsed >= next_report or done == total:
+                rate = done / elapsed if elapsed > 0 else 0.0
+                print(f"  ⏳ {done}/{total} ({done * 100 // total}%) - {rate:.1f} rasm/s")
+                next_report = elapsed + 1.0
+
+    return results
 
 
 # ===== ASOSIY SINOV =====
@@ -321,7 +828,7 @@ if __name__ == "__main__":
     system = FaceRecognitionSystem()
 
     # Encoding'lar mavjud bo'lmasa, yaratish
-    if not system.known_face_encodings:
+    if len(system.known_face_encodings) == 0:
         print("\n⚠️  Encoding'lar topilmadi!")
         print("📝 Dataset papkasiga talabalar rasmlarini joylashtiring")
         print(f"📁 Dataset papkasi: {config.DATASET_DIR}")
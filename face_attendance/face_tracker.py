@@ -0,0 +1,216 @@
+"""
+YUZLARNI KUZATISH (TRACKING)
+
+Har bir aniqlash (detection) natijasi IoU bo'yicha mavjud track'larga bog'lanadi.
+Ishonchli tanilgan track qayta encode qilinmaydi - faqat track yo'qolsa yoki
+yuz joyi sezilarli o'zgarsa. Oraliq kadrlarda oxirgi natijalar (yoki OpenCV
+tracker bilan yangilangan joylar) chiziladi.
+
+Joylashuv formati face_recognition bilan bir xil: (top, right, bottom, left).
+"""
+import itertools
+import cv2
+import numpy as np
+import config
+
+# TRACKER_BACKEND -> OpenCV konstruktor nomi (opencv-contrib-python)
+CV_TRACKERS = {
+    'kcf': 'TrackerKCF_create',
+    'csrt': 'TrackerCSRT_create',
+    'mosse': 'TrackerMOSSE_create',
+}
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """
+    Ikki to'plam (top, right, bottom, left) to'rtburchaklar orasidagi IoU
+
+    Returns:
+        np.ndarray: (len(a), len(b))
+    """
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    top = np.maximum(a[:, None, 0], b[None, :, 0])
+    right = np.minimum(a[:, None, 1], b[None, :, 1])
+    bottom = np.minimum(a[:, None, 2], b[None, :, 2])
+    left = np.maximum(a[:, None, 3], b[None, :, 3])
+
+    intersection = np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None)
+    area_a = (a[:, 1] - a[:, 3]) * (a[:, 2] - a[:, 0])
+    area_b = (b[:, 1] - b[:, 3]) * (b[:, 2] - b[:, 0])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-6), 0.0)
+
+
+def _create_cv_tracker(backend):
+    """
+    OpenCV tracker yaratish (cv2.legacy yoki cv2 ichidan). Topilmasa None.
+    """
+    name = CV_TRACKERS.get(backend)
+    if name is None:
+        return None
+    for module in (getattr(cv2, 'legacy', None), cv2):
+        factory = getattr(module, name, None) if module is not None else None
+        if factory is not None:
+            return factory()
+    return None
+
+
+def _contains(outer, inner):
+    """outer to'rtburchak inner'ni to'liq o'z ichiga oladimi"""
+    return (outer[0] <= inner[0] and outer[1] >= inner[1] and
+            outer[2] >= inner[2] and outer[3] <= inner[3])
+
+
+class Track:
+    """
+    Bitta kuzatilayotgan yuz
+    """
+
+    def __init__(self, track_id, location):
+        self.track_id = track_id
+        self.location = location
+        self.name = "Noma'lum"
+        self.student_id = None
+        self.distance = 1.0
+        self.identity_location = None  # Oxirgi marta encode qilingan joy
+        self.misses = 0
+        self.cv_tracker = None
+
+    @property
+    def confident(self):
+        return self.student_id is not None and self.distance <= config.TRACKER_CONFIDENT_DISTANCE
+
+    def as_result(self):
+        return {
+            'track_id': self.track_id,
+            'name': self.name,
+            'student_id': self.student_id,
+            'location': self.location,
+            'distance': self.distance
+        }
+
+
+class FaceTracker:
+    """
+    Kamera uchun track'lar to'plami (har bir kamera o'z tracker'iga ega)
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or config.TRACKER_BACKEND
+        self.tracks = []
+        self._ids = itertools.count(1)
+
+        if self.backend != 'iou' and _create_cv_tracker(self.backend) is None:
+            print(f"⚠️  OpenCV '{self.backend}' tracker topilmadi (opencv-contrib kerak), 'iou' ishlatiladi")
+            self.backend = 'iou'
+
+    def update(self, locations, frame=None, regions=None):
+        """
+        Yangi aniqlash natijalarini track'larga bog'lash
+
+        Args:
+            locations: kadrdagi yuz joylari (asl o'lchamda)
+            frame: BGR kadr (faqat OpenCV tracker'lar uchun)
+            regions: aniqlash faqat shu hududlarda bo'lgan bo'lsa (None = butun kadr).
+                     Hududlardan tashqaridagi track'lar "yo'qolgan" hisoblanmaydi.
+
+        Returns:
+            list: [(detection_index, track), ...] - encode qilinishi kerak bo'lganlar
+        """
+        matched_tracks = set()
+        detection_tracks = {}  # detection_index -> track
+
+        if self.tracks and locations:
+            ious = iou_matrix([t.location for t in self.tracks], locations)
+            # Greedy: eng katta IoU juftliklaridan boshlab
+            for flat in np.argsort(ious, axis=None)[::-1]:
+                ti, di = divmod(int(flat), len(locations))
+                if ious[ti, di] < config.TRACKER_IOU_THRESHOLD:
+                    break
+                if ti in matched_tracks or di in detection_tracks:
+                    continue
+                track = self.tracks[ti]
+                matched_tracks.add(ti)
+                detection_tracks[di] = track
+                track.location = tuple(locations[di])
+                track.misses = 0
+                self._reset_cv_tracker(track, frame)
+
+        # Topilmagan track'lar
+        survivors = []
+        for ti, track in enumerate(self.tracks):
+            if ti not in matched_tracks and self._searched(track, regions):
+                track.misses += 1
+                if track.misses > config.TRACKER_MAX_MISSED:
+                    continue
+            survivors.append(track)
+        self.tracks = survivors
+
+        # Yangi yuzlar - yangi track'lar
+        for di, location in enumerate(locations):
+            if di not in detection_tracks:
+                track = Track(next(self._ids), tuple(location))
+                self._reset_cv_tracker(track, frame)
+                self.tracks.append(track)
+                detection_tracks[di] = track
+
+        # Qaysi yuzlarni encode qilish kerak
+        pending = []
+        for di in range(len(locations)):
+            track = detection_tracks[di]
+            if not track.confident or track.identity_location is None:
+                pending.append((di, track))
+                continue
+            moved = iou_matrix([track.identity_location], [track.location])[0, 0]
+            if moved < config.TRACKER_REENCODE_IOU:
+                pending.append((di, track))
+
+        return pending
+
+    def set_identity(self, track, name, student_id, distance):
+        """
+        Encode va taqqoslash natijasini track'ga yozish
+        """
+        track.name = name
+        track.student_id = student_id
+        track.distance = distance
+        track.identity_location = track.location
+
+    def predict(self, frame):
+        """
+        Oraliq kadr: OpenCV tracker bo'lsa joylarni yangilaydi,
+        aks holda oxirgi ma'lum joylarni qaytaradi
+
+        Returns:
+            list: recognize_faces_in_frame bilan bir xil formatdagi natijalar
+        """
+        if self.backend != 'iou':
+            for track in self.tracks:
+                if track.cv_tracker is None:
+                    continue
+                ok, (x, y, w, h) = track.cv_tracker.update(frame)
+                if ok:
+                    track.location = (int(y), int(x + w), int(y + h), int(x))
+        return self.results()
+
+    def results(self):
+        """
+        Hozir ko'rinib turgan track'lar natijalari
+        """
+        return [track.as_result() for track in self.tracks if track.misses == 0]
+
+    @staticmethod
+    def _searched(track, regions):
+        """Track joyi to'liq aniqlash o'tkazilgan hududga tushadimi"""
+        if regions is None:
+            return True
+        return any(_contains(region, track.location) for region in regions)
+
+    def _reset_cv_tracker(self, track, frame):
+        if self.backend == 'iou' or frame is None:
+            return
+        top, right, bottom, left = track.location
+        track.cv_tracker = _create_cv_tracker(self.backend)
+        track.cv_tracker.init(frame, (left, top, right - left, bottom - top))
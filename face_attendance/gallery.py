@@ -0,0 +1,523 @@
+"""
+GALEREYA VA QIDIRUV (FAQAT NUMPY)
+
+- Gallery: o'zgarmas encoding'lar snapshot'i, Roster: talabalar indeksi
+- Matcher'lar: BruteForceMatcher (aniq), PrototypeMatcher, IVFMatcher (ANN)
+- recall_report: IVF'ni aniq qidiruv bilan solishtirish (benchmark.py)
+
+face_recognition'ga bog'liq emas - camera_pool worker'lari, benchmark va
+testlar modelni yuklamasdan ishlata oladi.
+"""
+import functools
+import hashlib
+import json
+import os
+import time
+import numpy as np
+import config
+import encoding_store
+
+# face_recognition (dlib) encoding o'lchami
+ENCODING_DIM = 128
+
+
+def pairwise_distances(probes, matrix, sq_norms):
+    """
+    Evklid masofalar matritsasi: |a - b| = sqrt(|a|^2 + |b|^2 - 2ab)
+
+    Args:
+        probes: (M, D) float32
+        matrix: (N, D) float32
+        sq_norms: (N,) matrix qatorlarining kvadrat normalari
+
+    Returns:
+        np.ndarray: (M, N) float32 masofalar
+    """
+    probe_sq = np.einsum('ij,ij->i', probes, probes)
+    d2 = probe_sq[:, None] + sq_norms[None, :] - 2.0 * (probes @ matrix.T)
+    np.maximum(d2, 0.0, out=d2)
+    return np.sqrt(d2, out=d2)
+
+
+
+# ===== GALEREYA (O'ZGARMAS SNAPSHOT) =====
+
+class Gallery:
+    """
+    O'zgarmas galereya snapshot'i:
+    - matrix: (N, 128) float32, C-contiguous (yoki memory-mapped, faqat o'qish)
+    - sq_norms: har bir qatorning kvadrat normasi
+    - labels: har bir qator uchun talaba indeksi (int32)
+    - student_ids / student_names: indeks -> student_id / ism
+    - matcher: shu snapshot uchun qurilgan qidiruv indeksi
+    - roster: talabalar ro'yxati indeksi (birinchi murojaatda, snapshot uchun bir marta)
+
+    O'zgartirish metodlari (with_rows, without_student) yangi snapshot qaytaradi.
+    """
+
+    def __init__(self, matrix, labels, student_ids, student_names, previous_matcher=None, index=None):
+        self.matrix = matrix
+        self.labels = labels
+        self.student_ids = list(student_ids)
+        self.student_names = list(student_names)
+        self.student_index = {student_id: i for i, student_id in enumerate(self.student_ids)}
+
+        for array in (matrix, labels):
+            if isinstance(array, np.ndarray) and not isinstance(array, np.memmap):
+                array.flags.writeable = False
+
+        self.sq_norms = np.einsum('ij,ij->i', matrix, matrix)
+        self.matcher = create_matcher(config.FACE_MATCHER, matrix, self.sq_norms, labels,
+                                      previous=previous_matcher, index=index)
+
+        # Qatorma-qator ko'rinishlar (eski API uchun)
+        label_list = labels.tolist()
+        self.row_ids = [self.student_ids[i] for i in label_list]
+        self.row_names = [self.student_names[i] for i in label_list]
+
+    @functools.cached_property
+    def roster(self):
+        return Roster(self)
+
+    @classmethod
+    def empty(cls):
+        return cls.from_rows([], [], [])
+
+    @classmethod
+    def from_rows(cls, encodings, ids, names):
+        """
+        Qatorma-qator ro'yxatlardan snapshot yaratish
+        """
+        return cls(*encoding_store.pack_rows(encodings, ids, names))
+
+    def with_rows(self, encodings, student_id, name, replace=None):
+        """
+        Bitta talabaga encoding'lar qo'shilgan yangi snapshot
+
+        Args:
+            replace: talabaning olib tashlanadigan encoding'lari (ustiga yozilgan rasmlar)
+        """
+        new_rows = np.asarray(encodings, dtype=np.float32).reshape(-1, ENCODING_DIM)
+        student_ids = list(self.student_ids)
+        student_names = list(self.student_names)
+        matrix, labels = self.matrix, self.labels
+
+        label = self.student_index.get(student_id)
+        if label is None:
+            label = len(student_ids)
+            student_ids.append(student_id)
+            student_names.append(name)
+        elif replace is not None and len(replace):
+            # Faqat shu talaba qatorlari orasidan aynan mos keladiganlar
+            old_rows = np.asarray(replace, dtype=np.float32).reshape(-1, ENCODING_DIM)
+            rows = np.flatnonzero(np.asarray(labels) == label)
+            same = (np.asarray(matrix)[rows][:, None, :] == old_rows[None, :, :]).all(axis=2).any(axis=1)
+            if same.any():
+                keep = np.ones(len(labels), dtype=bool)
+                keep[rows[same]] = False
+                matrix = np.asarray(matrix)[keep]
+                labels = np.asarray(labels)[keep]
+
+        matrix = np.concatenate([matrix, new_rows])
+        labels = np.concatenate([labels, np.full(len(new_rows), label, dtype=np.int32)])
+        return Gallery(matrix, labels, student_ids, student_names, previous_matcher=self.matcher)
+
+    def without_student(self, student_id):
+        """
+        Talabasiz yangi snapshot (qolgan yorliqlar qayta raqamlanadi)
+        """
+        label = self.student_index[student_id]
+        keep = np.asarray(self.labels) != label
+
+        labels = np.asarray(self.labels)[keep]
+        labels = np.where(labels > label, labels - 1, labels).astype(np.int32)
+        matrix = np.ascontiguousarray(np.asarray(self.matrix)[keep])
+
+        student_ids = self.student_ids[:label] + self.student_ids[label + 1:]
+        student_names = self.student_names[:label] + self.student_names[label + 1:]
+        return Gallery(matrix, labels, student_ids, student_names, previous_matcher=self.matcher)
+
+
+class Roster:
+    """
+    Talabalar indeksi: student_id -> ism, encoding'lar soni, qatorlar oraliqlari.
+    Galereya snapshot'i bilan birga o'zgarmas - API so'rovlari har safar
+    qatorlarni qayta sanamaydi.
+
+    etag: ro'yxat mazmunining xeshi (o'zgarmagan ro'yxat uchun 304 javob)
+    """
+
+    def __init__(self, gallery):
+        labels = np.asarray(gallery.labels)
+        present, first_rows, counts = np.unique(labels, return_index=True, return_counts=True)
+
+        # Ketma-ket bir xil yorliqli qatorlar bo'laklari: [start, end)
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(labels)) + 1]).astype(np.int64)
+        ends = np.concatenate([starts[1:], [len(labels)]]).astype(np.int64)
+        ranges = {}
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            if end > start:
+                ranges.setdefault(int(labels[start]), []).append([start, end])
+
+        # Tartib: birinchi qator bo'yicha (avvalgi /api/students tartibi)
+        self.students = []
+        self.by_id = {}
+        for index in np.argsort(first_rows, kind='stable').tolist():
+            label = int(present[index])
+            entry = {
+                'id': gallery.student_ids[label],
+                'name': gallery.student_names[label],
+                'encodings_count': int(counts[index]),
+                'row_ranges': ranges.get(label, [])
+            }
+            self.students.append(entry)
+            self.by_id[entry['id']] = entry
+
+        self.total_students = len(self.students)
+        self.total_encodings = int(len(labels))
+        self.etag = hashlib.sha1(
+            json.dumps(self.students, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()
+
+
+
+# ===== GALEREYADAN QIDIRISH (MATCHER'LAR) =====
+
+class BruteForceMatcher:
+    """
+    To'liq qidiruv: har bir probe barcha encoding'lar bilan taqqoslanadi.
+    Eng aniq yo'l, boshqa matcher'lar shu bilan tekshiriladi.
+    """
+
+    def __init__(self, matrix, sq_norms, labels):
+        self.matrix = matrix
+        self.sq_norms = sq_norms
+        self.labels = labels
+
+    def search(self, probes):
+        """
+        Returns:
+            tuple: (best_indices, best_distances) - gallery_matrix qatorlari bo'yicha
+        """
+        if len(self.matrix) == 0:
+            return (np.zeros(len(probes), dtype=np.int64),
+                    np.ones(len(probes), dtype=np.float32))
+
+        distances = pairwise_distances(probes, self.matrix, self.sq_norms)
+        best_indices = np.argmin(distances, axis=1)
+        best_distances = distances[np.arange(len(probes)), best_indices]
+        return best_indices, best_distances
+
+
+class PrototypeMatcher:
+    """
+    Ikki bosqichli qidiruv:
+    1. Har bir talaba uchun prototip (markaz) va radius bilan taqqoslash - O(talabalar)
+    2. Faqat eng yaqin top-k talabaning barcha encoding'lari bilan aniq taqqoslash
+
+    Uchburchak tengsizligi: |q - x| >= |q - markaz| - radius.
+    Quyi chegarasi topilgan masofadan (yoki tolerance'dan) kichik bo'lgan
+    talabalar ham tekshiriladi, shuning uchun tolerance ichidagi natija
+    brute-force bilan bir xil bo'ladi.
+    """
+
+    def __init__(self, matrix, sq_norms, labels, top_k=None):
+        self.top_k = top_k or config.MATCHER_TOP_K_STUDENTS
+        num_students = int(labels.max()) + 1 if len(labels) else 0
+
+        # Qatorlarni talaba bo'yicha guruhlash
+        self.order, self.starts, self.ends = group_rows(labels, num_students)
+        if np.all(labels[:-1] <= labels[1:]):
+            # Qatorlar allaqachon guruhlangan - nusxa olinmaydi (mmap / shared memory)
+            self.matrix = matrix
+            self.sq_norms = sq_norms
+        else:
+            self.matrix = np.ascontiguousarray(matrix[self.order])
+            self.sq_norms = sq_norms[self.order]
+        counts = self.ends - self.starts
+
+        # Prototiplar (markazlar) va radiuslar
+        if num_students:
+            sums = np.add.reduceat(self.matrix, self.starts, axis=0)
+            self.centroids = np.ascontiguousarray(sums / counts[:, None], dtype=np.float32)
+            offsets = self.matrix - np.repeat(self.centroids, counts, axis=0)
+            row_radii = np.sqrt(np.einsum('ij,ij->i', offsets, offsets))
+            self.radii = np.maximum.reduceat(row_radii, self.starts)
+        else:
+            self.centroids = np.empty((0, matrix.shape[1]), dtype=np.float32)
+            self.radii = np.empty(0, dtype=np.float32)
+        self.centroid_sq_norms = np.einsum('ij,ij->i', self.centroids, self.centroids)
+
+    def _rows_of(self, students):
+        return np.concatenate([np.arange(self.starts[s], self.ends[s]) for s in students])
+
+    def _refine(self, probe, students):
+        rows = self._rows_of(students)
+        distances = pairwise_distances(probe[None, :], self.matrix[rows], self.sq_norms[rows])[0]
+        best = int(np.argmin(distances))
+        return rows[best], distances[best]
+
+    def search(self, probes):
+        """
+        Returns:
+            tuple: (best_indices, best_distances) - gallery_matrix qatorlari bo'yicha
+        """
+        best_indices = np.zeros(len(probes), dtype=np.int64)
+        best_distances = np.ones(len(probes), dtype=np.float32)
+        num_students = len(self.centroids)
+        if num_students == 0:
+            return best_indices, best_distances
+
+        # 1-bosqich: barcha prototiplar bilan (bitta matritsa amali)
+        lower_bounds = pairwise_distances(probes, self.centroids, self.centroid_sq_norms) - self.radii
+        k = min(self.top_k, num_students)
+
+        for i, probe in enumerate(probes):
+            bounds = lower_bounds[i]
+            if k < num_students:
+                candidates = np.argpartition(bounds, k - 1)[:k]
+            else:
+                candidates = np.arange(num_students)
+
+            # 2-bosqich: nomzodlarning barcha encoding'lari bilan
+            row, distance = self._refine(probe, candidates)
+
+            # Chegara bo'yicha qolgan talabalarni tekshirish (aniqlik kafolati)
+            limit = min(distance, config.FACE_MATCH_TOLERANCE)
+            pending = bounds <= limit
+            pending[candidates] = False
+            if pending.any():
+                extra_row, extra_distance = self._refine(probe, np.flatnonzero(pending))
+                if extra_distance < distance:
+                    row, distance = extra_row, extra_distance
+
+            best_indices[i] = self.order[row]
+            best_distances[i] = distance
+
+        return best_indices, best_distances
+
+
+class IVFMatcher:
+    """
+    Taxminiy eng yaqin qo'shni (ANN) qidiruvi - inverted file (IVF):
+    1. Encoding'lar k-means bilan IVF_NUM_LISTS ta klasterga bo'linadi
+    2. Probe eng yaqin IVF_NPROBE ta klaster ichidagi encoding'lar bilan taqqoslanadi
+
+    Natija taxminiy: recall'ni benchmark.py orqali o'lchang.
+    Indeks ANN_INDEX_FILE ga faqat o'qitilganda saqlanadi (atomik) va galereya
+    o'zgarmasa qayta o'qitilmaydi. Bosqichma-bosqich qo'shishda oldingi markazlar
+    faqat xotirada qayta ishlatiladi - fayl qayta yozilmaydi
+    (to'liq qayta o'qitish - create_encodings_from_dataset).
+
+    clusters berilsa (camera_pool worker'lari): qatorlar allaqachon klaster
+    tartibida (shared memory) - o'qitish, fayl I/O va matritsa nusxasi yo'q.
+    """
+
+    def __init__(self, matrix, sq_norms, labels, num_lists=None, nprobe=None,
+                 index_file=None, centroids=None, clusters=None):
+        self.nprobe = nprobe or config.IVF_NPROBE
+        self.index_file = index_file if index_file is not None else config.ANN_INDEX_FILE
+
+        if clusters is not None:
+            self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+            self.centroid_sq_norms = np.einsum('ij,ij->i', self.centroids, self.centroids)
+            self.starts, self.ends = (np.asarray(bounds, dtype=np.int64) for bounds in clusters)
+            self.order = np.arange(len(matrix))
+            self.matrix = matrix
+            self.sq_norms = sq_norms
+            return
+
+        if centroids is None:
+            if num_lists is None:
+                num_lists = config.IVF_NUM_LISTS or int(np.sqrt(len(matrix)))
+            num_lists = min(max(1, num_lists), len(matrix))
+
+            fingerprint = gallery_fingerprint(matrix)
+            centroids = self._load_index(fingerprint, num_lists)
+            if num_lists == 0:
+                centroids = np.empty((0, matrix.shape[1]), dtype=np.float32)
+            elif centroids is None:
+                centroids = train_kmeans(matrix, num_lists, config.IVF_TRAIN_ITERATIONS,
+                                         config.IVF_RANDOM_SEED)
+                self._save_index(fingerprint, centroids)
+
+        assignments = assign_to_centroids(matrix, centroids)
+        self.centroids = centroids
+        self.centroid_sq_norms = np.einsum('ij,ij->i', centroids, centroids)
+        self.order, self.starts, self.ends = group_rows(assignments, len(centroids))
+        self.matrix = np.ascontiguousarray(matrix[self.order])
+        self.sq_norms = sq_norms[self.order]
+
+    def _load_index(self, fingerprint, num_lists):
+        if not self.index_file or not os.path.exists(self.index_file):
+            return None
+        try:
+            with np.load(self.index_file) as data:
+                if str(data['fingerprint']) != fingerprint or len(data['centroids']) != num_lists:
+                    return None
+                return np.ascontiguousarray(data['centroids'], dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️  ANN indeksni yuklashda xato: {e}")
+            return None
+
+    def _save_index(self, fingerprint, centroids):
+        if not self.index_file:
+            return
+        # tmp + os.replace: o'quvchilar yarim yozilgan indeksni ko'rmaydi
+        tmp_path = f"{self.index_file}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, fingerprint=fingerprint, centroids=centroids)
+            os.replace(tmp_path, self.index_file)
+        except OSError as e:
+            print(f"⚠️  ANN indeksni saqlashda xato: {e}")
+
+    def search(self, probes):
+        """
+        Returns:
+            tuple: (best_indices, best_distances) - gallery_matrix qatorlari bo'yicha
+        """
+        best_indices = np.zeros(len(probes), dtype=np.int64)
+        best_distances = np.ones(len(probes), dtype=np.float32)
+        if len(self.matrix) == 0:
+            return best_indices, best_distances
+
+        centroid_distances = pairwise_distances(probes, self.centroids, self.centroid_sq_norms)
+        nprobe = min(self.nprobe, len(self.centroids))
+
+        for i, probe in enumerate(probes):
+            lists = np.argpartition(centroid_distances[i], nprobe - 1)[:nprobe]
+            rows = np.concatenate([np.arange(self.starts[c], self.ends[c]) for c in lists])
+            if len(rows) == 0:
+                continue
+
+            distances = pairwise_distances(probe[None, :], self.matrix[rows], self.sq_norms[rows])[0]
+            best = int(np.argmin(distances))
+            best_indices[i] = self.order[rows[best]]
+            best_distances[i] = distances[best]
+
+        return best_indices, best_distances
+
+
+MATCHERS = {
+    'brute': BruteForceMatcher,
+    'prototype': PrototypeMatcher,
+    'ivf': IVFMatcher,
+}
+
+
+def create_matcher(name, matrix, sq_norms, labels, previous=None, index=None):
+    """
+    config.FACE_MATCHER nomi bo'yicha matcher yaratish
+
+    Args:
+        previous: oldingi snapshot matcher'i (IVF markazlarini qayta ishlatish uchun)
+        index: ota jarayon nashr qilgan IVF klasterlari {'centroids', 'starts', 'ends'}
+               (qatorlar shu tartibda)
+    """
+    if name not in MATCHERS:
+        raise ValueError(f"Noma'lum matcher: {name} (mavjud: {', '.join(MATCHERS)})")
+
+    if name == 'ivf' and index is not None:
+        return IVFMatcher(matrix, sq_norms, labels, centroids=index['centroids'],
+                          clusters=(index['starts'], index['ends']))
+    if name == 'ivf' and isinstance(previous, IVFMatcher) and len(previous.centroids) and len(matrix):
+        return IVFMatcher(matrix, sq_norms, labels, centroids=previous.centroids)
+    return MATCHERS[name](matrix, sq_norms, labels)
+
+
+def group_rows(labels, num_groups):
+    """
+    Qatorlarni guruh (talaba yoki klaster) bo'yicha tartiblash
+
+    Returns:
+        tuple: (order, starts, ends) - order[starts[g]:ends[g]] g-guruh qatorlari
+    """
+    order = np.argsort(labels, kind='stable')
+    counts = np.bincount(labels, minlength=num_groups)
+    ends = np.cumsum(counts)
+    return order, ends - counts, ends
+
+
+def gallery_fingerprint(matrix):
+    """
+    Galereya matritsasining qisqa xeshi (indeks eskirganini aniqlash uchun)
+    """
+    digest = hashlib.sha1(np.ascontiguousarray(matrix).view(np.uint8))
+    digest.update(str(matrix.shape).encode())
+    return digest.hexdigest()
+
+
+def assign_to_centroids(matrix, centroids, chunk_size=16384):
+    """
+    Har bir qatorni eng yaqin markazga biriktirish (xotirani tejash uchun bo'laklab)
+    """
+    centroid_sq_norms = np.einsum('ij,ij->i', centroids, centroids)
+    assignments = np.empty(len(matrix), dtype=np.int64)
+    for start in range(0, len(matrix), chunk_size):
+        chunk = matrix[start:start + chunk_size]
+        # |x|^2 argmin'ga ta'sir qilmaydi
+        scores = centroid_sq_norms[None, :] - 2.0 * (chunk @ centroids.T)
+        assignments[start:start + chunk_size] = np.argmin(scores, axis=1)
+    return assignments
+
+
+def train_kmeans(matrix, num_lists, iterations, seed):
+    """
+    Oddiy (Lloyd) k-means - faqat NumPy
+
+    Returns:
+        np.ndarray: (num_lists, D) float32 markazlar
+    """
+    rng = np.random.default_rng(seed)
+    centroids = matrix[rng.choice(len(matrix), num_lists, replace=False)].astype(np.float32)
+
+    for _ in range(iterations):
+        assignments = assign_to_centroids(matrix, centroids)
+        counts = np.bincount(assignments, minlength=num_lists)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, matrix)
+
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        # Bo'sh klasterlarni tasodifiy nuqtalar bilan qayta boshlash
+        if empty.any():
+            centroids[empty] = matrix[rng.choice(len(matrix), int(empty.sum()))]
+
+    return np.ascontiguousarray(centroids)
+
+
+def recall_report(matrix, sq_norms, labels, probes, nprobe_values, num_lists=None):
+    """
+    IVF matcher'ning aniq (brute-force) qidiruvga nisbatan recall va tezligi
+
+    Recall = IVF topgan eng yaqin talaba aniq qidiruvdagi bilan bir xil bo'lgan
+    probe'lar ulushi (faqat aniq qidiruvda tolerance ichida bo'lganlar hisoblanadi).
+
+    Returns:
+        list: [{'nprobe', 'recall', 'ms_per_probe'}, ...]
+    """
+    brute = BruteForceMatcher(matrix, sq_norms, labels)
+    start = time.perf_counter()
+    exact_indices, exact_distances = brute.search(probes)
+    brute_ms = (time.perf_counter() - start) * 1000 / max(len(probes), 1)
+    relevant = exact_distances <= config.FACE_MATCH_TOLERANCE
+
+    print(f"📊 Aniq qidiruv: {brute_ms:.3f} ms/probe, {int(relevant.sum())} ta mos probe")
+
+    matcher = IVFMatcher(matrix, sq_norms, labels, num_lists=num_lists, index_file='')
+    print(f"📊 IVF: {len(matcher.centroids)} ta klaster")
+
+    report = []
+    for nprobe in nprobe_values:
+        matcher.nprobe = nprobe
+        start = time.perf_counter()
+        indices, _ = matcher.search(probes)
+        ms = (time.perf_counter() - start) * 1000 / max(len(probes), 1)
+
+        hits = labels[indices[relevant]] == labels[exact_indices[relevant]]
+        recall = float(hits.mean()) if len(hits) else 1.0
+        report.append({'nprobe': nprobe, 'recall': recall, 'ms_per_probe': ms})
+        print(f"  nprobe={nprobe:<4} recall={recall:.4f}  {ms:.3f} ms/probe")
+
+    return report
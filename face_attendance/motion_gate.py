@@ -0,0 +1,129 @@
+"""
+HARAKAT FILTRI (MOTION GATE)
+
+Yuz aniqlashdan oldin arzon tekshiruv: kichraytirilgan kulrang kadr oxirgi
+tanib olish paytidagi kadr bilan taqqoslanadi. Hech narsa o'zgarmagan bo'lsa
+HOG aniqlash umuman ishlamaydi; o'zgargan bo'lsa - faqat o'zgargan hududlar
+qaytariladi.
+
+Hududlar formati face_recognition bilan bir xil: (top, right, bottom, left),
+asl kadr o'lchamida.
+"""
+import time
+import cv2
+import numpy as np
+import config
+
+
+def pad_box(box, padding, height, width):
+    """
+    To'rtburchakni o'lchamiga nisbatan kengaytirish (kadr chegarasida)
+    """
+    top, right, bottom, left = box
+    pad_y = int((bottom - top) * padding)
+    pad_x = int((right - left) * padding)
+    return (max(0, top - pad_y), min(width, right + pad_x),
+            min(height, bottom + pad_y), max(0, left - pad_x))
+
+
+def merge_boxes(boxes):
+    """
+    Bir-birini kesib o'tadigan to'rtburchaklarni birlashtirish
+    """
+    boxes = [list(box) for box in boxes]
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                a, b = boxes[i], boxes[j]
+                if a[3] <= b[1] and b[3] <= a[1] and a[0] <= b[2] and b[0] <= a[2]:
+                    boxes[i] = [min(a[0], b[0]), max(a[1], b[1]), max(a[2], b[2]), min(a[3], b[3])]
+                    del boxes[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return [tuple(box) for box in boxes]
+
+
+class MotionGate:
+    """
+    Kadr o'zgarganini aniqlash. Har bir kamera uchun alohida.
+
+    Statistika: checked (tekshirilgan), skipped (o'tkazib yuborilgan) kadrlar.
+    """
+
+    def __init__(self):
+        self.reference = None
+        self.last_refresh = 0.0
+        self.checked = 0
+        self.skipped = 0
+
+    def _prepare(self, frame):
+        height, width = frame.shape[:2]
+        scale = config.MOTION_GATE_WIDTH / float(width)
+        small = cv2.resize(frame, (config.MOTION_GATE_WIDTH, max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0), scale
+
+    def check(self, frame):
+        """
+        Returns:
+            tuple: (changed, regions) - regions None bo'lsa butun kadr tekshiriladi
+        """
+        self.checked += 1
+        gray, scale = self._prepare(frame)
+        now = time.monotonic()
+
+        # Birinchi kadr yoki majburiy yangilash
+        if self.reference is None or now - self.last_refresh >= config.MOTION_REFRESH_SECONDS:
+            self._accept(gray, now)
+            return True, None
+
+        mask = cv2.absdiff(gray, self.reference) > config.MOTION_PIXEL_THRESHOLD
+        if mask.mean() < config.MOTION_THRESHOLD:
+            self.skipped += 1
+            return False, []
+
+        self.reference = gray
+        if not config.MOTION_LIMIT_TO_REGIONS:
+            self.last_refresh = now
+            return True, None
+
+        regions = self._regions(mask, scale, frame.shape[0], frame.shape[1])
+        if regions is None:
+            # Butun kadr tekshiriladi - majburiy yangilash taymeri qaytadan
+            self.last_refresh = now
+        return True, regions
+
+    def _accept(self, gray, now):
+        self.reference = gray
+        self.last_refresh = now
+
+    def _regions(self, mask, scale, height, width):
+        """
+        O'zgargan piksellar guruhlarini asl o'lchamdagi hududlarga aylantirish
+        """
+        mask = cv2.dilate(mask.astype(np.uint8) * 255, np.ones((5, 5), np.uint8))
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        boxes = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            box = (int(y / scale), int((x + w) / scale), int((y + h) / scale), int(x / scale))
+            boxes.append(pad_box(box, config.MOTION_REGION_PADDING, height, width))
+
+        boxes = merge_boxes(boxes)
+        area = sum((b[1] - b[3]) * (b[2] - b[0]) for b in boxes)
+        if len(boxes) > config.MOTION_MAX_REGIONS or area > config.MOTION_MAX_REGION_AREA * height * width:
+            return None
+        return boxes
+
+    def stats(self):
+        return {
+            'checked': self.checked,
+            'skipped': self.skipped,
+            'skip_ratio': self.skipped / self.checked if self.checked else 0.0
+        }
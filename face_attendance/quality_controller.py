@@ -0,0 +1,151 @@
+"""
+ADAPTIV SIFAT BOSHQARUVI
+
+Har bir kamera uchun tanib olish vaqtini o'lchab, FRAME_SCALE, upsample va
+PROCESS_EVERY_N_FRAMES qiymatlarini byudjet ichida ushlab turadi:
+
+    kechikish > byudjet      ──► sifat pastga (scale/upsample), oxirida skip++
+    CPU ulushi > byudjet     ──► skip++, oxirida sifat pastga
+    ikkalasi ham < LOW_WATERMARK ──► skip--, keyin sifat yuqoriga
+                                     (faqat taxminiy kechikish byudjetga sig'sa)
+
+Qaror QUALITY_WINDOW ta o'lchovdan keyin qabul qilinadi, har o'zgarishdan
+keyin oyna tozalanadi - sozlamalar har kadrda "tebranmaydi".
+"""
+import threading
+import time
+import config
+
+
+def level_cost(level):
+    """
+    Pog'ona narxining nisbiy bahosi: HOG ishi piksellar soniga proporsional,
+    har bir upsample rasmni 2 marta kattalashtiradi
+    """
+    scale, upsample = level
+    return (scale * (2 ** upsample)) ** 2
+
+
+class QualityController:
+    """
+    Bitta kamera uchun sozlamalarni byudjetga moslashtirish
+
+    Inference thread'i record() ni chaqiradi, capture thread'i faqat skip'ni o'qiydi.
+    """
+
+    def __init__(self, budget_ms=None, cpu_budget=None, levels=None):
+        self.budget_ms = budget_ms or config.QUALITY_BUDGET_MS
+        self.cpu_budget = cpu_budget or config.QUALITY_CPU_BUDGET
+        self.levels = sorted(levels or config.QUALITY_LEVELS, key=level_cost)
+
+        # Boshlang'ich pog'ona: config'dagi statik qiymatlarga eng yaqini
+        start = (config.FRAME_SCALE, config.FACE_DETECTION_UPSAMPLE)
+        self.level = min(range(len(self.levels)),
+                         key=lambda i: abs(level_cost(self.levels[i]) - level_cost(start)))
+        self.skip = min(max(config.PROCESS_EVERY_N_FRAMES, config.QUALITY_MIN_SKIP),
+                        config.QUALITY_MAX_SKIP)
+
+        self._lock = threading.Lock()
+        self._window = []
+        self._window_start = time.monotonic()
+
+        self.frames = 0
+        self.within_budget = 0
+        self.adjustments = 0
+        self.last_change = None
+        self.last_latency_ms = 0.0
+        self.last_cpu = 0.0
+
+    @classmethod
+    def for_camera(cls, spec):
+        """
+        CAMERAS dagi yozuvdan ('budget_ms', 'cpu_budget' ixtiyoriy)
+        """
+        return cls(budget_ms=spec.get('budget_ms'), cpu_budget=spec.get('cpu_budget'))
+
+    @property
+    def scale(self):
+        return self.levels[self.level][0]
+
+    @property
+    def upsample(self):
+        return self.levels[self.level][1]
+
+    def record(self, seconds):
+        """
+        Bitta tanib olish kadri vaqtini qayd qilish (va kerak bo'lsa sozlash)
+        """
+        with self._lock:
+            self.frames += 1
+            if seconds * 1000 <= self.budget_ms:
+                self.within_budget += 1
+
+            self._window.append(seconds)
+            if len(self._window) >= config.QUALITY_WINDOW:
+                self._adjust()
+
+    def _adjust(self):
+        elapsed = time.monotonic() - self._window_start
+        latency_ms = sum(self._window) * 1000 / len(self._window)
+        cpu = sum(self._window) / elapsed if elapsed > 0 else 0.0
+        self.last_latency_ms = latency_ms
+        self.last_cpu = cpu
+
+        low = config.QUALITY_LOW_WATERMARK
+        change = None
+        if latency_ms > self.budget_ms:
+            change = self._lower_quality() or self._raise_skip()
+        elif cpu > self.cpu_budget:
+            change = self._raise_skip() or self._lower_quality()
+        elif latency_ms < low * self.budget_ms and cpu < low * self.cpu_budget:
+            change = self._lower_skip() or self._raise_quality(latency_ms)
+
+        if change is not None:
+            self.adjustments += 1
+            self.last_change = change
+
+        # Har bir qarordan keyin yangi oyna (o'zgarish bo'lsa - yangi sozlama bilan o'lchanadi)
+        self._window = []
+        self._window_start = time.monotonic()
+
+    def _lower_quality(self):
+        if self.level == 0:
+            return None
+        self.level -= 1
+        return 'quality_down'
+
+    def _raise_quality(self, latency_ms):
+        if self.level == len(self.levels) - 1:
+            return None
+        # Keyingi pog'ona taxminiy kechikishi byudjetga sig'masa - o'zgartirilmaydi
+        ratio = level_cost(self.levels[self.level + 1]) / level_cost(self.levels[self.level])
+        if latency_ms * ratio > self.budget_ms:
+            return None
+        self.level += 1
+        return 'quality_up'
+
+    def _raise_skip(self):
+        if self.skip >= config.QUALITY_MAX_SKIP:
+            return None
+        self.skip += 1
+        return 'skip_up'
+
+    def _lower_skip(self):
+        if self.skip <= config.QUALITY_MIN_SKIP:
+            return None
+        self.skip -= 1
+        return 'skip_down'
+
+    def stats(self):
+        return {
+            'frame_scale': self.scale,
+            'upsample': self.upsample,
+            'process_every_n_frames': self.skip,
+            'budget_ms': self.budget_ms,
+            'cpu_budget': self.cpu_budget,
+            'latency_ms': round(self.last_latency_ms, 2),
+            'cpu': round(self.last_cpu, 3),
+            'within_budget_ratio': self.within_budget / self.frames if self.frames else 1.0,
+            'adjustments': self.adjustments,
+            'last_change': self.last_change
+        }
@@ -0,0 +1,494 @@
+"""
+KELISH/KETISH SESSIYALARI (FAQAT OXIRIGA YOZILADIGAN JURNAL)
+
+    seen / expire / depart ──► sessions.log   (seq,ARRIVAL|DEPARTURE,id,ism,vaqt)
+                                    │ compact() - har N hodisa yoki T soniyada
+                                    ▼
+                               sessions.csv   (yopilgan sessiyalar, oxiriga qo'shiladi)
+
+Har bir kelish/ketish - jurnalga bitta qator (O(1)): eski skriptlardagi kabi
+butun sessiyalar jadvali har hodisada qayta yozilmaydi.
+
+Siqish: yopilgan sessiyalar jadvalga qo'shiladi, jurnal esa faqat hali ochiq
+sessiyalar bilan qaytadan yoziladi (tmp + os.replace - atomik).
+
+Ishga tushishda jurnal qayta o'ynaladi (replay): jadval oxirgi qatoridagi seq
+dan kichik yopilgan sessiyalar allaqachon jadvalda - o'tkazib yuboriladi.
+Shuning uchun siqish o'rtasida to'xtab qolish (crash) sessiyani ikki marta
+yozmaydi va yo'qotmaydi; jurnal oxiridagi chala qator kesib tashlanadi.
+
+To'xtab turgan vaqt o'tirish vaqtiga qo'shilmasligi uchun: dastur to'g'ri
+yopilganda ochiq sessiyalar yopiladi (close_all), to'satdan to'xtaganda esa
+jurnaldagi oxirgi devor vaqti (hodisa yoki HEARTBEAT) + timeout dan o'tib
+ketgan sessiyalar replay'da aynan shu vaqt bilan yopiladi.
+
+Ketishni aniqlash (har kadrda): monotonic soat bo'yicha muddatlar heap'i.
+seen() faqat last_seen'ni yangilaydi (O(1), datetime yo'q); expire() heap
+boshidan muddati o'tganlarni oladi - orada ko'ringanlar yangi muddat bilan
+qaytariladi (lazy invalidation). Har kadr narxi O(ketganlar · log n),
+xonadagi odamlar soniga bog'liq emas; heap'da har odam uchun bitta yozuv.
+"""
+import csv
+import heapq
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+import config
+from attendance_store import read_lines_reversed
+
+SESSIONS_HEADER = ['Student_ID', 'Name', 'Arrival', 'Departure', 'Seq']
+SESSION_TIME_FORMAT = f"{config.ATTENDANCE_DATE_FORMAT} {config.ATTENDANCE_TIME_FORMAT}"
+
+ARRIVAL = 'ARRIVAL'
+DEPARTURE = 'DEPARTURE'
+# Jarayon tirikligi (seq oshmaydi, tinglovchilarga yuborilmaydi)
+HEARTBEAT = 'HEARTBEAT'
+
+
+def format_time(value):
+    return value.strftime(SESSION_TIME_FORMAT) if value is not None else ''
+
+
+def parse_time(text):
+    return datetime.strptime(text, SESSION_TIME_FORMAT) if text else None
+
+
+def read_sessions_table(path):
+    """
+    Yopilgan sessiyalar jadvali
+
+    Returns:
+        list: [{'student_id', 'name', 'arrival', 'departure'}, ...]
+    """
+    sessions = []
+    if not os.path.exists(path):
+        return sessions
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 4 or row == SESSIONS_HEADER:
+                continue
+            sessions.append({
+                'student_id': row[0],
+                'name': row[1],
+                'arrival': parse_time(row[2]),
+                'departure': parse_time(row[3])
+            })
+    return sessions
+
+
+def last_table_seq(path):
+    """
+    Jadvalga siqilgan oxirgi hodisa raqami (0 - jadval yo'q yoki bo'sh)
+    """
+    if not os.path.exists(path):
+        return 0
+    for line in read_lines_reversed(path):
+        row = next(csv.reader([line]))
+        if row == SESSIONS_HEADER:
+            return 0
+        try:
+            return int(row[4])
+        except (IndexError, ValueError):
+            continue
+    return 0
+
+
+def read_log_events(path):
+    """
+    Jurnal hodisalari; chala yoki buzilgan qatorda to'xtaydi
+
+    Yields:
+        tuple: (qator oxiri offset'i, seq, event, student_id, name, vaqt)
+    """
+    offset = 0
+    with open(path, 'rb') as f:
+        for raw in f:
+            # Oxirgi qator chala (yozish paytida to'xtab qolgan) - shu yerda to'xtaymiz
+            if not raw.endswith(b'\n'):
+                return
+            try:
+                row = next(csv.reader([raw.decode('utf-8')]))
+                seq, event, student_id, name = int(row[0]), row[1], row[2], row[3]
+                when = parse_time(row[4])
+            except (IndexError, ValueError, UnicodeDecodeError):
+                return
+            offset += len(raw)
+            yield offset, seq, event, student_id, name, when
+
+
+def migrate_legacy_sessions(legacy_path, table_path):
+    """
+    Eski attendance_sessions.csv (name, arrival, departure) ni jadvalga ko'chirish
+
+    Returns:
+        int: ko'chirilgan sessiyalar soni
+    """
+    rows = []
+    with open(legacy_path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            rows.append([row['name'], row['name'], row['arrival'], row['departure'] or ''])
+
+    with open(table_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(SESSIONS_HEADER)
+        writer.writerows(row + [seq] for seq, row in enumerate(rows, 1))
+    return len(rows)
+
+
+class SessionLog:
+    """
+    Kim hozir xonada (active) va yopilgan sessiyalar - jurnal + jadval orqali
+
+    Bir nechta thread chaqirishi mumkin - lock bilan.
+    """
+
+    def __init__(self, log_path=None, table_path=None, legacy_path=None, timeout=None,
+                 clock=time.monotonic):
+        """
+        Args:
+            clock: muddatlar soati (monotonic; benchmark uchun almashtiriladi)
+        """
+        self.log_path = log_path or config.SESSION_LOG_FILE
+        self.table_path = table_path or config.SESSIONS_FILE
+        self.timeout = timeout or config.SESSION_DEPARTURE_TIMEOUT
+        self.clock = clock
+        self._lock = threading.Lock()
+
+        # student_id -> {'name', 'arrival', 'last_seen', 'seq'}
+        # (last_seen - clock() qiymati, seq - ARRIVAL hodisasi raqami)
+        self.active = {}
+        # (muddat, arrival seq, student_id) - eskirgan yozuvlar expire() da tashlanadi
+        self._deadlines = []
+        # Jurnaldagi, hali jadvalga siqilmagan yopilgan sessiyalar
+        self.closed = []
+
+        # Hodisa tinglovchilari: (event, data) -> None, lock ichida chaqiriladi.
+        # ARRIVAL/DEPARTURE: {'seq', 'student_id', 'name', 'time'};
+        # COMPACT: {'seq'} - siqishdan oldin (seq gacha hodisalar jurnaldan o'chishi mumkin)
+        self.listeners = []
+
+        self._seq = 0
+        # Jurnaldagi oxirgi devor vaqti va oxirgi HEARTBEAT (clock() bo'yicha)
+        self._last_wall = None
+        self._last_heartbeat = clock()
+        self._since_compact = 0
+        self._last_compact = time.monotonic()
+        self.events_written = 0
+        self.compactions = 0
+
+        directory = os.path.dirname(self.log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        legacy_path = legacy_path or config.SESSIONS_LEGACY_FILE
+        if not os.path.exists(self.table_path) and os.path.exists(legacy_path):
+            count = migrate_legacy_sessions(legacy_path, self.table_path)
+            os.replace(legacy_path, legacy_path + '.migrated')
+            print(f"🔄 {legacy_path} sessiyalar jadvaliga ko'chirildi ({count} ta sessiya)")
+
+        self._replay()
+        self._log = open(self.log_path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._log)
+        self._close_stale()
+
+    # ===== TIKLASH =====
+
+    def _replay(self):
+        """
+        Jurnalni qayta o'ynash (load_sessions() o'rniga - jadval o'qilmaydi)
+        """
+        compacted = last_table_seq(self.table_path)
+        self._seq = compacted
+        if not os.path.exists(self.log_path):
+            return
+
+        good = 0
+        events = 0
+        for good, seq, event, student_id, name, when in read_log_events(self.log_path):
+            events += 1
+            self._seq = max(self._seq, seq)
+            self._last_wall = max(self._last_wall or when, when)
+            self._apply(seq, event, student_id, name, when)
+
+        if os.path.getsize(self.log_path) > good:
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(good)
+            print(f"⚠️  {self.log_path}: oxiridagi buzilgan qator olib tashlandi")
+
+        # Siqish jadvalga yozib, jurnalni almashtirishga ulgurmagan bo'lsa
+        self.closed = [session for session in self.closed if session['seq'] > compacted]
+        self._since_compact = events
+        print(f"📒 Sessiyalar jurnali tiklandi: {events} ta hodisa, {len(self.active)} ta ochiq sessiya")
+
+    def _close_stale(self):
+        """
+        Replay'dan keyin: jurnaldagi oxirgi devor vaqti + timeout o'tib ketgan
+        sessiyalar shu vaqt bilan yopiladi (to'xtab turgan vaqt sessiyaga qo'shilmaydi),
+        qolganlariga faqat qolgan muddat beriladi
+        """
+        if not self.active or self._last_wall is None:
+            return
+
+        elapsed = (datetime.now() - self._last_wall).total_seconds()
+        if elapsed < self.timeout:
+            current = self.clock()
+            last_seen = current - max(0.0, elapsed)
+            self._deadlines = []
+            for student_id, session in self.active.items():
+                session['last_seen'] = last_seen
+                self._deadlines.append((last_seen + self.timeout, session['seq'], student_id))
+            heapq.heapify(self._deadlines)
+            return
+
+        departure = self._last_wall + timedelta(seconds=self.timeout)
+        stale = list(self.active)
+        with self._lock:
+            for student_id in stale:
+                self._depart(student_id, departure)
+            self._deadlines = []
+        print(f"🕒 To'xtashdan oldin ochiq qolgan {len(stale)} ta sessiya "
+              f"{format_time(departure)} bilan yopildi")
+
+    def _apply(self, seq, event, student_id, name, when):
+        if event == ARRIVAL:
+            if student_id not in self.active:
+                # Muddat hozirdan; replay'dan keyin _close_stale tuzatadi
+                now = self.clock()
+                self.active[student_id] = {'name': name, 'arrival': when, 'last_seen': now, 'seq': seq}
+                heapq.heappush(self._deadlines, (now + self.timeout, seq, student_id))
+        elif event == DEPARTURE:
+            session = self.active.pop(student_id, None)
+            if session is not None:
+                self.closed.append({
+                    'student_id': student_id,
+                    'name': session['name'],
+                    'arrival': session['arrival'],
+                    'departure': when,
+                    'seq': seq
+                })
+
+    # ===== HODISALAR =====
+
+    def _append(self, event, student_id, name, when):
+        self._seq += 1
+        self._write_row([self._seq, event, student_id, name, format_time(when)])
+        self._apply(self._seq, event, student_id, name, when)
+        self.events_written += 1
+        self._since_compact += 1
+        self._notify(event, {'seq': self._seq, 'student_id': student_id, 'name': name, 'time': when})
+
+    def _write_row(self, row):
+        self._writer.writerow(row)
+        self._log.flush()
+        if config.SESSION_LOG_FSYNC:
+            os.fsync(self._log.fileno())
+
+    def _heartbeat(self, current, now=None):
+        """
+        Xonada kimdir bo'lsa, SESSION_HEARTBEAT_SECONDS da bir marta devor vaqtini yozish
+        (seq oshmaydi - tinglovchilar va analytics uchun ko'rinmaydi)
+        """
+        if not self.active or current - self._last_heartbeat < config.SESSION_HEARTBEAT_SECONDS:
+            return
+        self._last_heartbeat = current
+        self._write_row([self._seq, HEARTBEAT, '', '', format_time(now or datetime.now())])
+
+    def _notify(self, event, data):
+        for listener in self.listeners:
+            try:
+                listener(event, data)
+            except Exception as e:
+                print(f"⚠️  Sessiya tinglovchisida xato ({event}): {e}")
+
+    def seen(self, student_id, name, now=None):
+        """
+        Talaba kadrda ko'rindi: ochiq sessiya bo'lmasa - ARRIVAL
+
+        Args:
+            now: jurnalga yoziladigan vaqt (faqat yangi kelishda kerak; None - hozir)
+
+        Returns:
+            bool: yangi kelishmi
+        """
+        with self._lock:
+            session = self.active.get(student_id)
+            if session is not None:
+                # Heap'ga tegilmaydi - eski muddat expire() da qayta tekshiriladi
+                session['last_seen'] = self.clock()
+                return False
+            now = now or datetime.now()
+            self._append(ARRIVAL, student_id, name, now)
+            print(f"🟢 [ARRIVAL] {name} - {now.strftime(config.ATTENDANCE_TIME_FORMAT)}")
+            self._maybe_compact()
+            return True
+
+    def depart(self, student_id, now=None):
+        """
+        Returns:
+            bool: ochiq sessiya yopildimi
+        """
+        with self._lock:
+            return self._depart(student_id, now or datetime.now())
+
+    def _depart(self, student_id, now):
+        session = self.active.get(student_id)
+        if session is None:
+            return False
+        self._append(DEPARTURE, student_id, session['name'], now)
+        print(f"🔴 [DEPARTURE] {session['name']} - {now.strftime(config.ATTENDANCE_TIME_FORMAT)}")
+
+        # Qo'lda yopilgan sessiyalar yozuvlari heap'da qoladi - ko'payib ketsa qayta quriladi
+        if len(self._deadlines) > 2 * len(self.active) + 64:
+            self._deadlines = [(entry['last_seen'] + self.timeout, entry['seq'], active_id)
+                               for active_id, entry in self.active.items()]
+            heapq.heapify(self._deadlines)
+        self._maybe_compact()
+        return True
+
+    def expire(self, now=None):
+        """
+        timeout soniyadan beri ko'rinmaganlarni "ketdi" deb belgilash
+
+        Args:
+            now: jurnalga yoziladigan ketish vaqti (None - hozir; faqat ketish bo'lsa olinadi)
+
+        Returns:
+            list: ketgan talabalar ID'lari
+        """
+        departed = []
+        with self._lock:
+            current = self.clock()
+            heap = self._deadlines
+            while heap and heap[0][0] <= current:
+                _, seq, student_id = heapq.heappop(heap)
+                session = self.active.get(student_id)
+                if session is None or session['seq'] != seq:
+                    continue  # sessiya allaqachon yopilgan
+
+                deadline = session['last_seen'] + self.timeout
+                if deadline > current:
+                    # Orada ko'ringan - yangi muddat bilan qaytariladi
+                    heapq.heappush(heap, (deadline, seq, student_id))
+                    continue
+
+                now = now or datetime.now()
+                if self._depart(student_id, now):
+                    departed.append(student_id)
+            self._heartbeat(current, now)
+        return departed
+
+    def close_all(self, now=None):
+        """
+        Barcha ochiq sessiyalarni yopish (dastur to'xtaganda)
+        """
+        now = now or datetime.now()
+        with self._lock:
+            for student_id in list(self.active):
+                self._depart(student_id, now)
+            self._deadlines = []
+
+    # ===== SIQISH =====
+
+    def _maybe_compact(self):
+        if self._since_compact >= config.SESSION_COMPACT_EVENTS or \
+                time.monotonic() - self._last_compact >= config.SESSION_COMPACT_SECONDS:
+            self._compact()
+
+    def compact(self):
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        # 0) Tinglovchilar (masalan, analytics checkpoint) jurnal qisqarishidan oldin
+        self._notify('COMPACT', {'seq': self._seq})
+
+        # 1) Yopilgan sessiyalar jadvalga (seq tartibida - oxirgi qator eng katta seq)
+        if self.closed:
+            new_table = not os.path.exists(self.table_path)
+            with open(self.table_path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if new_table:
+                    writer.writerow(SESSIONS_HEADER)
+                writer.writerows([session['student_id'], session['name'],
+                                  format_time(session['arrival']), format_time(session['departure']),
+                                  session['seq']] for session in self.closed)
+                f.flush()
+                os.fsync(f.fileno())
+
+        # 2) Jurnal faqat ochiq sessiyalar bilan (asl seq saqlanadi)
+        tmp_path = self.log_path + '.tmp'
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            for student_id, session in sorted(self.active.items(), key=lambda item: item[1]['seq']):
+                writer.writerow([session['seq'], ARRIVAL, student_id, session['name'],
+                                 format_time(session['arrival'])])
+            # Ochiq sessiyalar uchun oxirgi devor vaqti saqlanadi (crash'dan tiklash uchun)
+            if self.active:
+                writer.writerow([self._seq, HEARTBEAT, '', '', format_time(datetime.now())])
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._log.close()
+        os.replace(tmp_path, self.log_path)
+        self._log = open(self.log_path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._log)
+
+        self.closed = []
+        self._since_compact = 0
+        self._last_compact = time.monotonic()
+        self.compactions += 1
+
+    # ===== O'QISH =====
+
+    def events_since(self, seq):
+        """
+        Jurnaldagi seq dan keyingi hodisalar (tinglovchi checkpoint'dan tiklanishi uchun).
+        Oxirgi COMPACT gacha bo'lganlari jadvalga o'tgan bo'lishi mumkin.
+
+        Returns:
+            list: [(seq, event, student_id, name, vaqt), ...] jurnal tartibida
+        """
+        with self._lock:
+            self._log.flush()
+            return [event[1:] for event in read_log_events(self.log_path)
+                    if event[1] > seq and event[2] != HEARTBEAT]
+
+    def sessions(self):
+        """
+        Barcha sessiyalar: jadval + siqilmagan yopilganlar + ochiqlar (departure=None)
+        """
+        with self._lock:
+            pending = [dict(session) for session in self.closed]
+            active = [{'student_id': student_id, 'name': session['name'],
+                       'arrival': session['arrival'], 'departure': None}
+                      for student_id, session in self.active.items()]
+
+        sessions = read_sessions_table(self.table_path)
+        for session in pending:
+            session.pop('seq')
+            sessions.append(session)
+        return sessions + active
+
+    def stats(self):
+        with self._lock:
+            return {
+                'active': len(self.active),
+                'heap_size': len(self._deadlines),
+                'pending_closed': len(self.closed),
+                'events_written': self.events_written,
+                'since_compact': self._since_compact,
+                'compactions': self.compactions
+            }
+
+    def close(self):
+        """
+        Jurnalni siqib yopish (ochiq sessiyalar jurnalda qoladi - to'g'ri to'xtashda
+        avval close_all() chaqiriladi)
+        """
+        with self._lock:
+            if self._log.closed:
+                return
+            self._compact()
+            self._log.close()
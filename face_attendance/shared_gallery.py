@@ -0,0 +1,124 @@
+"""
+GALEREYANI SHARED MEMORY ORQALI BO'LISHISH
+
+Ota jarayon galereya matritsasi va yorliqlarini multiprocessing.shared_memory
+bloklariga bir marta yozadi. Worker jarayonlar ularga ulanadi va NumPy
+massivlarini to'g'ridan-to'g'ri shu xotira ustida yaratadi - har bir
+jarayonda nusxa bo'lmaydi.
+
+Qatorlar talaba bo'yicha tartiblangan holda yoziladi, shuning uchun
+PrototypeMatcher ham nusxa olmaydi. 'ivf' bo'lsa qatorlar klaster tartibida
+yoziladi va markazlar tavsifnomada yuboriladi: worker'lar k-means o'qitmaydi,
+indeks faylini yozmaydi va matritsadan nusxa olmaydi.
+
+Galereya o'zgarsa yangi avlod (generation) yaratiladi: worker'lar eng
+so'nggi tavsifnomaga (descriptor) o'tadi, eskisi ota jarayonda unlink qilinadi
+(allaqachon ulangan worker'lar uchun xotira yopilguncha saqlanadi).
+"""
+from multiprocessing import shared_memory
+import numpy as np
+from gallery import ENCODING_DIM, Gallery, IVFMatcher
+
+
+class SharedGalleryPublisher:
+    """
+    Ota jarayon tomoni: galereyani shared memory'ga nashr qilish
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self._blocks = []
+
+    def publish(self, gallery):
+        """
+        Returns:
+            dict: worker'larga yuboriladigan tavsifnoma (pickle qilinadigan)
+        """
+        matcher = gallery.matcher
+        index = None
+        if isinstance(matcher, IVFMatcher):
+            order = matcher.order
+            index = {'centroids': matcher.centroids, 'starts': matcher.starts, 'ends': matcher.ends}
+        else:
+            order = np.argsort(np.asarray(gallery.labels), kind='stable')
+        matrix = np.asarray(gallery.matrix, dtype=np.float32)[order]
+        labels = np.asarray(gallery.labels, dtype=np.int32)[order]
+
+        blocks = [self._create_block(matrix), self._create_block(labels)]
+        self.generation += 1
+
+        # Oldingi avlod: nom o'chiriladi, ulangan worker'lar ishlashda davom etadi
+        self.close()
+        self._blocks = blocks
+
+        return {
+            'generation': self.generation,
+            'matrix': blocks[0].name,
+            'labels': blocks[1].name,
+            'count': int(len(matrix)),
+            'student_ids': list(gallery.student_ids),
+            'student_names': list(gallery.student_names),
+            'index': index,
+        }
+
+    @staticmethod
+    def _create_block(array):
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        return block
+
+    def close(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+class SharedGalleryReader:
+    """
+    Worker tomoni: tavsifnoma bo'yicha shared memory'ga ulanib, Gallery yaratish
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self._blocks = []
+        self._old_blocks = []
+
+    def attach(self, descriptor):
+        """
+        Returns:
+            Gallery yoki None (blok allaqachon o'chirilgan - yangirog'ini kutish kerak)
+        """
+        try:
+            blocks = [shared_memory.SharedMemory(name=descriptor['matrix']),
+                      shared_memory.SharedMemory(name=descriptor['labels'])]
+        except FileNotFoundError:
+            return None
+
+        count = descriptor['count']
+        matrix = np.ndarray((count, ENCODING_DIM), dtype=np.float32, buffer=blocks[0].buf)
+        labels = np.ndarray((count,), dtype=np.int32, buffer=blocks[1].buf)
+        matrix.flags.writeable = False
+        labels.flags.writeable = False
+
+        gallery = Gallery(matrix, labels, descriptor['student_ids'], descriptor['student_names'],
+                          index=descriptor.get('index'))
+
+        # Eski avlod bloklari release_old() da yopiladi
+        self.release_old()
+        self._old_blocks = self._blocks
+        self._blocks = blocks
+        self.generation = descriptor['generation']
+        return gallery
+
+    def release_old(self):
+        """
+        Oldingi avlodni yopish - faqat yangi galereya o'rnatilgandan keyin chaqiriladi
+        """
+        for block in self._old_blocks:
+            try:
+                block.close()
+            except BufferError:
+                # Massivlar hali tirik - GC yig'ishtirganda yopiladi
+                pass
+        self._old_blocks = []
@@ -2,14 +2,12 @@ import cv2
 import face_recognition
 import pickle
 import numpy as np
-import csv
-import os
 from datetime import datetime
+from session_log import SessionLog
 
 FRAME_SCALE = 0.5
 TOLERANCE = 0.5
 DEPARTURE_TIMEOUT = 10
-OUTPUT_CSV = 'data/attendance_sessions.csv'
 PICKLE_FILE = "encodings/face_encodings.pkl"
 
 # --- Load encodings from pickle ---
@@ -20,44 +18,9 @@ known_encodings = data["encodings"]
 known_names = data["names"]
 print("[READY] Loaded:", known_names)
 
-# --- Load previous sessions ---
-def load_sessions():
-    if not os.path.exists(OUTPUT_CSV):
-        return []
-    sessions = []
-    with open(OUTPUT_CSV, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            arr = datetime.strptime(row["arrival"], "%Y-%m-%d %H:%M:%S")
-            dep = datetime.strptime(row["departure"], "%Y-%m-%d %H:%M:%S") if row["departure"] else None
-            sessions.append({"name": row["name"], "arrival": arr, "departure": dep})
-    return sessions
-
-# --- Save ---
-def save_sessions(sessions):
-    with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["name", "arrival", "departure"])
-        for s in sessions:
-            arr = s["arrival"].strftime("%Y-%m-%d %H:%M:%S")
-            dep = s["departure"].strftime("%Y-%m-%d %H:%M:%S") if s["departure"] else ""
-            writer.writerow([s["name"], arr, dep])
-
-sessions = load_sessions()
-active = {}
-
-def mark_arrival(name, now):
-    sessions.append({"name": name, "arrival": now, "departure": None})
-    active[name] = {"arrival": now, "last_seen": now, "index": len(sessions)-1}
-    save_sessions(sessions)
-    print(f"[ARRIVAL] {name} at {now.strftime('%H:%M:%S')}")
-
-def mark_departure(name, now):
-    idx = active[name]["index"]
-    sessions[idx]["departure"] = now
-    del active[name]
-    save_sessions(sessions)
-    print(f"[DEPARTURE] {name} at {now.strftime('%H:%M:%S')}")
+# --- Sessions: append-only event log (session_log.SessionLog) ---
+# Old data/attendance_sessions.csv is migrated once; open sessions are replayed from the log
+sessions = SessionLog(timeout=DEPARTURE_TIMEOUT)
 
 # --- Camera ---
 cap = cv2.VideoCapture(0)
@@ -74,7 +37,6 @@ try:
         locations = face_recognition.face_locations(rgb)
         encodings = face_recognition.face_encodings(rgb, locations)
 
-        now = datetime.now()
         seen = set()
 
         for enc, loc in zip(encodings, locations):
@@ -97,16 +59,10 @@ try:
 
             if name != "UNKNOWN":
                 seen.add(name)
-                if name in active:
-                    active[name]["last_seen"] = now
-                else:
-                    mark_arrival(name, now)
+                sessions.seen(name, name)
 
-        # departure check
-        for person in list(active.keys()):
-            last = active[person]["last_seen"]
-            if (now - last).total_seconds() > DEPARTURE_TIMEOUT:
-                mark_departure(person, now)
+        # departure check (monotonic deadline heap - only expired people are touched)
+        sessions.expire()
 
         cv2.imshow("Attendance", frame)
 
@@ -117,8 +73,7 @@ finally:
     cap.release()
     cv2.destroyAllWindows()
     # Close all remaining active sessions
-    end = datetime.now()
-    for person in list(active.keys()):
-        mark_departure(person, end)
+    sessions.close_all(datetime.now())
+    sessions.close()
 
     print("[EXIT] All data saved.")
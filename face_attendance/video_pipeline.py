@@ -0,0 +1,383 @@
+"""
+VIDEO PIPELINE (BOSQICHLARGA AJRATILGAN)
+
+    capture ──► [inference_queue] ──► inference ──► latest_results
+       │                                                 │
+       └──────► [render_queue] ──► render + JPEG ◄───────┘
+                                        │
+                     ┌──────────────────┼──────────────────┐
+               [subscriber 1]     [subscriber 2]   ...  (har biri 1 o'rinli)
+
+Mijoz turlari (profillar):
+    'full'       - natijalar chizilgan, to'liq o'lchamli JPEG (STREAM_JPEG_QUALITY)
+    'preview'    - chizilmagan, kichik o'lchamli va siyrak JPEG (STREAM_PREVIEW_*);
+                   ramkalarni brauzer 'detections' bo'yicha o'zi chizadi
+    'detections' - faqat ixcham natijalar (track id, joy, ism, ishonch) - JPEG yo'q
+
+Har bir bosqich alohida thread'da ishlaydi va chegaralangan, "eng eskisini
+tashlaydigan" navbatlar bilan bog'langan: sekin tanib olish video oqimni
+to'xtatmaydi, kamera kadrlari esa eskirib qolmaydi (faqat eng yangisi olinadi).
+Har bir profil faqat unga obuna bo'lgan mijoz bo'lsagina hisoblanadi.
+
+Bitta kamera uchun bitta pipeline: kadr bir marta tanib olinadi va bir marta
+JPEG qilinadi, keyin barcha /video_feed mijozlariga tarqatiladi. Sekin mijoz
+kadrlarni o'tkazib yuboradi, bufer to'planmaydi.
+"""
+import collections
+import itertools
+import threading
+import time
+import cv2
+import config
+from face_tracker import FaceTracker
+from motion_gate import MotionGate
+
+
+SUBSCRIBER_KINDS = ('full', 'preview', 'detections')
+
+
+def detection_message(seq, frame_shape, results):
+    """
+    Brauzer uchun ixcham natija: joylar asl kadr koordinatalarida
+
+    Returns:
+        dict: {'seq', 'ts', 'width', 'height', 'faces': [...]}
+    """
+    faces = []
+    for result in results:
+        distance = result.get('distance')
+        faces.append({
+            'track_id': result.get('track_id'),
+            'box': [int(value) for value in result['location']],
+            'name': result['name'],
+            'student_id': result['student_id'],
+            'confidence': round(1 - distance, 3) if distance is not None else None
+        })
+    return {
+        'seq': seq,
+        'ts': time.time(),
+        'width': int(frame_shape[1]),
+        'height': int(frame_shape[0]),
+        'faces': faces
+    }
+
+
+class DropOldestQueue:
+    """
+    Chegaralangan navbat: to'lganda eng eski element tashlanadi (kutish yo'q)
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """
+        Returns:
+            element yoki None (navbat yopilgan yoki timeout)
+        """
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def stats(self):
+        with self._cond:
+            return {
+                'depth': len(self._items),
+                'maxsize': self.maxsize,
+                'put': self.put_count,
+                'dropped': self.dropped
+            }
+
+
+class CameraPipeline:
+    """
+    Bitta kamera uchun capture / inference / render bosqichlari
+
+    Args:
+        camera: cv2.VideoCapture (yoki read() metodiga ega obyekt)
+        camera_lock: kamerani boshqa o'quvchilar bilan bo'lishish uchun lock
+        face_system: FaceRecognitionSystem
+        on_results: tanib olish natijalari uchun callback (masalan, davomat)
+        draw: kadrga natijalarni chizish funksiyasi
+        quality: QualityController (None = config'dagi statik sozlamalar)
+    """
+
+    def __init__(self, camera, camera_lock, face_system, on_results=None, draw=None,
+                 quality=None):
+        self.camera = camera
+        self.camera_lock = camera_lock
+        self.face_system = face_system
+        self.on_results = on_results
+        self.draw = draw
+        self.quality = quality
+
+        self.inference_queue = DropOldestQueue(config.PIPELINE_INFERENCE_QUEUE_SIZE)
+        self.render_queue = DropOldestQueue(config.PIPELINE_RENDER_QUEUE_SIZE)
+
+        # Har bir mijoz uchun bitta o'rinli "eng so'nggi kadr" navbati (tur bo'yicha)
+        self._subscribers = {kind: set() for kind in SUBSCRIBER_KINDS}
+        self._subscribers_lock = threading.Lock()
+
+        # Inference thread'i nashr qiladi, render thread'i o'qiydi (atomik almashtirish)
+        self.latest_results = []
+
+        self.tracker = FaceTracker() if config.USE_FACE_TRACKER else None
+        self.motion_gate = MotionGate() if config.USE_MOTION_GATE else None
+
+        self.captured = 0
+        self.inferred = 0
+        self.inference_seconds = 0.0
+        self.rendered = 0
+        self.previews = 0
+        self.detections_sent = 0
+        self._detection_seq = itertools.count(1)
+        self._last_faces = None
+        self._last_preview = 0.0
+
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name='capture', daemon=True),
+            threading.Thread(target=self._inference_loop, name='inference', daemon=True),
+            threading.Thread(target=self._render_loop, name='render', daemon=True),
+        ]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._subscribers_lock:
+            subscribers = [s for group in self._subscribers.values() for s in group]
+        for queue in [self.inference_queue, self.render_queue] + subscribers:
+            queue.close()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=2.0)
+
+    @property
+    def running(self):
+        return not self._stop.is_set()
+
+    # ===== MIJOZLAR (FAN-OUT) =====
+
+    def subscribe(self, kind='full'):
+        """
+        Yangi mijoz qo'shish
+
+        Args:
+            kind: 'full', 'preview' yoki 'detections'
+
+        Returns:
+            DropOldestQueue: mijozning "eng so'nggi kadr" (yoki natija) o'rni
+        """
+        if kind not in SUBSCRIBER_KINDS:
+            raise ValueError(f"Noma'lum stream turi: {kind}")
+
+        subscriber = DropOldestQueue(config.PIPELINE_OUTPUT_QUEUE_SIZE)
+        with self._subscribers_lock:
+            self._subscribers[kind].add(subscriber)
+            if kind == 'detections':
+                # Yangi mijoz joriy holatni darhol olishi uchun
+                self._last_faces = None
+        if not self.running:
+            subscriber.close()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """
+        Returns:
+            int: qolgan mijozlar soni (barcha turlar)
+        """
+        subscriber.close()
+        with self._subscribers_lock:
+            for group in self._subscribers.values():
+                group.discard(subscriber)
+            return sum(len(group) for group in self._subscribers.values())
+
+    def frames(self, subscriber):
+        """
+        Mijoz uchun JPEG baytlari (yoki natija) generatori (pipeline to'xtaguncha)
+        """
+        while not subscriber.closed:
+            jpeg = subscriber.get(timeout=1.0)
+            if jpeg is not None:
+                yield jpeg
+
+    # ===== BOSQICHLAR =====
+
+    def _capture_loop(self):
+        while not self._stop.is_set():
+            with self.camera_lock:
+                success, frame = self.camera.read()
+
+            if not success:
+                break
+
+            self.captured += 1
+            self.render_queue.put(frame)
+
+            # Har N-kadrda tanib olish - inference faqat eng yangi kadrni oladi
+            every_n = self.quality.skip if self.quality is not None else config.PROCESS_EVERY_N_FRAMES
+            if self.captured % every_n == 0:
+                self.inference_queue.put(frame)
+
+        self.stop()
+
+    def _inference_loop(self):
+        while not self._stop.is_set():
+            frame = self.inference_queue.get(timeout=1.0)
+            if frame is None:
+                continue
+
+            start = time.perf_counter()
+            self.latest_results = self._infer(frame)
+            self.inference_seconds += time.perf_counter() - start
+            self.inferred += 1
+            self._publish_detections(frame.shape, self.latest_results)
+
+    def _publish_detections(self, frame_shape, results):
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers['detections'])
+        if not subscribers:
+            return
+
+        message = detection_message(next(self._detection_seq), frame_shape, results)
+        # O'zgarmagan natijalar qayta yuborilmaydi (bo'sh xona - trafik yo'q)
+        if message['faces'] == self._last_faces:
+            return
+        self._last_faces = message['faces']
+
+        for subscriber in subscribers:
+            subscriber.put(message)
+        self.detections_sent += 1
+
+    def _infer(self, frame):
+        changed, regions = True, None
+        if self.motion_gate is not None:
+            changed, regions = self.motion_gate.check(frame)
+
+        if not changed:
+            # O'zgarmagan kadr: oxirgi natijalar (yoki OpenCV tracker)
+            if self.tracker is not None:
+                return self.tracker.predict(frame)
+            return self.latest_results
+
+        scale = upsample = None
+        if self.quality is not None:
+            scale, upsample = self.quality.scale, self.quality.upsample
+
+        start = time.perf_counter()
+        if self.tracker is not None:
+            results = self.face_system.recognize_faces_tracked(frame, self.tracker, regions,
+                                                               scale, upsample)
+        else:
+            results = self.face_system.recognize_faces_in_frame(frame, scale, upsample)
+        if self.quality is not None:
+            self.quality.record(time.perf_counter() - start)
+
+        if self.on_results is not None:
+            self.on_results(results)
+        return results
+
+    def _render_loop(self):
+        encode_params = [cv2.IMWRITE_JPEG_QUALITY, config.STREAM_JPEG_QUALITY]
+        while not self._stop.is_set():
+            frame = self.render_queue.get(timeout=1.0)
+            if frame is None:
+                continue
+
+            with self._subscribers_lock:
+                subscribers = list(self._subscribers['full'])
+                previews = list(self._subscribers['preview'])
+
+            # Preview chizishdan oldin olinadi (ramkalarni brauzer chizadi)
+            if previews:
+                self._render_preview(frame, previews)
+            if not subscribers:
+                continue
+
+            # Eng so'nggi natijalar chiziladi (inference'ni kutmasdan).
+            # Shu kadr inference navbatida ham bo'lishi mumkin - nusxaga chiziladi,
+            # motion gate va HOG ramkasiz asl kadrni ko'radi
+            if self.draw is not None:
+                frame = frame.copy()
+                self.draw(frame, self.latest_results)
+
+            # Bir marta encode qilinib, barcha mijozlarga tarqatiladi
+            ret, buffer = cv2.imencode('.jpg', frame, encode_params)
+            if ret:
+                jpeg = buffer.tobytes()
+                for subscriber in subscribers:
+                    subscriber.put(jpeg)
+                self.rendered += 1
+
+    def _render_preview(self, frame, subscribers):
+        now = time.monotonic()
+        if now - self._last_preview < 1.0 / config.STREAM_PREVIEW_FPS:
+            return
+        self._last_preview = now
+
+        height, width = frame.shape[:2]
+        if width > config.STREAM_PREVIEW_WIDTH:
+            scale = config.STREAM_PREVIEW_WIDTH / float(width)
+            frame = cv2.resize(frame, (config.STREAM_PREVIEW_WIDTH, int(height * scale)),
+                               interpolation=cv2.INTER_AREA)
+
+        ret, buffer = cv2.imencode('.jpg', frame,
+                                   [cv2.IMWRITE_JPEG_QUALITY, config.STREAM_PREVIEW_JPEG_QUALITY])
+        if ret:
+            jpeg = buffer.tobytes()
+            for subscriber in subscribers:
+                subscriber.put(jpeg)
+            self.previews += 1
+
+    # ===== STATISTIKA =====
+
+    def stats(self):
+        with self._subscribers_lock:
+            subscribers = {kind: [subscriber.stats() for subscriber in group]
+                           for kind, group in self._subscribers.items()}
+        return {
+            'captured': self.captured,
+            'inferred': self.inferred,
+            'rendered': self.rendered,
+            'previews': self.previews,
+            'detections_sent': self.detections_sent,
+            'avg_inference_ms': round(self.inference_seconds * 1000 / self.inferred, 2)
+            if self.inferred else 0.0,
+            'motion_gate': self.motion_gate.stats() if self.motion_gate else None,
+            'quality': self.quality.stats() if self.quality is not None else None,
+            'queues': {
+                'inference': self.inference_queue.stats(),
+                'render': self.render_queue.stats()
+            },
+            'subscribers': subscribers
+        }
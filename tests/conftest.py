@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# face_attendance modullari tekis import qilinadi (import config), database - paket sifatida.
+# face_attendance birinchi: app.py ildizdagi app/ paketidan oldin topilishi uchun
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'face_attendance'))
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from analytics import OccupancyAnalytics
+from session_log import ARRIVAL, DEPARTURE, SessionLog
+
+
+@pytest.fixture
+def checkpoint_path(tmp_path):
+    return str(tmp_path / 'analytics.json')
+
+
+def _event(analytics, seq, event, student_id, when):
+    analytics.handle(event, {'seq': seq, 'student_id': student_id, 'name': student_id, 'time': when})
+
+
+def test_occupancy_and_dwell(checkpoint_path):
+    analytics = OccupancyAnalytics(checkpoint_path=checkpoint_path)
+    start = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
+
+    _event(analytics, 1, ARRIVAL, 's1', start)
+    _event(analytics, 2, ARRIVAL, 's2', start + timedelta(minutes=5))
+    _event(analytics, 3, DEPARTURE, 's1', start + timedelta(minutes=30))
+
+    body = analytics.occupancy()
+    assert body['current'] == 1
+    assert body['peak']['count'] == 2
+    assert body['hourly']['arrivals'][9] == 2
+    assert analytics.dwell_for('s1')['total_seconds'] == 1800.0
+
+    # Takroriy (allaqachon qo'llangan) hodisa e'tiborsiz
+    _event(analytics, 3, DEPARTURE, 's1', start + timedelta(minutes=40))
+    assert analytics.dwell_for('s1')['total_seconds'] == 1800.0
+
+
+def test_checkpoint_then_catch_up_applies_only_new_events(tmp_path, checkpoint_path):
+    log = SessionLog(log_path=str(tmp_path / 'sessions.log'), table_path=str(tmp_path / 'sessions.csv'),
+                     legacy_path=str(tmp_path / 'legacy.csv'), timeout=3600)
+    analytics = OccupancyAnalytics(checkpoint_path=checkpoint_path)
+    log.listeners.append(analytics.handle)
+
+    start = datetime.now().replace(microsecond=0) - timedelta(minutes=20)
+    log.seen('s1', 'Ali', now=start)
+    analytics.checkpoint()
+
+    # Checkpoint'dan keyingi hodisa tinglovchisiz (jarayon to'xtagan) yoziladi
+    log.listeners.remove(analytics.handle)
+    log.depart('s1', now=start + timedelta(minutes=10))
+
+    restored = OccupancyAnalytics(checkpoint_path=checkpoint_path)
+    assert restored.seq == 1
+    assert restored.catch_up(log) == 1
+    assert restored.dwell_for('s1')['total_seconds'] == 600.0
+    assert restored.occupancy()['current'] == 0
+    log.close()
+
+
+def test_previous_day_departure_not_credited_today(checkpoint_path):
+    analytics = OccupancyAnalytics(checkpoint_path=checkpoint_path)
+    yesterday = datetime.now().replace(hour=10, minute=0, second=0, microsecond=0) - timedelta(days=1)
+
+    _event(analytics, 1, ARRIVAL, 's1', yesterday)
+    _event(analytics, 2, DEPARTURE, 's1', yesterday + timedelta(hours=1))
+
+    entry = analytics.dwell_for('s1')
+    assert entry['total_seconds'] == 3600.0
+    assert entry['today_seconds'] == 0.0
+    assert analytics.occupancy()['date'] == datetime.now().strftime('%Y-%m-%d')
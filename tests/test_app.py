@@ -0,0 +1,96 @@
+import importlib
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip('face_recognition')
+pytest.importorskip('flask')
+
+import config  # noqa: E402
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    # Barcha fayl yo'llari vaqtinchalik papkaga - repozitoriyadagi data/ ga tegilmaydi
+    def relocate(path):
+        return str(tmp_path / os.path.relpath(path, config.PROJECT_ROOT))
+
+    for name in dir(config):
+        value = getattr(config, name)
+        if not name.isupper() or name in ('BASE_DIR', 'PROJECT_ROOT'):
+            continue
+        if isinstance(value, str) and value.startswith(config.PROJECT_ROOT):
+            monkeypatch.setattr(config, name, relocate(value))
+        elif isinstance(value, list) and value and all(
+                isinstance(item, str) and item.startswith(config.PROJECT_ROOT) for item in value):
+            monkeypatch.setattr(config, name, [relocate(item) for item in value])
+    for name in ('DATA_DIR', 'ENCODINGS_DIR', 'DATASET_DIR', 'ATTENDANCE_DIR'):
+        os.makedirs(getattr(config, name), exist_ok=True)
+
+    sys.modules.pop('app', None)
+    module = importlib.import_module('app')
+    module.app.config['TESTING'] = True
+    yield module
+
+    module.face_system.attendance.close()
+    if module.session_log is not None:
+        module.session_log.close()
+    sys.modules.pop('app', None)
+
+
+def _enroll(module, student_id, name):
+    system = module.face_system
+    system._publish(system.gallery.with_rows([np.full(128, 0.1)], student_id, name))
+
+
+def test_students_etag_returns_304_until_roster_changes(app_module):
+    client = app_module.app.test_client()
+    _enroll(app_module, 's1', 'Ali')
+
+    first = client.get('/api/students')
+    etag = first.headers['ETag']
+    assert first.status_code == 200
+    assert first.get_json()['students'][0]['id'] == 's1'
+
+    cached = client.get('/api/students', headers={'If-None-Match': etag})
+    assert cached.status_code == 304 and cached.data == b''
+
+    _enroll(app_module, 's2', 'Vali')
+    changed = client.get('/api/students', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_json()['total'] == 2
+
+    status = client.get('/api/status').get_json()
+    assert status['roster_etag'] == app_module.face_system.gallery.roster.etag
+
+
+def _event(message):
+    lines = dict(line.split(': ', 1) for line in message.strip().splitlines() if ': ' in line)
+    return lines['event'], json.loads(lines['data'])
+
+
+def test_events_stream_sends_snapshot_then_changes(app_module, monkeypatch):
+    monkeypatch.setattr(app_module.events, 'queue_size', 2)
+    stream = app_module.generate_events()
+    try:
+        kind, snapshot = _event(next(stream))
+        assert kind == 'snapshot' and snapshot['attendance'] == []
+
+        app_module.face_system.mark_attendance('s1', 'Ali')
+        kind, data = _event(next(stream))
+        assert kind == 'attendance' and data['student_id'] == 's1'
+
+        # Navbat to'lib hodisalar yo'qolsa - avval to'liq holat qayta yuboriladi
+        for i in range(4):
+            app_module.events.publish('camera', {'i': i})
+        kind, snapshot = _event(next(stream))
+        assert kind == 'snapshot'
+        assert [row['student_id'] for row in snapshot['attendance']] == ['s1']
+        assert _event(next(stream)) == ('camera', {'i': 2})
+    finally:
+        stream.close()
+    assert app_module.events.stats()['subscribers'] == 0
@@ -0,0 +1,57 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+import config
+from attendance_store import DailyAttendanceStore, is_sealed
+
+
+def _day(offset):
+    return (datetime.now() + timedelta(days=offset)).strftime(config.ATTENDANCE_DATE_FORMAT)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DailyAttendanceStore(directory=str(tmp_path / 'attendance'),
+                                legacy_path=str(tmp_path / 'attendance.csv'))
+
+
+def test_read_day_has_no_side_effects(store):
+    yesterday, today, tomorrow = _day(-1), _day(0), _day(1)
+    store.write_batch([('s1', 'Ali', yesterday, '09:00:00')])
+    store.write_batch([('s2', 'Vali', tomorrow, '09:00:00')])
+    assert store.date is None
+
+    assert store.read_day(tomorrow) == [('s2', 'Vali', '09:00:00')]
+    assert store.read_day(yesterday) == [('s1', 'Ali', '09:00:00')]
+    assert store.date is None
+    assert not is_sealed(store.day_path(yesterday))
+
+    store.read_day(today)
+    assert not is_sealed(store.day_path(yesterday))
+
+    # Birinchi bugungi yozuv o'tgan kunlarni muhrlaydi
+    store.mark('s3', 'Soli')
+    assert is_sealed(store.day_path(yesterday))
+    assert not is_sealed(store.day_path(tomorrow))
+
+
+def test_reading_other_days_keeps_today_tail(store):
+    store.mark('s1', 'Ali')
+    store.read_day(_day(1))
+    store.read_day(_day(-3))
+
+    assert store.date == _day(0)
+    assert store.is_marked('s1')
+    assert store.today_count() == 1
+    assert store.mark('s1', 'Ali')[0] is False
+
+
+def test_future_day_is_not_cached_as_segment(store):
+    tomorrow = _day(1)
+    assert store.read_day(tomorrow) == []
+    store.write_batch([('s1', 'Ali', tomorrow, '09:00:00')])
+    assert store.read_day(tomorrow) == [('s1', 'Ali', '09:00:00')]
+    assert tomorrow not in store._segments
+    assert os.path.exists(store.day_path(tomorrow))
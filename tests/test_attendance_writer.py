@@ -0,0 +1,84 @@
+import pytest
+
+from attendance_store import AttendanceWriter
+
+
+class FlakyStore:
+    """write_batch birinchi `failures` marta xato beradi"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.rows = []
+        self.calls = 0
+        self.closed = False
+
+    def read_day(self, date_str):
+        return [(row[0], row[1], row[3]) for row in self.rows if row[2] == date_str]
+
+    def write_batch(self, rows, durable=True):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk to'la")
+        self.rows.extend(rows)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pending_path(tmp_path):
+    return str(tmp_path / 'attendance.pending')
+
+
+def test_flush_reports_failed_commit(pending_path):
+    store = FlakyStore(failures=1)
+    writer = AttendanceWriter(store, flush_seconds=60, pending_path=pending_path)
+    writer.mark('s1', 'Ali')
+
+    assert writer.flush(timeout=5) is False
+    assert writer.flush(timeout=5) is True
+    assert [row[0] for row in store.rows] == ['s1']
+    assert writer.close()
+
+
+def test_backoff_does_not_retry_on_every_append(pending_path):
+    store = FlakyStore(failures=1)
+    writer = AttendanceWriter(store, batch_size=1, flush_seconds=60, pending_path=pending_path)
+    for index in range(5):
+        writer.mark(f"s{index}", 'Ali')
+
+    assert writer.flush(timeout=5) is True
+    # Birinchi (xato) urinish + flush - har yangi yozuvda qayta urinilmaydi
+    assert store.calls == 2
+    assert len(store.rows) == 5
+    writer.close()
+
+
+def test_close_persists_unwritten_rows(pending_path):
+    store = FlakyStore(failures=100)
+    writer = AttendanceWriter(store, flush_seconds=60, pending_path=pending_path)
+    writer.mark('s1', 'Ali')
+
+    assert writer.close(timeout=5) is False
+    assert store.closed
+
+    store.failures = 0
+    restarted = AttendanceWriter(store, flush_seconds=60, pending_path=pending_path)
+    assert [row[0] for row in store.rows] == ['s1']
+    assert restarted.is_marked('s1')
+    restarted.close()
+
+
+def test_unclosed_writer_flushes_at_exit(pending_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr('attendance_store.atexit.register', registered.append)
+    store = FlakyStore(failures=0)
+    writer = AttendanceWriter(store, flush_seconds=60, pending_path=pending_path)
+    writer.mark('s1', 'Ali')
+
+    assert registered == [writer.close]
+    for callback in registered:
+        callback()
+    assert [row[0] for row in store.rows] == ['s1']
+    assert store.closed
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import config
+from camera_pool import _CameraState, assign_cameras
+from gallery import Gallery
+from shared_gallery import SharedGalleryPublisher, SharedGalleryReader
+
+
+def test_assign_cameras_round_robin():
+    assert assign_cameras(['a', 'b', 'c', 'd', 'e'], 2) == [['a', 'c', 'e'], ['b', 'd']]
+    # Worker'lar kameralardan ko'p bo'lsa bo'sh worker yaratilmaydi
+    assert assign_cameras(['a'], 4) == [['a']]
+
+
+@pytest.fixture
+def shared(monkeypatch):
+    monkeypatch.setattr(config, 'FACE_MATCHER', 'prototype')
+    publisher = SharedGalleryPublisher()
+    reader = SharedGalleryReader()
+    yield publisher, reader
+    publisher.close()
+
+
+def test_worker_attaches_shared_gallery_without_copying(shared):
+    publisher, reader = shared
+    rng = np.random.default_rng(0)
+    encodings = rng.normal(size=(30, 128)).astype(np.float32)
+    ids = [f"s{i % 5}" for i in range(30)]
+    parent = Gallery.from_rows(encodings, ids, ids)
+
+    worker = reader.attach(publisher.publish(parent))
+
+    assert reader.generation == 1
+    assert not worker.matrix.flags.writeable and not worker.matrix.flags.owndata
+    # Qatorlar talaba bo'yicha yozilgan - PrototypeMatcher nusxa olmaydi
+    assert worker.matcher.matrix is worker.matrix
+    assert sorted(worker.row_ids) == sorted(parent.row_ids)
+
+    probes = encodings[:8]
+    parent_rows, parent_distances = parent.matcher.search(probes)
+    worker_rows, worker_distances = worker.matcher.search(probes)
+    assert [parent.row_ids[i] for i in parent_rows] == [worker.row_ids[i] for i in worker_rows]
+    assert np.allclose(parent_distances, worker_distances)
+
+
+def test_new_generation_unlinks_previous_blocks(shared):
+    publisher, reader = shared
+    first = publisher.publish(Gallery.from_rows([np.zeros(128)], ['s1'], ['Ali']))
+    assert reader.attach(first) is not None
+
+    second = publisher.publish(Gallery.from_rows([np.zeros(128), np.ones(128)], ['s1', 's2'],
+                                                 ['Ali', 'Vali']))
+    # Eski avlod nomi o'chirilgan - kechikkan worker yangisini kutadi
+    assert SharedGalleryReader().attach(first) is None
+
+    worker = reader.attach(second)
+    reader.release_old()
+    assert reader.generation == 2
+    assert worker.student_ids == ['s1', 's2']
+
+
+def test_camera_state_cooldown_per_student(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, 'RECOGNITION_COOLDOWN_SECONDS', 10)
+    state = _CameraState('cam', {'source': str(tmp_path / 'missing.mp4')})
+    try:
+        results = [{'student_id': 's1', 'name': 'Ali'},
+                   {'student_id': None, 'name': "Noma'lum"}]
+
+        assert list(state.recognized(results, 100.0)) == [('s1', 'Ali')]
+        assert list(state.recognized(results, 105.0)) == []
+        assert list(state.recognized(results, 111.0)) == [('s1', 'Ali')]
+    finally:
+        state.capture.release()
@@ -0,0 +1,54 @@
+import sqlite3
+import threading
+
+import pytest
+
+from database import db_setup
+from database.daily_counters import DailyCounters
+
+DAY = '2026-10-18'
+
+
+@pytest.fixture
+def counters(tmp_path):
+    path = str(tmp_path / 'attendance.db')
+    counters = DailyCounters(path)
+    yield counters
+    counters.close()
+
+
+def _in_thread(func):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def _external_insert(path, student_id):
+    # Boshqa jarayon kabi: db_setup.listeners chaqirilmaydi
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("INSERT INTO attendance (student_id, name, date, time) VALUES (?, ?, ?, ?)",
+                     (student_id, student_id, DAY, '09:00:00'))
+    conn.close()
+
+
+def test_data_version_seen_across_threads(counters):
+    assert _in_thread(lambda: counters.count(DAY)) == 0
+
+    _external_insert(counters.path, 's1')
+    assert _in_thread(lambda: counters.count(DAY)) == 1
+
+    _external_insert(counters.path, 's2')
+    assert counters.count(DAY) == 2
+    assert _in_thread(lambda: counters.names(DAY)) == ['s1', 's2']
+
+
+def test_in_process_writes_are_counted(counters):
+    assert counters.count(DAY) == 0
+    db_setup.mark_attendance('s1', 'Ali', DAY, '09:00:00', path=counters.path)
+    assert counters.is_present('s1', DAY)
+    queries = counters.stats()['db_queries']
+    assert counters.count(DAY) == 1
+    assert counters.stats()['db_queries'] == queries
@@ -0,0 +1,59 @@
+import sqlite3
+
+import pytest
+
+import config
+from database import db_setup
+
+LEGACY_SCHEMA = "CREATE TABLE {table} (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, date TEXT, time TEXT)"
+LEGACY_ROWS = [('Ali', '2026-10-17', '09:00:00'), ('Ali', '2026-10-17', '09:00:01'),
+               ('Vali', '2026-10-17', '09:05:00')]
+
+
+def _legacy_db(path, table='attendance'):
+    conn = sqlite3.connect(path)
+    conn.execute(LEGACY_SCHEMA.format(table=table))
+    conn.executemany(f"INSERT INTO {table} (name, date, time) VALUES (?, ?, ?)", LEGACY_ROWS)
+    conn.commit()
+    return conn
+
+
+def _tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+
+def test_migrate_copies_and_dedupes(tmp_path):
+    conn = _legacy_db(str(tmp_path / 'a.db'))
+    db_setup._migrate(conn)
+
+    assert 'attendance_legacy' not in _tables(conn)
+    rows = conn.execute("SELECT student_id, name, time FROM attendance ORDER BY id").fetchall()
+    assert rows == [('Ali', 'Ali', '09:00:00'), ('Vali', 'Vali', '09:05:00')]
+
+
+def test_migrate_failure_rolls_back(tmp_path, monkeypatch):
+    conn = _legacy_db(str(tmp_path / 'a.db'))
+    monkeypatch.setattr(db_setup, 'SCHEMA', db_setup.SCHEMA + "CREATE TABLE broken (;")
+
+    with pytest.raises(sqlite3.OperationalError):
+        db_setup._migrate(conn)
+
+    assert _tables(conn) >= {'attendance'}
+    assert 'attendance_legacy' not in _tables(conn)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(attendance)")]
+    assert 'student_id' not in columns
+    assert conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0] == 3
+
+
+def test_migrate_resumes_leftover_legacy_table(tmp_path):
+    # Eski kod RENAME'dan keyin to'xtab qolgan holat
+    conn = _legacy_db(str(tmp_path / 'a.db'), table='attendance_legacy')
+    db_setup._migrate(conn)
+
+    assert 'attendance_legacy' not in _tables(conn)
+    assert conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0] == 2
+
+
+def test_attendance_backend_shares_db_path():
+    # face_attendance sqlite backend va db_setup bitta faylga yozishi kerak
+    assert config.ATTENDANCE_DB_FILE == db_setup.DB_PATH
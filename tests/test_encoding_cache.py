@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from encoding_cache import EncodingCache, cache_key
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / 'a.jpg'
+    path.write_bytes(b'rasm-1')
+    return path
+
+
+def test_key_follows_content_not_path(image, tmp_path):
+    moved = tmp_path / 'other' / 'b.jpg'
+    moved.parent.mkdir()
+    moved.write_bytes(image.read_bytes())
+    assert cache_key(str(moved)) == cache_key(str(image))
+
+    image.write_bytes(b'rasm-2')
+    assert cache_key(str(moved)) != cache_key(str(image))
+
+
+def test_hit_miss_and_persistence(image, tmp_path):
+    path = str(tmp_path / 'cache.npz')
+    cache = EncodingCache(path)
+    key = cache_key(str(image))
+    assert cache.lookup(key) == (False, None)
+
+    encoding = np.arange(128, dtype=np.float32)
+    cache.store(key, encoding)
+    cache.store('bo-sh', None)
+    cache.save()
+
+    reloaded = EncodingCache(path)
+    found, cached = reloaded.lookup(key)
+    assert found and np.array_equal(cached, encoding)
+    assert reloaded.lookup('bo-sh') == (True, None)
+    assert (reloaded.hits, reloaded.misses) == (2, 0)
+
+
+def test_prune_drops_stale_keys(tmp_path):
+    cache = EncodingCache(str(tmp_path / 'cache.npz'))
+    cache.store('a', np.zeros(128))
+    cache.store('b', np.zeros(128))
+    cache.prune(['a'])
+
+    assert cache.evicted == 1
+    assert cache.lookup('b') == (False, None)
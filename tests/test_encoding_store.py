@@ -0,0 +1,46 @@
+import pickle
+
+import numpy as np
+import pytest
+
+import config
+import encoding_store
+
+
+@pytest.fixture
+def gallery_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'GALLERY_MATRIX_FILE', str(tmp_path / 'face_gallery.npy'))
+    monkeypatch.setattr(config, 'GALLERY_LABELS_FILE', str(tmp_path / 'face_gallery_labels.npy'))
+    monkeypatch.setattr(config, 'GALLERY_META_FILE', str(tmp_path / 'face_gallery.json'))
+    return tmp_path
+
+
+def _write_pickle(path, data):
+    with open(path, 'wb') as f:
+        pickle.dump(data, f)
+    return str(path)
+
+
+def test_empty_legacy_pickle_is_skipped(gallery_paths, monkeypatch):
+    empty = _write_pickle(gallery_paths / 'face_encodings.pkl',
+                          {'encodings': [], 'names': [], 'ids': []})
+    encodings = [np.full(128, 0.1), np.full(128, 0.2), np.full(128, 0.3)]
+    legacy = _write_pickle(gallery_paths / 'encodings.pkl',
+                           {'encodings': encodings, 'names': ['Ali', 'Ali', 'Vali']})
+    monkeypatch.setattr(config, 'LEGACY_ENCODINGS_FILES', [empty, legacy])
+
+    assert encoding_store.migrate_legacy_pickle()
+
+    data = encoding_store.load_gallery()
+    assert len(data['matrix']) == 3
+    assert data['student_ids'] == ['Ali', 'Vali']
+    assert list(data['labels']) == [0, 0, 1]
+
+
+def test_only_empty_sources_write_nothing(gallery_paths, monkeypatch):
+    empty = _write_pickle(gallery_paths / 'face_encodings.pkl',
+                          {'encodings': [], 'names': [], 'ids': []})
+    monkeypatch.setattr(config, 'LEGACY_ENCODINGS_FILES', [empty])
+
+    assert not encoding_store.migrate_legacy_pickle()
+    assert encoding_store.load_gallery() is None
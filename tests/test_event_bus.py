@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+pytest.importorskip('cv2')
+
+from event_bus import EventBus, sse_message  # noqa: E402
+
+
+def test_sse_message_format():
+    assert sse_message('gallery', {'total': 2}, 5) == 'id: 5\nevent: gallery\ndata: {"total": 2}\n\n'
+    assert sse_message('snapshot', {'name': "O'g'il"}) == 'event: snapshot\ndata: {"name": "O\'g\'il"}\n\n'
+
+
+def test_publish_fans_out_one_message_to_every_subscriber():
+    bus = EventBus(queue_size=4)
+    first, second = bus.subscribe(), bus.subscribe()
+
+    bus.publish('attendance', {'student_id': 's1'})
+    bus.publish('attendance', {'student_id': 's2'})
+
+    a, b = first.get(timeout=0), second.get(timeout=0)
+    # Matn bir marta yaratiladi - ikkala mijozga aynan bitta obyekt
+    assert a is b
+    assert a.startswith('id: 1\nevent: attendance\n')
+    assert json.loads(a.split('data: ')[1]) == {'student_id': 's1'}
+    assert second.get(timeout=0).startswith('id: 2\n')
+    assert bus.stats() == {'subscribers': 2, 'published': 2, 'dropped': 0}
+
+
+def test_slow_subscriber_drops_oldest_and_is_counted():
+    bus = EventBus(queue_size=2)
+    slow = bus.subscribe()
+    for i in range(5):
+        bus.publish('attendance', {'i': i})
+
+    assert bus.stats()['dropped'] == 3
+    assert slow.get(timeout=0).startswith('id: 4\n')
+
+    bus.unsubscribe(slow)
+    assert slow.closed
+    bus.publish('attendance', {'i': 5})
+    assert bus.stats() == {'subscribers': 0, 'published': 6, 'dropped': 0}
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('face_recognition')
+
+import face_recognition_system  # noqa: E402
+from gallery import Gallery  # noqa: E402
+
+
+def test_worker_system_does_no_attendance_io(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("worker davomat omborini ochmasligi kerak")
+
+    monkeypatch.setattr(face_recognition_system, 'create_attendance_store', fail)
+    monkeypatch.setattr(face_recognition_system, 'AttendanceWriter', fail)
+
+    system = face_recognition_system.FaceRecognitionSystem(load=False)
+    assert system.attendance is None
+
+
+@pytest.mark.parametrize('verify', [False, True])
+def test_match_encodings_batches_all_faces(monkeypatch, verify):
+    monkeypatch.setattr(face_recognition_system.config, 'MATCHER_VERIFY', verify)
+
+    rows = np.eye(3, 128, dtype=np.float32)
+    system = face_recognition_system.FaceRecognitionSystem(load=False)
+    system.gallery = Gallery.from_rows(rows, ['s1', 's2', 's3'], ['Ali', 'Vali', 'Gani'])
+
+    probes = [rows[2] + 0.01, np.full(128, 5.0)]
+    indices, distances, matches = system.match_encodings(probes)
+
+    assert indices[0] == 2
+    assert distances[0] == pytest.approx(0.01 * np.sqrt(128), abs=1e-5)
+    assert matches.tolist() == [True, False]
+
+
+def test_encode_images_parallel_keeps_input_order(monkeypatch):
+    # Jarayonlar o'rniga thread'lar: monkeypatch worker'larga ham ko'rinadi
+    monkeypatch.setattr(face_recognition_system.concurrent.futures, 'ProcessPoolExecutor',
+                        face_recognition_system.concurrent.futures.ThreadPoolExecutor)
+    chunks = []
+    encode_chunk = face_recognition_system._encode_chunk
+
+    def record_chunk(chunk):
+        chunks.append([position for position, _ in chunk])
+        return encode_chunk(chunk)
+
+    def fake_encode(path):
+        return None if 'noface' in path else np.full(128, float(path.split('_')[1]))
+
+    monkeypatch.setattr(face_recognition_system, '_encode_chunk', record_chunk)
+    monkeypatch.setattr(face_recognition_system, 'encode_image', fake_encode)
+
+    paths = ['img_0', 'img_1', 'noface_2', 'img_3', 'img_4']
+    results = face_recognition_system.encode_images_parallel(paths, workers=3, chunk_size=2)
+
+    assert sorted(chunks) == [[0, 1], [2, 3], [4]]
+    assert results[2] is None
+    assert [r[0] for i, r in enumerate(results) if i != 2] == [0.0, 1.0, 3.0, 4.0]
+
+
+class FakeCascade:
+    def __init__(self, faces):
+        self.faces = faces
+
+    def detectMultiScale(self, gray, **kwargs):
+        return self.faces
+
+
+def test_cascade_rejects_frames_before_hog(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("cascade yuz topmasa HOG ishlamasligi kerak")
+
+    monkeypatch.setattr(face_recognition_system.face_recognition, 'face_locations', fail)
+    system = face_recognition_system.FaceRecognitionSystem(load=False)
+    system.cascade = FakeCascade([])
+
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    _, locations, full_locations = system._detect_faces(frame, scale=0.5)
+
+    assert locations == [] and full_locations == []
+    stats = system.pipeline_stats.snapshot()
+    assert stats['frames'] == 1 and stats['predetector_rejected'] == 1
+    assert stats['stages']['predetect']['calls'] == 1
+    assert stats['stages']['detect']['calls'] == 0
+
+
+def test_cascade_candidates_limit_hog_to_padded_regions(monkeypatch):
+    crops = []
+
+    def face_locations(crop, number_of_times_to_upsample):
+        crops.append(crop.shape[:2])
+        return [(5, 25, 25, 5)]
+
+    monkeypatch.setattr(face_recognition_system.face_recognition, 'face_locations', face_locations)
+    system = face_recognition_system.FaceRecognitionSystem(load=False)
+    # Kichik kadrda (x, y, w, h) = (100, 50, 20, 20)
+    system.cascade = FakeCascade([(100, 50, 20, 20)])
+
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    _, locations, full_locations = system._detect_faces(frame, scale=0.5)
+
+    # 20x20 nomzod 0.5 ga kengaytirilgan: 40x40 kichik kadrda
+    assert crops == [(40, 40)]
+    assert locations == [(45, 115, 65, 95)]
+    assert full_locations == [(90, 230, 130, 190)]
+    assert system.pipeline_stats.snapshot()['stages']['detect']['calls'] == 1
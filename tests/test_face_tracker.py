@@ -0,0 +1,75 @@
+import pytest
+
+import config
+from face_tracker import FaceTracker, iou_matrix
+
+BOX = (100, 200, 200, 100)  # (top, right, bottom, left)
+
+
+def _shift(box, dx):
+    top, right, bottom, left = box
+    return (top, right + dx, bottom, left + dx)
+
+
+def test_iou_matrix():
+    ious = iou_matrix([BOX], [BOX, _shift(BOX, 50), _shift(BOX, 500)])
+    assert ious.shape == (1, 3)
+    assert ious[0, 0] == pytest.approx(1.0)
+    assert ious[0, 1] == pytest.approx(50 / 150)
+    assert ious[0, 2] == 0.0
+
+
+def test_confident_track_is_not_reencoded_until_it_moves():
+    tracker = FaceTracker(backend='iou')
+    [(index, track)] = tracker.update([BOX])
+    assert index == 0
+    tracker.set_identity(track, 'Ali', 's1', 0.3)
+
+    # Kichik siljish: o'sha track, qayta encode yo'q
+    assert tracker.update([_shift(BOX, 10)]) == []
+    assert tracker.results()[0]['student_id'] == 's1'
+
+    # Identifikatsiya joyidan uzoqlashdi (lekin IoU bo'yicha hali o'sha track)
+    pending = tracker.update([_shift(BOX, 40)])
+    assert [(i, t.track_id) for i, t in pending] == [(0, track.track_id)]
+
+
+def test_unconfident_and_new_faces_are_encoded():
+    tracker = FaceTracker(backend='iou')
+    [(_, track)] = tracker.update([BOX])
+    tracker.set_identity(track, "Noma'lum", None, 1.0)
+
+    pending = tracker.update([BOX, _shift(BOX, 500)])
+    assert [i for i, _ in pending] == [0, 1]
+    assert pending[0][1] is track
+    assert pending[1][1].track_id != track.track_id
+
+
+def test_lost_track_expires_only_where_detection_ran():
+    tracker = FaceTracker(backend='iou')
+    tracker.update([BOX])
+
+    # Harakat hududi boshqa joyda - track yo'qolgan hisoblanmaydi
+    elsewhere = [(0, 50, 50, 0)]
+    for _ in range(config.TRACKER_MAX_MISSED + 2):
+        tracker.update([], regions=elsewhere)
+    assert len(tracker.tracks) == 1 and tracker.tracks[0].misses == 0
+
+    for _ in range(config.TRACKER_MAX_MISSED):
+        tracker.update([])
+    assert len(tracker.tracks) == 1
+    assert tracker.results() == []
+
+    tracker.update([])
+    assert tracker.tracks == []
+
+
+def test_greedy_association_prefers_highest_iou():
+    tracker = FaceTracker(backend='iou')
+    tracker.update([BOX, _shift(BOX, 300)])
+    first, second = tracker.tracks
+
+    tracker.update([_shift(BOX, 290), _shift(BOX, 5)])
+    assert first.location == _shift(BOX, 5)
+    assert second.location == _shift(BOX, 290)
+    assert tracker.tracks == [first, second]
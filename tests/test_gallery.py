@@ -0,0 +1,170 @@
+import numpy as np
+import pytest
+
+import gallery
+
+
+def _clustered(num_students=40, per_student=6, seed=0):
+    # Markazlar yaqin, qatorlar tarqoq - eng yaqin prototip har doim ham to'g'ri talaba emas
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(0, 0.02, (num_students, gallery.ENCODING_DIM)).astype(np.float32)
+    labels = np.repeat(np.arange(num_students, dtype=np.int32), per_student)
+    matrix = centers[labels] + rng.normal(0, 0.04, (len(labels), gallery.ENCODING_DIM)).astype(np.float32)
+    # Aralash tartib: matcher qatorlarni o'zi guruhlashi kerak
+    order = rng.permutation(len(labels))
+    matrix = np.ascontiguousarray(matrix[order])
+    # Probe'lar ikki tasodifiy rasm orasida
+    a, b = rng.integers(0, len(labels), (2, 200))
+    probes = np.ascontiguousarray(0.6 * matrix[a] + 0.4 * matrix[b], dtype=np.float32)
+    return matrix, labels[order], probes
+
+
+def test_pairwise_distances_match_naive_norms():
+    rng = np.random.default_rng(1)
+    matrix = rng.normal(size=(30, 128)).astype(np.float32)
+    probes = rng.normal(size=(4, 128)).astype(np.float32)
+
+    distances = gallery.pairwise_distances(probes, matrix, np.einsum('ij,ij->i', matrix, matrix))
+
+    expected = np.linalg.norm(probes[:, None, :] - matrix[None, :, :], axis=2)
+    assert distances.shape == (4, 30)
+    assert distances.dtype == np.float32
+    assert np.allclose(distances, expected, atol=1e-4)
+
+
+def test_gallery_packs_float32_matrix_and_matches_batch(monkeypatch):
+    monkeypatch.setattr(gallery.config, 'FACE_MATCHER', 'brute')
+    rows = [np.full(128, value) for value in (0.1, 0.2, 0.5)]
+    snapshot = gallery.Gallery.from_rows(rows, ['s1', 's2', 's1'], ['Ali', 'Vali', 'Ali'])
+
+    assert snapshot.matrix.dtype == np.float32 and snapshot.matrix.flags.c_contiguous
+    assert snapshot.labels.dtype == np.int32 and snapshot.labels.tolist() == [0, 1, 0]
+    assert not snapshot.matrix.flags.writeable
+
+    # Barcha yuzlar bitta chaqiruvda
+    probes = np.stack([np.full(128, 0.48), np.full(128, 0.19)]).astype(np.float32)
+    indices, distances = snapshot.matcher.search(probes)
+    assert indices.tolist() == [2, 1]
+    assert [snapshot.row_ids[i] for i in indices] == ['s1', 's2']
+    assert np.allclose(distances, [0.02 * np.sqrt(128), 0.01 * np.sqrt(128)], atol=1e-4)
+
+
+@pytest.fixture
+def ivf_gallery(tmp_path, monkeypatch):
+    monkeypatch.setattr(gallery.config, 'FACE_MATCHER', 'ivf')
+    monkeypatch.setattr(gallery.config, 'ANN_INDEX_FILE', str(tmp_path / 'ivf.npz'))
+    rng = np.random.default_rng(0)
+    encodings = rng.normal(size=(200, 128)).astype(np.float32)
+    ids = [f"s{i % 20}" for i in range(200)]
+    return gallery.Gallery.from_rows(encodings, ids, ids)
+
+
+def test_ivf_index_not_rewritten_on_incremental_add(ivf_gallery, tmp_path):
+    index_file = tmp_path / 'ivf.npz'
+    assert index_file.exists()
+    assert not (tmp_path / 'ivf.npz.tmp').exists()
+    before = index_file.read_bytes()
+
+    ivf_gallery.with_rows(np.ones((2, 128), dtype=np.float32), 's99', 's99')
+    assert index_file.read_bytes() == before
+
+
+def test_worker_gallery_reuses_published_ivf_index(ivf_gallery, tmp_path, monkeypatch):
+    from shared_gallery import SharedGalleryPublisher, SharedGalleryReader
+
+    publisher = SharedGalleryPublisher()
+    descriptor = publisher.publish(ivf_gallery)
+    (tmp_path / 'ivf.npz').unlink()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("worker k-means o'qitmasligi kerak")
+
+    monkeypatch.setattr(gallery, 'train_kmeans', fail)
+    reader = SharedGalleryReader()
+    try:
+        worker = reader.attach(descriptor)
+        assert worker.matcher.matrix is worker.matrix
+        assert not (tmp_path / 'ivf.npz').exists()
+
+        probes = np.asarray(ivf_gallery.matrix[:10])
+        parent_rows, _ = ivf_gallery.matcher.search(probes)
+        worker_rows, _ = worker.matcher.search(probes)
+        assert [ivf_gallery.row_ids[i] for i in parent_rows] == [worker.row_ids[i] for i in worker_rows]
+    finally:
+        publisher.close()
+
+
+def test_with_rows_replaces_overwritten_photo_encodings():
+    old = np.full(128, 0.1, dtype=np.float32)
+    kept = np.full(128, 0.2, dtype=np.float32)
+    other = np.full(128, 0.1, dtype=np.float32)
+    snapshot = gallery.Gallery.from_rows([old, kept, other], ['s1', 's1', 's2'], ['Ali', 'Ali', 'Vali'])
+
+    new = np.full(128, 0.3, dtype=np.float32)
+    updated = snapshot.with_rows([new], 's1', 'Ali', replace=[old])
+
+    assert updated.row_ids == ['s1', 's2', 's1']
+    assert np.allclose(np.asarray(updated.matrix)[:, 0], [0.2, 0.1, 0.3])
+    assert updated.student_ids == ['s1', 's2']
+
+
+@pytest.mark.parametrize('top_k', [1, 3])
+def test_prototype_matches_brute_force_within_tolerance(top_k):
+    matrix, labels, probes = _clustered()
+    sq_norms = np.einsum('ij,ij->i', matrix, matrix)
+    tolerance = gallery.config.FACE_MATCH_TOLERANCE
+
+    exact_rows, exact_distances = gallery.BruteForceMatcher(matrix, sq_norms, labels).search(probes)
+    rows, distances = gallery.PrototypeMatcher(matrix, sq_norms, labels, top_k=top_k).search(probes)
+
+    assert (exact_distances <= tolerance).all()
+    assert labels[rows].tolist() == labels[exact_rows].tolist()
+    assert np.allclose(distances, exact_distances, atol=1e-5)
+
+
+def test_ivf_with_all_lists_probed_is_exact():
+    matrix, labels, probes = _clustered()
+    sq_norms = np.einsum('ij,ij->i', matrix, matrix)
+
+    exact_rows, exact_distances = gallery.BruteForceMatcher(matrix, sq_norms, labels).search(probes)
+    matcher = gallery.IVFMatcher(matrix, sq_norms, labels, num_lists=16, index_file='')
+    matcher.nprobe = len(matcher.centroids)
+    rows, distances = matcher.search(probes)
+
+    assert rows.tolist() == exact_rows.tolist()
+    assert np.allclose(distances, exact_distances, atol=1e-5)
+
+
+def test_recall_report_reaches_full_recall():
+    matrix, labels, probes = _clustered()
+    sq_norms = np.einsum('ij,ij->i', matrix, matrix)
+
+    report = gallery.recall_report(matrix, sq_norms, labels, probes, [1, 4, 16], num_lists=16)
+
+    assert [entry['nprobe'] for entry in report] == [1, 4, 16]
+    recalls = [entry['recall'] for entry in report]
+    assert all(0.0 <= recall <= 1.0 for recall in recalls)
+    assert recalls == sorted(recalls)
+    # bitta klaster taxminiy, barcha klasterlar - aniq qidiruv
+    assert recalls[0] < 1.0
+    assert recalls[-1] == 1.0
+    assert all(entry['ms_per_probe'] >= 0 for entry in report)
+
+
+def test_roster_counts_ranges_and_etag():
+    rows = np.zeros((5, 128), dtype=np.float32)
+    snapshot = gallery.Gallery.from_rows(rows, ['s1', 's1', 's2', 's1', 's3'],
+                                         ['Ali', 'Ali', 'Vali', 'Ali', 'Gani'])
+    roster = snapshot.roster
+
+    assert [s['id'] for s in roster.students] == ['s1', 's2', 's3']
+    assert roster.by_id['s1']['encodings_count'] == 3
+    assert roster.by_id['s1']['row_ranges'] == [[0, 2], [3, 4]]
+    assert (roster.total_students, roster.total_encodings) == (3, 5)
+    # Snapshot uchun bir marta hisoblanadi
+    assert snapshot.roster is roster
+
+    same = gallery.Gallery.from_rows(rows, ['s1', 's1', 's2', 's1', 's3'],
+                                     ['Ali', 'Ali', 'Vali', 'Ali', 'Gani'])
+    assert same.roster.etag == roster.etag
+    assert snapshot.without_student('s3').roster.etag != roster.etag
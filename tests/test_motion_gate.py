@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import config
+import motion_gate
+from motion_gate import MotionGate, merge_boxes, pad_box
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(motion_gate.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def _frame(square=None):
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    if square is not None:
+        top, left = square
+        frame[top:top + 80, left:left + 80] = 255
+    return frame
+
+
+def test_pad_and_merge_boxes():
+    assert pad_box((100, 200, 200, 100), 0.5, 480, 640) == (50, 250, 250, 50)
+    assert pad_box((0, 640, 480, 0), 0.5, 480, 640) == (0, 640, 480, 0)
+    assert merge_boxes([(0, 50, 50, 0), (40, 90, 90, 40), (200, 300, 300, 200)]) == [
+        (0, 90, 90, 0), (200, 300, 300, 200)]
+
+
+def test_static_scene_is_skipped(clock):
+    gate = MotionGate()
+    assert gate.check(_frame()) == (True, None)
+
+    clock[0] += 1.0
+    assert gate.check(_frame()) == (False, [])
+    assert gate.stats() == {'checked': 2, 'skipped': 1, 'skip_ratio': 0.5}
+
+
+def test_motion_returns_padded_region_around_change(clock):
+    gate = MotionGate()
+    gate.check(_frame())
+
+    clock[0] += 1.0
+    changed, regions = gate.check(_frame(square=(200, 300)))
+    assert changed
+    [(top, right, bottom, left)] = regions
+    # Hudud o'zgargan kvadratni to'liq o'z ichiga oladi, lekin butun kadr emas
+    assert top <= 200 and left <= 300 and bottom >= 280 and right >= 380
+    assert (bottom - top) * (right - left) < config.MOTION_MAX_REGION_AREA * 480 * 640
+
+    # Yangi kadr ma'lumot sifatida olindi - takror kadr o'tkazib yuboriladi
+    clock[0] += 1.0
+    assert gate.check(_frame(square=(200, 300))) == (False, [])
+
+
+def test_large_change_and_refresh_scan_whole_frame(clock):
+    gate = MotionGate()
+    gate.check(_frame())
+
+    clock[0] += 1.0
+    assert gate.check(np.full((480, 640, 3), 255, dtype=np.uint8)) == (True, None)
+
+    clock[0] += config.MOTION_REFRESH_SECONDS
+    assert gate.check(np.full((480, 640, 3), 255, dtype=np.uint8)) == (True, None)
@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+
+import pytest
+
+from ai_modules import nlp_handler
+from database import db_setup
+from database.daily_counters import DailyCounters
+
+
+@pytest.fixture
+def counters(tmp_path, monkeypatch):
+    counters = DailyCounters(str(tmp_path / 'attendance.db'))
+    monkeypatch.setattr(nlp_handler, 'counters', counters)
+    yield counters
+    counters.close()
+
+
+def test_today_and_yesterday_queries(counters):
+    today = date.today().strftime("%Y-%m-%d")
+    yesterday = (date.today() - timedelta(days=1)).strftime("%Y-%m-%d")
+    db_setup.mark_attendance('s1', 'Ali', today, '09:00:00', path=counters.path)
+    db_setup.mark_attendance('s2', 'Vali', yesterday, '09:00:00', path=counters.path)
+    db_setup.mark_attendance('s3', 'Soli', yesterday, '09:10:00', path=counters.path)
+
+    assert nlp_handler.handle_query("bugun nechta") == "Bugun 1 o‘quvchi keldi."
+    assert nlp_handler.handle_query("kecha davomat") == "Kecha 2 o‘quvchi keldi."
+    assert nlp_handler.handle_query("kecha kelganlar ismlari") == "Kecha kelgan o‘quvchilar: Vali, Soli"
+
+
+def test_repeated_query_does_not_hit_database(counters):
+    nlp_handler.handle_query("bugun nechta")
+    queries = counters.stats()['db_queries']
+    for _ in range(10):
+        nlp_handler.handle_query("bugun nechta")
+    assert counters.stats()['db_queries'] == queries
@@ -0,0 +1,73 @@
+import pytest
+
+import config
+import quality_controller
+from quality_controller import QualityController
+
+LEVELS = [(0.5, 1), (0.25, 0), (0.5, 0)]  # narx bo'yicha tartiblanadi
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(quality_controller.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(config, 'FRAME_SCALE', 0.5)
+    monkeypatch.setattr(config, 'FACE_DETECTION_UPSAMPLE', 1)
+    monkeypatch.setattr(config, 'PROCESS_EVERY_N_FRAMES', 2)
+    monkeypatch.setattr(config, 'QUALITY_WINDOW', 10)
+    return now
+
+
+def _window(controller, clock, seconds, elapsed):
+    # Oyna davomida soat 'elapsed' soniya yuradi (CPU ulushi = yig'indi / elapsed)
+    for _ in range(config.QUALITY_WINDOW):
+        clock[0] += elapsed / config.QUALITY_WINDOW
+        controller.record(seconds)
+
+
+def test_starts_at_configured_level(clock):
+    controller = QualityController(budget_ms=150, cpu_budget=0.5, levels=LEVELS)
+    assert controller.levels == [(0.25, 0), (0.5, 0), (0.5, 1)]
+    assert (controller.scale, controller.upsample, controller.skip) == (0.5, 1, 2)
+
+
+def test_slow_frames_lower_quality_then_raise_skip(clock):
+    controller = QualityController(budget_ms=150, cpu_budget=0.5, levels=LEVELS)
+
+    # Gisterezis: oyna to'lmaguncha hech narsa o'zgarmaydi
+    for _ in range(config.QUALITY_WINDOW - 1):
+        controller.record(0.3)
+    assert controller.adjustments == 0
+
+    clock[0] += 100.0
+    controller.record(0.3)
+    assert controller.last_change == 'quality_down' and controller.level == 1
+
+    _window(controller, clock, 0.3, elapsed=100.0)
+    _window(controller, clock, 0.3, elapsed=100.0)
+    assert controller.level == 0
+    assert controller.last_change == 'skip_up' and controller.skip == 3
+    assert controller.stats()['within_budget_ratio'] == 0.0
+
+
+def test_cpu_over_budget_raises_skip_first(clock):
+    controller = QualityController(budget_ms=150, cpu_budget=0.5, levels=LEVELS)
+    _window(controller, clock, 0.1, elapsed=1.0)
+
+    assert controller.last_change == 'skip_up'
+    assert controller.skip == 3 and controller.level == 2
+
+
+def test_idle_camera_lowers_skip_then_raises_quality_within_budget(clock):
+    controller = QualityController(budget_ms=150, cpu_budget=0.5, levels=LEVELS)
+    controller.level = 0
+
+    _window(controller, clock, 0.01, elapsed=100.0)
+    assert controller.last_change == 'skip_down' and controller.skip == 1
+
+    _window(controller, clock, 0.01, elapsed=100.0)
+    assert controller.last_change == 'quality_up' and controller.level == 1
+
+    # 50 ms x 4 (keyingi pog'ona narxi) byudjetdan oshadi - sifat ko'tarilmaydi
+    _window(controller, clock, 0.05, elapsed=100.0)
+    assert controller.level == 1 and controller.adjustments == 2
@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import config
+from analytics import OccupancyAnalytics
+from session_log import SessionLog
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return {
+        'log_path': str(tmp_path / 'sessions.log'),
+        'table_path': str(tmp_path / 'sessions.csv'),
+        'legacy_path': str(tmp_path / 'attendance_sessions.csv'),
+    }
+
+
+def _crash(log):
+    # To'satdan to'xtash: siqish ham, close_all ham yo'q
+    log._log.close()
+
+
+def test_replay_after_downtime_caps_departure(paths, tmp_path):
+    clock = FakeClock()
+    arrival = datetime.now().replace(microsecond=0) - timedelta(hours=3)
+
+    log = SessionLog(timeout=10, clock=clock, **paths)
+    log.seen('s1', 'Ali', now=arrival)
+    clock.now += config.SESSION_HEARTBEAT_SECONDS
+    log.seen('s1', 'Ali')
+    log.expire(now=arrival + timedelta(seconds=60))
+    _crash(log)
+
+    restarted = SessionLog(timeout=10, clock=FakeClock(), **paths)
+    assert restarted.active == {}
+    session = restarted.sessions()[-1]
+    assert session['departure'] == arrival + timedelta(seconds=70)
+
+    analytics = OccupancyAnalytics(checkpoint_path=str(tmp_path / 'analytics.json'))
+    analytics.catch_up(restarted)
+    entry = analytics.dwell_for('s1')
+    assert entry['total_seconds'] == 70.0
+    assert entry['present_since'] is None
+    restarted.close()
+
+
+def test_quick_restart_keeps_session_open(paths):
+    log = SessionLog(timeout=60, clock=FakeClock(), **paths)
+    log.seen('s1', 'Ali')
+    _crash(log)
+
+    restarted = SessionLog(timeout=60, clock=FakeClock(), **paths)
+    assert list(restarted.active) == ['s1']
+    restarted.close()
+
+
+def test_clean_shutdown_closes_open_sessions(paths):
+    log = SessionLog(timeout=60, clock=FakeClock(), **paths)
+    log.seen('s1', 'Ali')
+    log.close_all()
+    log.close()
+
+    restarted = SessionLog(timeout=60, clock=FakeClock(), **paths)
+    assert restarted.active == {}
+    assert restarted.sessions()[-1]['departure'] is not None
+    restarted.close()
+
+
+def test_compaction_moves_closed_sessions_to_table(paths):
+    log = SessionLog(timeout=60, clock=FakeClock(), **paths)
+    log.seen('s1', 'Ali')
+    log.seen('s2', 'Vali')
+    log.depart('s1')
+    log.compact()
+
+    with open(paths['log_path'], encoding='utf-8') as f:
+        events = [line.split(',')[1] for line in f.read().splitlines()]
+    assert events == ['ARRIVAL', 'HEARTBEAT']
+
+    sessions = log.sessions()
+    assert [(s['student_id'], s['departure'] is None) for s in sessions] == [('s1', False), ('s2', True)]
+    log.close()
+
+
+def test_torn_tail_is_truncated_on_replay(paths):
+    log = SessionLog(timeout=60, clock=FakeClock(), **paths)
+    log.seen('s1', 'Ali')
+    _crash(log)
+    with open(paths['log_path'], 'a', encoding='utf-8') as f:
+        f.write('2,ARRIVAL,s2,Va')
+
+    restarted = SessionLog(timeout=60, clock=FakeClock(), **paths)
+    assert list(restarted.active) == ['s1']
+    with open(paths['log_path'], encoding='utf-8') as f:
+        assert f.read().endswith('\n')
+    restarted.close()
+
+
+def test_crash_between_table_append_and_log_replace(paths):
+    log = SessionLog(timeout=60, clock=FakeClock(), **paths)
+    log.seen('s1', 'Ali')
+    log.depart('s1')
+    log._log.flush()
+    with open(paths['log_path'], encoding='utf-8') as f:
+        uncompacted = f.read()
+    log.close()
+
+    # Jadval yozilgan, lekin jurnal almashtirilmagan holat
+    with open(paths['log_path'], 'w', encoding='utf-8') as f:
+        f.write(uncompacted)
+
+    restarted = SessionLog(timeout=60, clock=FakeClock(), **paths)
+    assert len(restarted.sessions()) == 1
+    assert restarted.stats()['pending_closed'] == 0
+    restarted.close()
+
+
+def test_expire_uses_deadline_heap_on_monotonic_clock(paths):
+    clock = FakeClock()
+    log = SessionLog(timeout=10, clock=clock, **paths)
+    log.seen('s1', 'Ali')
+    log.seen('s2', 'Vali')
+
+    # Qayta ko'rinish heap'ga yozuv qo'shmaydi - har odam uchun bitta
+    for _ in range(50):
+        clock.now += 0.1
+        log.seen('s1', 'Ali')
+    assert log.stats()['heap_size'] == 2
+
+    clock.now = 1009.0
+    assert log.expire() == []
+    clock.now = 1010.0
+    assert log.expire() == ['s2']
+    # s1 ning eski muddati o'tgan, lekin u ~1005 da ko'ringan - yangi muddat bilan qaytarildi
+    assert 's1' in log.active and log.stats()['heap_size'] == 1
+
+    clock.now = 1016.0
+    assert log.expire() == ['s1']
+    assert log.active == {}
+    log.close()
+
+
+def test_stale_heap_entry_does_not_close_new_session(paths):
+    clock = FakeClock()
+    log = SessionLog(timeout=10, clock=clock, **paths)
+    log.seen('s1', 'Ali')
+    clock.now += 5
+    assert log.depart('s1')
+    clock.now += 1
+    assert log.seen('s1', 'Ali')
+
+    # Birinchi sessiya muddati (1010) - boshqa seq, e'tiborsiz qoldiriladi
+    clock.now = 1011.0
+    assert log.expire() == []
+    assert 's1' in log.active
+
+    clock.now = 1016.0
+    assert log.expire() == ['s1']
+    assert [s['student_id'] for s in log.sessions()] == ['s1', 's1']
+    log.close()
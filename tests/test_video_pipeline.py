@@ -0,0 +1,186 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+
+import config
+from video_pipeline import CameraPipeline, DropOldestQueue, detection_message
+
+
+class FakeCamera:
+    def read(self):
+        time.sleep(0.005)
+        return True, np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+class RecordingFaceSystem:
+    """
+    Inference kadrni render chizib bo'lgandan keyin tekshiradi
+    """
+
+    def __init__(self, drawn):
+        self.drawn = drawn
+        self.checked = threading.Event()
+        self.clean = None
+
+    def recognize_faces_in_frame(self, frame, scale=None, upsample=None):
+        if not self.checked.is_set():
+            self.drawn.wait(timeout=2.0)
+            self.clean = not frame.any()
+            self.checked.set()
+        return [{'name': 'Ali', 'student_id': 'S1', 'location': (1, 10, 10, 1), 'distance': 0.3}]
+
+
+@pytest.fixture
+def plain_pipeline_config(monkeypatch):
+    monkeypatch.setattr(config, 'USE_FACE_TRACKER', False)
+    monkeypatch.setattr(config, 'USE_MOTION_GATE', False)
+    monkeypatch.setattr(config, 'PROCESS_EVERY_N_FRAMES', 1)
+
+
+def test_render_draws_on_copy_not_inference_frame(plain_pipeline_config):
+    drawn = threading.Event()
+
+    def draw(frame, results):
+        frame[:] = 255
+        drawn.set()
+
+    face_system = RecordingFaceSystem(drawn)
+    pipeline = CameraPipeline(FakeCamera(), threading.Lock(), face_system, draw=draw)
+    subscriber = pipeline.subscribe('full')
+    pipeline.start()
+    try:
+        assert face_system.checked.wait(timeout=5.0)
+        assert drawn.is_set()
+        assert face_system.clean, "inference kadri render chizgan ramkalar bilan kelgan"
+        assert subscriber.get(timeout=2.0) is not None
+    finally:
+        pipeline.stop()
+
+
+class OneFrameCamera:
+    """
+    Bitta kadr beradi, keyin release o'rnatilguncha kutadi va tugaydi
+    """
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.reads = 0
+
+    def read(self):
+        self.reads += 1
+        if self.reads == 1:
+            return True, np.zeros((48, 64, 3), dtype=np.uint8)
+        self.release.wait(timeout=5.0)
+        return False, None
+
+
+class CountingFaceSystem:
+    def __init__(self):
+        self.calls = 0
+        self.called = threading.Event()
+
+    def recognize_faces_in_frame(self, frame, scale=None, upsample=None):
+        self.calls += 1
+        self.called.set()
+        return []
+
+
+def test_drop_oldest_queue_counts_drops():
+    queue = DropOldestQueue(2)
+    for item in range(5):
+        queue.put(item)
+
+    assert queue.stats() == {'depth': 2, 'maxsize': 2, 'put': 5, 'dropped': 3}
+    assert queue.get(timeout=0) == 3
+    assert queue.get(timeout=0) == 4
+    assert queue.get(timeout=0) is None
+
+    queue.close()
+    assert queue.closed and queue.get(timeout=5.0) is None
+
+
+def test_subscribers_share_one_encoded_frame(plain_pipeline_config):
+    camera = OneFrameCamera()
+    face_system = CountingFaceSystem()
+    pipeline = CameraPipeline(camera, threading.Lock(), face_system)
+    first = pipeline.subscribe('full')
+    second = pipeline.subscribe('full')
+    pipeline.start()
+    try:
+        jpeg = first.get(timeout=2.0)
+        assert jpeg is not None
+        # Bir marta encode qilingan baytlar ikkala mijozga
+        assert second.get(timeout=2.0) is jpeg
+        assert pipeline.rendered == 1
+        assert face_system.called.wait(timeout=2.0)
+        assert pipeline.unsubscribe(first) == 1
+    finally:
+        camera.release.set()
+        pipeline.stop()
+
+    assert face_system.calls == 1
+    assert second.closed
+    # To'xtagan pipeline'ga obuna darhol yopiladi
+    assert pipeline.subscribe('full').closed
+
+
+def test_detection_message_is_compact():
+    results = [{'track_id': 7, 'name': 'Ali', 'student_id': 'S1',
+                'location': (np.int64(1), 20, 30, 4), 'distance': 0.25}]
+    message = detection_message(3, (480, 640, 3), results)
+
+    assert message['seq'] == 3
+    assert (message['width'], message['height']) == (640, 480)
+    assert message['faces'] == [{'track_id': 7, 'box': [1, 20, 30, 4], 'name': 'Ali',
+                                 'student_id': 'S1', 'confidence': 0.75}]
+
+
+def test_detections_sent_only_when_faces_change(plain_pipeline_config):
+    pipeline = CameraPipeline(FakeCamera(), threading.Lock(), CountingFaceSystem())
+    results = [{'name': 'Ali', 'student_id': 'S1', 'location': (1, 10, 10, 1), 'distance': 0.3}]
+
+    # Obunachi yo'q - xabar yasalmaydi
+    pipeline._publish_detections((48, 64, 3), results)
+    assert pipeline.detections_sent == 0
+
+    first = pipeline.subscribe('detections')
+    pipeline._publish_detections((48, 64, 3), results)
+    pipeline._publish_detections((48, 64, 3), results)
+    assert pipeline.detections_sent == 1
+    assert first.get(timeout=0)['faces'][0]['name'] == 'Ali'
+    assert first.get(timeout=0) is None
+
+    # Yangi mijoz joriy holatni darhol oladi
+    second = pipeline.subscribe('detections')
+    pipeline._publish_detections((48, 64, 3), results)
+    assert second.get(timeout=0) is not None
+
+    pipeline._publish_detections((48, 64, 3), [])
+    assert first.get(timeout=0)['faces'] == []
+    assert pipeline.detections_sent == 3
+
+
+def test_preview_profile_is_small_and_undrawn(plain_pipeline_config, monkeypatch):
+    monkeypatch.setattr(config, 'STREAM_PREVIEW_WIDTH', 32)
+
+    def draw(frame, results):
+        raise AssertionError("preview kadriga chizilmasligi kerak")
+
+    camera = OneFrameCamera()
+    pipeline = CameraPipeline(camera, threading.Lock(), CountingFaceSystem(), draw=draw)
+    preview = pipeline.subscribe('preview')
+    pipeline.start()
+    try:
+        jpeg = preview.get(timeout=2.0)
+        assert jpeg is not None
+        image = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        assert image.shape[:2] == (24, 32)
+        # 'full' mijoz yo'q - to'liq JPEG encode qilinmaydi
+        assert pipeline.rendered == 0 and pipeline.previews == 1
+    finally:
+        camera.release.set()
+        pipeline.stop()